@@ -1,4 +1,3 @@
-<<<<<<< HEAD
 import os
 from dotenv import load_dotenv
 
@@ -23,36 +22,103 @@ class Config:
     VAKYANSH_STT_URL = os.getenv("VAKYANSH_STT_URL", "https://asr-api.open-speech-ekstep.frappe.cloud/v1/inference")
     VAKYANSH_TTS_URL = os.getenv("VAKYANSH_TTS_URL", "https://tts-api.open-speech-ekstep.frappe.cloud/v1/inference")
     
-    # Server Configuration
-    HOST = os.getenv("HOST", "0.0.0.0")
-    PORT = int(os.getenv("PORT", 8000))
-=======
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-class Config:
-    # Twilio Configuration
-    TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID", "ACf7af130b09bf922ff53a778a761693d3")
-    TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN", "9beeb37b1b08ba34ce08d0326db9a2bb")
-    TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER", "+12182199792")
+    # STT hedging: race the fallback engine once Vakyansh exceeds its observed latency percentile
+    STT_HEDGE_ENABLED = os.getenv("STT_HEDGE_ENABLED", "True").lower() == "true"
+    STT_HEDGE_PERCENTILE = float(os.getenv("STT_HEDGE_PERCENTILE", 0.95))
+    STT_HEDGE_INITIAL_DELAY = float(os.getenv("STT_HEDGE_INITIAL_DELAY", 3.0))
+    STT_HEDGE_MIN_DELAY = float(os.getenv("STT_HEDGE_MIN_DELAY", 0.5))
+    STT_HEDGE_MAX_DELAY = float(os.getenv("STT_HEDGE_MAX_DELAY", 10.0))
     
-    # Exotel Configuration
-    EXOTEL_API_KEY = os.getenv("EXOTEL_API_KEY", "")
-    EXOTEL_API_SECRET = os.getenv("EXOTEL_API_SECRET", "")
-    EXOTEL_SID = os.getenv("EXOTEL_SID", "")
+    # Circuit breakers for upstream STT/TTS engines
+    BREAKER_FAILURE_THRESHOLD = float(os.getenv("BREAKER_FAILURE_THRESHOLD", 0.5))
+    BREAKER_WINDOW_SIZE = int(os.getenv("BREAKER_WINDOW_SIZE", 20))
+    BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", 5))
+    BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", 30.0))
+    BREAKER_PROBE_INTERVAL = float(os.getenv("BREAKER_PROBE_INTERVAL", 10.0))
     
-    # AI Model Configuration
-    PARAM_MODEL_PATH = os.getenv("PARAM_MODEL_PATH", "./models/param-1-2.9b-instruct")
-    DEVICE = os.getenv("DEVICE", "cpu")
+    # STT result cache keyed by audio fingerprint (disk tier disabled when STT_CACHE_DIR is empty)
+    STT_CACHE_ENTRIES = int(os.getenv("STT_CACHE_ENTRIES", 10000))
+    STT_CACHE_DIR = os.getenv("STT_CACHE_DIR", "")
     
-    # STT/TTS Configuration
-    VAKYANSH_STT_URL = os.getenv("VAKYANSH_STT_URL", "https://asr-api.open-speech-ekstep.frappe.cloud/v1/inference")
-    VAKYANSH_TTS_URL = os.getenv("VAKYANSH_TTS_URL", "https://tts-api.open-speech-ekstep.frappe.cloud/v1/inference")
+    # Pre-rendered prompt audio (rendered at startup when PRERENDER_PROMPTS is true,
+    # or ahead of time with scripts/render_prompts.py)
+    PROMPT_AUDIO_DIR = os.getenv("PROMPT_AUDIO_DIR", "./audio_cache/prompts")
+    PRERENDER_PROMPTS = os.getenv("PRERENDER_PROMPTS", "False").lower() == "true"
+    
+    # Synthesized answer audio served from /audio/{clip_id} (empty dir: memory only)
+    AUDIO_STORE_MEMORY_MB = int(os.getenv("AUDIO_STORE_MEMORY_MB", 64))
+    AUDIO_STORE_DIR = os.getenv("AUDIO_STORE_DIR", "./audio_cache/clips")
+    AUDIO_STORE_DISK_MB = int(os.getenv("AUDIO_STORE_DISK_MB", 1024))
+    
+    # Audio format TTS output is converted to for calls: native (engine MP3), wav (8 kHz PCM) or mulaw (8 kHz G.711)
+    TTS_OUTPUT_FORMAT = os.getenv("TTS_OUTPUT_FORMAT", "mulaw")
+    
+    # Deferred answers: /process_query returns a hold + <Redirect> and Twilio polls
+    # /answer/{CallSid}, each poll waiting up to ANSWER_POLL_WAIT seconds
+    DEFERRED_ANSWERS = os.getenv("DEFERRED_ANSWERS", "True").lower() == "true"
+    ANSWER_WORKERS = int(os.getenv("ANSWER_WORKERS", 2))
+    ANSWER_POLL_WAIT = float(os.getenv("ANSWER_POLL_WAIT", 8.0))
+    ANSWER_TIMEOUT = float(os.getenv("ANSWER_TIMEOUT", 120.0))
+    
+    # Outbound advisory campaigns: jobs persist in SQLite and are dialed at
+    # CAMPAIGN_CPS calls per second (match the carrier's CPS limit). POST /campaigns
+    # needs the CAMPAIGN_API_KEY in an X-API-Key header; dialed calls without a
+    # status callback after CAMPAIGN_DIAL_TIMEOUT seconds count as unanswered
+    CAMPAIGN_ENABLED = os.getenv("CAMPAIGN_ENABLED", "False").lower() == "true"
+    CAMPAIGN_DB_PATH = os.getenv("CAMPAIGN_DB_PATH", "./campaign_data/campaigns.db")
+    CAMPAIGN_CPS = float(os.getenv("CAMPAIGN_CPS", 1.0))
+    CAMPAIGN_CONCURRENCY = int(os.getenv("CAMPAIGN_CONCURRENCY", 10))
+    CAMPAIGN_MAX_ATTEMPTS = int(os.getenv("CAMPAIGN_MAX_ATTEMPTS", 3))
+    CAMPAIGN_RETRY_BASE = float(os.getenv("CAMPAIGN_RETRY_BASE", 60.0))
+    CAMPAIGN_MOCK_DIALER = os.getenv("CAMPAIGN_MOCK_DIALER", "False").lower() == "true"
+    CAMPAIGN_API_KEY = os.getenv("CAMPAIGN_API_KEY", "")
+    CAMPAIGN_DIAL_TIMEOUT = float(os.getenv("CAMPAIGN_DIAL_TIMEOUT", 900.0))
+    
+    # Conversation sessions: Redis when REDIS_URL is set (required for more than
+    # one worker or node), otherwise process-local memory
+    REDIS_URL = os.getenv("REDIS_URL", "")
+    
+    # Sessions idle this long expire even if no call-completed callback arrives;
+    # beyond SESSION_MAX the least recently active session is evicted
+    SESSION_TTL = float(os.getenv("SESSION_TTL", 1800))
+    SESSION_MAX = int(os.getenv("SESSION_MAX", 100000))
+    SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", 30))
+    
+    # Stateless mode: the session rides in each Gather's action URL, HMAC-signed
+    # with SESSION_SECRET (shared by every node; defaults to the Twilio auth token),
+    # so no store is consulted. Answers are then returned in the same webhook.
+    # Audio clips are not in the token: across nodes, AUDIO_STORE_DIR must be
+    # shared storage, or the load balancer must keep each call on one node.
+    STATELESS_SESSIONS = os.getenv("STATELESS_SESSIONS", "False").lower() == "true"
+    SESSION_SECRET = os.getenv("SESSION_SECRET", "")
+    
+    # Conversation memory: earlier turns of a call kept for follow-up questions,
+    # within MEMORY_TOKEN_BUDGET prompt tokens; older turns are summarized
+    MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", 256))
+    MEMORY_KEEP_TURNS = int(os.getenv("MEMORY_KEEP_TURNS", 2))
+    
+    # Farmer profiles: the last context per caller number, so repeat callers
+    # skip the context questions while their profile is under PROFILE_MAX_AGE_DAYS
+    PROFILES_ENABLED = os.getenv("PROFILES_ENABLED", "True").lower() == "true"
+    PROFILE_DB_PATH = os.getenv("PROFILE_DB_PATH", "./profile_data/profiles.db")
+    PROFILE_MAX_AGE_DAYS = float(os.getenv("PROFILE_MAX_AGE_DAYS", 90))
+    
+    # Public URL prefix for audio served to Twilio (empty: relative URLs)
+    PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "").rstrip("/")
     
     # Server Configuration
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", 8000))
->>>>>>> e15bec281abf2b62dc4fb58236aef25909e43dfc
-    DEBUG = os.getenv("DEBUG", "True").lower() == "true" 
\ No newline at end of file
+    DEBUG = os.getenv("DEBUG", "True").lower() == "true"
+    
+    # Production launcher (server.py): SERVER_WORKERS=0 sizes the worker pool
+    # from CPUs and memory, where each worker needs SERVER_WORKER_MEMORY_MB on
+    # top of the model (MODEL_MEMORY_MB, 0 = estimate). Workers are recycled
+    # after about SERVER_MAX_REQUESTS requests.
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", os.getenv("WEB_CONCURRENCY", 0)))
+    SERVER_WORKER_MEMORY_MB = int(os.getenv("SERVER_WORKER_MEMORY_MB", 512))
+    MODEL_MEMORY_MB = int(os.getenv("MODEL_MEMORY_MB", 0))
+    SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", 2000))
+    SERVER_MAX_REQUESTS_JITTER = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", 200))
+    SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", 30))
+    SERVER_TIMEOUT = int(os.getenv("SERVER_TIMEOUT", 120))
@@ -1,16 +1,32 @@
-<<<<<<< HEAD
-from fastapi import FastAPI, Request, Form, HTTPException
+from fastapi import FastAPI, Request, Form, HTTPException, Depends
 from fastapi.responses import Response, PlainTextResponse
+import asyncio
+import hmac
 import logging
 import json
-from typing import Dict, Any
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 import uvicorn
 
 from config import Config
 from models.ai_model import ParamAIModel
 from services.stt_service import STTService
-from services.tts_service import TTSService
+from services.hedging import HedgePolicy
+from services.stt_cache import STTResultCache
+from services.tts_service import TTSService, split_sentences
 from services.telephony_service import TelephonyService
+from services.prompt_audio import PromptAudioCache
+from services.audio_store import AudioStore, clip_response
+from services.answer_queue import AnswerQueue
+from services.campaign import CampaignDispatcher, CampaignStore, MockDialer
+from services.call_session import CallSession
+from services.session_store import create_session_store
+from services.twilio_form import TwilioForm, twilio_form, twilio_signature_valid
+from services.profile_store import SQLiteProfileStore
+from services.session_token import SessionSigner
+from services.conversation_memory import ConversationMemory
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,222 +37,173 @@ app = FastAPI(title="Farmer AI Assistant", version="1.0.0")
 
 # Initialize services
 config = Config()
+breaker_options = {
+    "failure_threshold": config.BREAKER_FAILURE_THRESHOLD,
+    "window_size": config.BREAKER_WINDOW_SIZE,
+    "min_calls": config.BREAKER_MIN_CALLS,
+    "open_duration": config.BREAKER_OPEN_SECONDS,
+    "probe_interval": config.BREAKER_PROBE_INTERVAL
+}
 ai_model = ParamAIModel(config.PARAM_MODEL_PATH, config.DEVICE)
-stt_service = STTService(config.VAKYANSH_STT_URL)
-tts_service = TTSService(config.VAKYANSH_TTS_URL)
+stt_service = STTService(config.VAKYANSH_STT_URL, hedge_policies={
+    "vakyansh": HedgePolicy(
+        enabled=config.STT_HEDGE_ENABLED,
+        percentile=config.STT_HEDGE_PERCENTILE,
+        initial_delay=config.STT_HEDGE_INITIAL_DELAY,
+        min_delay=config.STT_HEDGE_MIN_DELAY,
+        max_delay=config.STT_HEDGE_MAX_DELAY
+    )
+}, breaker_options=breaker_options, result_cache=STTResultCache(
+    max_entries=config.STT_CACHE_ENTRIES,
+    disk_dir=config.STT_CACHE_DIR or None
+))
+audio_store = AudioStore(
+    memory_bytes=config.AUDIO_STORE_MEMORY_MB * 1024 * 1024,
+    disk_dir=config.AUDIO_STORE_DIR or None,
+    disk_bytes=config.AUDIO_STORE_DISK_MB * 1024 * 1024
+)
+tts_service = TTSService(config.VAKYANSH_TTS_URL, breaker_options=breaker_options,
+                         audio_store=audio_store, public_base_url=config.PUBLIC_BASE_URL)
 telephony_service = TelephonyService(config)
+prompt_audio = PromptAudioCache(config.PROMPT_AUDIO_DIR, tts_service, output_format=config.TTS_OUTPUT_FORMAT)
 
-# In-memory storage for conversation context (in production, use Redis or database)
-conversation_contexts = {}
+# Deferred answers: generated in the background, collected via /answer/{CallSid}
+generation_executor = ThreadPoolExecutor(max_workers=config.ANSWER_WORKERS, thread_name_prefix="answer")
+answer_queue = AnswerQueue(ttl=config.ANSWER_TIMEOUT * 2)
+# History summaries run one at a time on their own thread, never taking an answer's slot
+summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summary")
+ANSWER_UNAVAILABLE = "माफ़ कीजिए, अभी जवाब तैयार नहीं हो सका। कृपया अपना सवाल दोबारा पूछें।"
 
-@app.get("/")
-async def root():
-    return {"message": "Farmer AI Assistant API", "status": "running"}
+# Outbound advisory campaigns
+campaign_store = CampaignStore(config.CAMPAIGN_DB_PATH)
 
-@app.post("/voice")
-async def handle_incoming_call(request: Request):
-    """Handle incoming call - initial greeting"""
-    try:
-        # Get call details from Twilio
-        form_data = await request.form()
-        call_sid = form_data.get("CallSid")
-        from_number = form_data.get("From")
-        
-        logger.info(f"New call from {from_number}, SID: {call_sid}")
-        
-        # Initialize conversation context
-        conversation_contexts[call_sid] = {
-            "from_number": from_number,
-            "context": {},
-            "language": "hindi"  # Default language
-        }
-        
-        # Create greeting response
-        response = telephony_service.create_greeting_response("hindi")
-        
-        return Response(content=response, media_type="application/xml")
-        
-    except Exception as e:
-        logger.error(f"Error handling incoming call: {e}")
-        return Response(content="<Response><Say>Sorry, there was an error.</Say></Response>", media_type="application/xml")
+def twilio_dialer(job: Dict[str, Any]) -> Optional[str]:
+    """Place one campaign call; Twilio reports the outcome to /campaign_status"""
+    return telephony_service.make_call(
+        job["phone"],
+        webhook_url=f"{config.PUBLIC_BASE_URL}/campaign_voice/{job['campaign_id']}",
+        status_callback=f"{config.PUBLIC_BASE_URL}/campaign_status/{job['id']}"
+    )
 
-@app.post("/process_context")
-async def process_farming_context(request: Request):
-    """Process farmer's farming details"""
-    try:
-        form_data = await request.form()
-        call_sid = form_data.get("CallSid")
-        speech_result = form_data.get("SpeechResult", "")
-        confidence = form_data.get("Confidence", "0")
-        
-        logger.info(f"Processing context for call {call_sid}: {speech_result}")
-        
-        if not call_sid or call_sid not in conversation_contexts:
-            raise HTTPException(status_code=400, detail="Invalid call session")
-        
-        # Extract farming context from speech
-        context = stt_service.extract_farming_context(speech_result)
-        
-        # Update conversation context
-        conversation_contexts[call_sid]["context"] = context
-        
-        logger.info(f"Extracted context: {context}")
-        
-        # Create response asking for query
-        response = telephony_service.create_query_response("hindi")
-        
-        return Response(content=response, media_type="application/xml")
-        
-    except Exception as e:
-        logger.error(f"Error processing context: {e}")
-        return Response(content="<Response><Say>Sorry, there was an error.</Say></Response>", media_type="application/xml")
+campaign_dispatcher = CampaignDispatcher(
+    campaign_store,
+    MockDialer() if config.CAMPAIGN_MOCK_DIALER else twilio_dialer,
+    calls_per_second=config.CAMPAIGN_CPS,
+    concurrency=config.CAMPAIGN_CONCURRENCY,
+    max_attempts=config.CAMPAIGN_MAX_ATTEMPTS,
+    retry_base=config.CAMPAIGN_RETRY_BASE,
+    dial_timeout=config.CAMPAIGN_DIAL_TIMEOUT
+)
 
-@app.post("/process_query")
-async def process_farmer_query(request: Request):
-    """Process farmer's question and generate AI response"""
-    try:
-        form_data = await request.form()
-        call_sid = form_data.get("CallSid")
-        speech_result = form_data.get("SpeechResult", "")
-        confidence = form_data.get("Confidence", "0")
-        
-        logger.info(f"Processing query for call {call_sid}: {speech_result}")
-        
-        if not call_sid or call_sid not in conversation_contexts:
-            raise HTTPException(status_code=400, detail="Invalid call session")
-        
-        conversation = conversation_contexts[call_sid]
-        context = conversation["context"]
-        language = conversation["language"]
-        
-        # Check if user wants to end call
-        if any(word in speech_result.lower() for word in ["नहीं", "no", "बंद", "end", "खत्म"]):
-            # End call response
-            end_response = """<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Say>धन्यवाद! आपकी कॉल समाप्त हो रही है।</Say>
-    <Hangup/>
-</Response>"""
-            return Response(content=end_response, media_type="application/xml")
-        
-        # Generate AI response
-        ai_response = ai_model.generate_response(context, speech_result)
-        
-        logger.info(f"AI Response: {ai_response}")
-        
-        # Create response with AI answer
-        response = telephony_service.create_ai_response(ai_response, language)
-        
-        return Response(content=response, media_type="application/xml")
-        
-    except Exception as e:
-        logger.error(f"Error processing query: {e}")
-        return Response(content="<Response><Say>Sorry, there was an error.</Say></Response>", media_type="application/xml")
+# Per-call conversation state; set REDIS_URL to share it across workers and nodes
+session_store = create_session_store(config.REDIS_URL, ttl=config.SESSION_TTL, max_sessions=config.SESSION_MAX)
 
-@app.post("/webhook/twilio")
-async def twilio_webhook(request: Request):
-    """Handle Twilio webhook events"""
-    try:
-        form_data = await request.form()
-        event_type = form_data.get("EventType")
-        call_sid = form_data.get("CallSid")
-        
-        logger.info(f"Twilio webhook: {event_type} for call {call_sid}")
-        
-        if event_type == "call-completed":
-            # Clean up conversation context
-            if call_sid in conversation_contexts:
-                del conversation_contexts[call_sid]
-                logger.info(f"Cleaned up context for call {call_sid}")
-        
-        return {"status": "ok"}
-        
-    except Exception as e:
-        logger.error(f"Error handling Twilio webhook: {e}")
-        return {"status": "error", "message": str(e)}
+# Bounded per-call history; older turns are summarized in the background
+conversation_memory = ConversationMemory(
+    ai_model.summarize,
+    budget_tokens=config.MEMORY_TOKEN_BUDGET,
+    keep_turns=config.MEMORY_KEEP_TURNS,
+    count_tokens=ai_model.count_tokens
+)
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "services": {
-            "ai_model": ai_model.model is not None,
-            "stt_service": True,
-            "tts_service": True,
-            "telephony_service": telephony_service.twilio_client is not None
-        }
-    }
+# Stateless mode: the session is signed into each Gather's action URL instead
+session_signer = None
+if config.STATELESS_SESSIONS:
+    session_secret = config.SESSION_SECRET or config.TWILIO_AUTH_TOKEN
+    if not session_secret:
+        logger.warning("No SESSION_SECRET configured; signing sessions with a random key (single node only)")
+        session_secret = os.urandom(32)
+    session_signer = SessionSigner(session_secret, max_age=config.SESSION_TTL)
 
-@app.get("/stats")
-async def get_stats():
-    """Get conversation statistics"""
-    return {
-        "active_conversations": len(conversation_contexts),
-        "total_contexts": len(conversation_contexts)
-    }
+# Repeat callers' farming context, keyed by caller number
+profile_store = SQLiteProfileStore(config.PROFILE_DB_PATH)
+PROFILE_MAX_AGE = config.PROFILE_MAX_AGE_DAYS * 86400
 
-if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host=config.HOST,
-        port=config.PORT,
-        reload=config.DEBUG
-=======
-from fastapi import FastAPI, Request, Form, HTTPException
-from fastapi.responses import Response, PlainTextResponse
-import logging
-import json
-from typing import Dict, Any
-import uvicorn
+@app.on_event("startup")
+async def render_prompt_audio():
+    """Render any missing or changed prompt audio in the background"""
+    if config.PRERENDER_PROMPTS:
+        threading.Thread(target=prompt_audio.build, name="prompt-audio", daemon=True).start()
 
-from config import Config
-from models.ai_model import ParamAIModel
-from services.stt_service import STTService
-from services.tts_service import TTSService
-from services.telephony_service import TelephonyService
+@app.on_event("startup")
+async def precompile_twiml():
+    """Serialize the static TwiML responses for every language once"""
+    telephony_service.precompile_static_responses(tts_service.voice_mapping, prompt_audio_url)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+@app.on_event("startup")
+async def start_campaign_dispatcher():
+    """Drain the outbound campaign queue in the background"""
+    if config.CAMPAIGN_ENABLED and not config.PUBLIC_BASE_URL and not config.CAMPAIGN_MOCK_DIALER:
+        raise RuntimeError("CAMPAIGN_ENABLED requires PUBLIC_BASE_URL: Twilio rejects relative webhook URLs")
+    # With several workers only the one holding the lock dials, so the CPS limit holds
+    if config.CAMPAIGN_ENABLED and campaign_store.acquire_dispatcher_lock():
+        asyncio.ensure_future(campaign_dispatcher.run())
 
-# Initialize FastAPI app
-app = FastAPI(title="Farmer AI Assistant", version="1.0.0")
+@app.on_event("shutdown")
+async def stop_campaign_dispatcher():
+    campaign_dispatcher.stop()
 
-# Initialize services
-config = Config()
-ai_model = ParamAIModel(config.PARAM_MODEL_PATH, config.DEVICE)
-stt_service = STTService(config.VAKYANSH_STT_URL)
-tts_service = TTSService(config.VAKYANSH_TTS_URL)
-telephony_service = TelephonyService(config)
+@app.on_event("startup")
+async def start_session_sweeper():
+    """Expire sessions of calls whose call-completed callback never arrived"""
+    asyncio.ensure_future(session_store.run_sweeper(config.SESSION_SWEEP_INTERVAL))
+
+@app.on_event("shutdown")
+async def close_session_store():
+    await session_store.close()
+    await profile_store.close()
+
+async def load_session(call_sid: Optional[str], request: Request) -> Optional[CallSession]:
+    """The call's session, from the signed state in the URL or from the session store"""
+    if not call_sid:
+        return None
+    if session_signer is not None:
+        return session_signer.decode(call_sid, request.query_params.get("state"))
+    return await session_store.get(call_sid)
 
-# In-memory storage for conversation context (in production, use Redis or database)
-conversation_contexts = {}
+async def store_session(call_sid: str, session: CallSession) -> Optional[str]:
+    """Save the session; in stateless mode return the state for the next action URL instead"""
+    if session_signer is not None:
+        return session_signer.encode(call_sid, session)
+    await session_store.save(call_sid, session)
+    return None
+
+def prompt_audio_url(prompt: str, language: str) -> Optional[str]:
+    """Public URL of a pre-rendered prompt, or None to fall back to <Say>"""
+    clip_id = prompt_audio.clip_for(prompt, language)
+    return f"{config.PUBLIC_BASE_URL}/audio/{clip_id}" if clip_id else None
 
 @app.get("/")
 async def root():
     return {"message": "Farmer AI Assistant API", "status": "running"}
 
 @app.post("/voice")
-async def handle_incoming_call(request: Request):
+async def handle_incoming_call(form: TwilioForm = Depends(twilio_form)):
     """Handle incoming call - initial greeting"""
     try:
         # Get call details from Twilio
-        form_data = await request.form()
-        call_sid = form_data.get("CallSid")
-        from_number = form_data.get("From")
-        
-        logger.info(f"New call from {from_number}, SID: {call_sid}")
+        call_sid = form.call_sid
+        # Campaign calls are redirected here too; their From is our own number
+        from_number = form.farmer_number
+        
+        logger.info(f"New call with {from_number} ({form.direction or 'inbound'}), SID: {call_sid}")
+        
+        # Repeat callers with a fresh profile go straight to their question
+        profile = None
+        if config.PROFILES_ENABLED and from_number:
+            profile = await profile_store.get(from_number, max_age=PROFILE_MAX_AGE)
+        if profile is not None and profile.context:
+            state = await store_session(call_sid, profile)
+            logger.info(f"Loaded profile for {from_number}: {profile.context}")
+            response = telephony_service.compiled_query(profile.language, audio_url=prompt_audio_url("query_prompt", profile.language),
+                                                        state=state)
+            return Response(content=response, media_type="application/xml")
         
         # Initialize conversation context
-        conversation_contexts[call_sid] = {
-            "from_number": from_number,
-            "context": {},
-            "language": "hindi"  # Default language
-        }
+        state = await store_session(call_sid, CallSession(from_number, language="hindi"))  # Default language
         
         # Create greeting response
-        response = telephony_service.create_greeting_response("hindi")
+        response = telephony_service.compiled_greeting("hindi", audio_url=prompt_audio_url("greeting", "hindi"), state=state)
         
         return Response(content=response, media_type="application/xml")
         
@@ -245,29 +212,36 @@ async def handle_incoming_call(request: Request):
         return Response(content="<Response><Say>Sorry, there was an error.</Say></Response>", media_type="application/xml")
 
 @app.post("/process_context")
-async def process_farming_context(request: Request):
+async def process_farming_context(request: Request, form: TwilioForm = Depends(twilio_form)):
     """Process farmer's farming details"""
     try:
-        form_data = await request.form()
-        call_sid = form_data.get("CallSid")
-        speech_result = form_data.get("SpeechResult", "")
-        confidence = form_data.get("Confidence", "0")
+        call_sid = form.call_sid
+        speech_result = form.speech_result
         
         logger.info(f"Processing context for call {call_sid}: {speech_result}")
         
-        if not call_sid or call_sid not in conversation_contexts:
+        conversation = await load_session(call_sid, request)
+        if conversation is None:
             raise HTTPException(status_code=400, detail="Invalid call session")
         
         # Extract farming context from speech
-        context = stt_service.extract_farming_context(speech_result)
+        context, fuzzy_slots = stt_service.extract_farming_context_with_fuzzy_slots(speech_result)
         
         # Update conversation context
-        conversation_contexts[call_sid]["context"] = context
+        conversation.context = context
+        state = await store_session(call_sid, conversation)
+        
+        # Remember it for this farmer's next call
+        # Fuzzy guesses are used for this call only: a misheard district would otherwise
+        # skip the context turn with the wrong answer for PROFILE_MAX_AGE_DAYS
+        exact_context = {slot: value for slot, value in context.items() if slot not in fuzzy_slots}
+        if config.PROFILES_ENABLED and conversation.from_number and any(exact_context.values()):
+            await profile_store.save(conversation.from_number, exact_context, conversation.language)
         
         logger.info(f"Extracted context: {context}")
         
         # Create response asking for query
-        response = telephony_service.create_query_response("hindi")
+        response = telephony_service.compiled_query("hindi", audio_url=prompt_audio_url("query_prompt", "hindi"), state=state)
         
         return Response(content=response, media_type="application/xml")
         
@@ -276,22 +250,21 @@ async def process_farming_context(request: Request):
         return Response(content="<Response><Say>Sorry, there was an error.</Say></Response>", media_type="application/xml")
 
 @app.post("/process_query")
-async def process_farmer_query(request: Request):
+async def process_farmer_query(request: Request, form: TwilioForm = Depends(twilio_form)):
     """Process farmer's question and generate AI response"""
     try:
-        form_data = await request.form()
-        call_sid = form_data.get("CallSid")
-        speech_result = form_data.get("SpeechResult", "")
-        confidence = form_data.get("Confidence", "0")
+        call_sid = form.call_sid
+        speech_result = form.speech_result
         
         logger.info(f"Processing query for call {call_sid}: {speech_result}")
         
-        if not call_sid or call_sid not in conversation_contexts:
+        conversation = await load_session(call_sid, request)
+        if conversation is None:
             raise HTTPException(status_code=400, detail="Invalid call session")
         
-        conversation = conversation_contexts[call_sid]
-        context = conversation["context"]
-        language = conversation["language"]
+        language = conversation.language
+        conversation.turns += 1
+        state = await store_session(call_sid, conversation)
         
         # Check if user wants to end call
         if any(word in speech_result.lower() for word in ["नहीं", "no", "बंद", "end", "खत्म"]):
@@ -303,13 +276,15 @@ async def process_farmer_query(request: Request):
 </Response>"""
             return Response(content=end_response, media_type="application/xml")
         
-        # Generate AI response
-        ai_response = ai_model.generate_response(context, speech_result)
-        
-        logger.info(f"AI Response: {ai_response}")
-        
-        # Create response with AI answer
-        response = telephony_service.create_ai_response(ai_response, language)
+        if config.DEFERRED_ANSWERS and session_signer is None:
+            # Answer in the background and park the caller on the poll endpoint,
+            # so a slow generation never holds this webhook past Twilio's timeout
+            answer_queue.submit(call_sid, build_answer(call_sid, conversation, speech_result,
+                                                       rest_key=answer_rest_key(call_sid)))
+            response = telephony_service.render_hold_response(f"/answer/{call_sid}", language)
+        else:
+            # Also in stateless mode, where the poll could reach a node that never saw the answer
+            response = await build_answer(call_sid, conversation, speech_result, state)
         
         return Response(content=response, media_type="application/xml")
         
@@ -317,20 +292,113 @@ async def process_farmer_query(request: Request):
         logger.error(f"Error processing query: {e}")
         return Response(content="<Response><Say>Sorry, there was an error.</Say></Response>", media_type="application/xml")
 
+def answer_rest_key(call_sid: str) -> str:
+    """Answer queue key (and /answer/ path) for the rest of a call's answer after its first sentence"""
+    return f"{call_sid}/rest"
+
+async def build_answer(call_sid: str, conversation: CallSession, speech_result: str,
+                       state: Optional[str] = None, rest_key: Optional[str] = None) -> bytes:
+    """Generate the AI answer and render it as TwiML.
+    
+    With ``rest_key`` the TwiML is returned as soon as the first sentence is
+    synthesized: it plays that sentence and redirects to /answer/{rest_key},
+    where the rest is collected while the first one plays.
+    """
+    language = conversation.language
+    history = conversation_memory.render(conversation)
+    
+    # Generation is CPU-bound; keep it off the event loop
+    loop = asyncio.get_running_loop()
+    ai_response = await loop.run_in_executor(
+        generation_executor, ai_model.generate_response, conversation.context, speech_result, history
+    )
+    
+    logger.info(f"AI Response: {ai_response}")
+    
+    # Stateless tokens stay compact, so they carry no history
+    if session_signer is None:
+        await remember_turn(call_sid, speech_result, ai_response)
+    
+    # Synthesize the answer sentence by sentence; a sentence that failed is spoken with <Say>
+    sentences = split_sentences(ai_response)
+    segments = tts_service.synthesize_pipelined(ai_response, language, output_format=config.TTS_OUTPUT_FORMAT)
+    if rest_key is not None and len(sentences) > 1:
+        audio_urls = await collect_segments(segments, 1)
+        answer_queue.submit(rest_key, finish_answer(segments, sentences[1:], language))
+        return telephony_service.create_partial_answer_response(
+            audio_urls, sentences[:1], f"/answer/{rest_key}", language
+        ).encode("utf-8")
+    
+    audio_urls = await collect_segments(segments, len(sentences))
+    return telephony_service.render_ai_response(ai_response, language, audio_urls=audio_urls, state=state,
+                                                sentences=sentences)
+
+async def finish_answer(segments, sentences: List[str], language: str) -> bytes:
+    """The rest of a partially played answer, followed by the next-question prompt"""
+    audio_urls = await collect_segments(segments, len(sentences))
+    return telephony_service.render_ai_response(" ".join(sentences), language, audio_urls=audio_urls,
+                                                sentences=sentences)
+
+async def collect_segments(segments, count: int) -> List[Optional[str]]:
+    """Publish the next ``count`` synthesized segments; None for sentences that failed, so the rest are kept"""
+    audio_urls = []
+    try:
+        while len(audio_urls) < count:
+            try:
+                audio_data = await segments.__anext__()
+            except StopAsyncIteration:
+                break
+            audio_urls.append(tts_service.publish_audio(audio_data) if audio_data is not None else None)
+    except Exception as e:
+        logger.error(f"Answer synthesis failed after {len(audio_urls)} of {count} sentences: {e}")
+    return audio_urls + [None] * (count - len(audio_urls))
+
+async def remember_turn(call_sid: str, query: str, answer: str):
+    """Add the answered turn to the call's history; summarize older turns after the answer is out"""
+    await conversation_memory.remember(call_sid, session_store, query, answer, summary_executor)
+
+@app.post("/answer/{call_sid}")
+async def poll_answer(call_sid: str):
+    """Twilio is redirected here until the deferred answer for the call is ready"""
+    return await poll_answer_queue(call_sid, call_sid)
+
+@app.post("/answer/{call_sid}/rest")
+async def poll_answer_rest(call_sid: str):
+    """Twilio is redirected here after the first sentence of the answer has played"""
+    return await poll_answer_queue(call_sid, answer_rest_key(call_sid))
+
+async def poll_answer_queue(call_sid: str, key: str) -> Response:
+    conversation = await session_store.get(call_sid)
+    language = conversation.language if conversation else "hindi"
+    
+    status, response = await answer_queue.wait(key, timeout=config.ANSWER_POLL_WAIT)
+    
+    if status == AnswerQueue.PENDING:
+        if answer_queue.age(key) < config.ANSWER_TIMEOUT:
+            response = telephony_service.render_hold_response(f"/answer/{key}", language, announce=False)
+            return Response(content=response, media_type="application/xml")
+        answer_queue.discard(key)
+        logger.error(f"Answer for call {call_sid} timed out")
+    
+    if status != AnswerQueue.READY:
+        response = telephony_service.render_ai_response(ANSWER_UNAVAILABLE, language)
+    
+    return Response(content=response, media_type="application/xml")
+
 @app.post("/webhook/twilio")
-async def twilio_webhook(request: Request):
+async def twilio_webhook(form: TwilioForm = Depends(twilio_form)):
     """Handle Twilio webhook events"""
     try:
-        form_data = await request.form()
-        event_type = form_data.get("EventType")
-        call_sid = form_data.get("CallSid")
+        event_type = form.event_type
+        call_sid = form.call_sid
         
         logger.info(f"Twilio webhook: {event_type} for call {call_sid}")
         
         if event_type == "call-completed":
-            # Clean up conversation context
-            if call_sid in conversation_contexts:
-                del conversation_contexts[call_sid]
+            # Clean up conversation context and any answer still being generated
+            answer_queue.discard(call_sid)
+            answer_queue.discard(answer_rest_key(call_sid))
+            if await session_store.delete(call_sid):
                 logger.info(f"Cleaned up context for call {call_sid}")
         
         return {"status": "ok"}
@@ -339,6 +407,76 @@ async def twilio_webhook(request: Request):
         logger.error(f"Error handling Twilio webhook: {e}")
         return {"status": "error", "message": str(e)}
 
+@app.get("/audio/{clip_id}")
+async def get_audio(clip_id: str, request: Request):
+    """Serve pre-rendered prompts and synthesized answers, with ETag and Range support"""
+    if prompt_audio.has_clip(clip_id):
+        with open(prompt_audio.path_for(clip_id), "rb") as f:
+            audio_data = f.read()
+    else:
+        audio_data = audio_store.get(clip_id)
+    
+    if audio_data is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    
+    status, headers, body = clip_response(
+        clip_id,
+        audio_data,
+        range_header=request.headers.get("range"),
+        if_none_match=request.headers.get("if-none-match")
+    )
+    return Response(content=body, status_code=status, headers=headers)
+
+def require_campaign_api_key(request: Request):
+    """Campaigns dial real phones, so the API is closed unless CAMPAIGN_API_KEY is configured and sent"""
+    if not config.CAMPAIGN_API_KEY:
+        raise HTTPException(status_code=503, detail="CAMPAIGN_API_KEY is not configured")
+    api_key = request.headers.get("x-api-key", "")
+    if not hmac.compare_digest(api_key.encode(), config.CAMPAIGN_API_KEY.encode()):
+        raise HTTPException(status_code=401, detail="Invalid API key")
+
+@app.post("/campaigns", dependencies=[Depends(require_campaign_api_key)])
+async def create_campaign(request: Request):
+    """Queue an advisory campaign: {"name", "message", "language", "numbers": [...]}"""
+    payload = await request.json()
+    if not payload.get("message") or not payload.get("numbers"):
+        raise HTTPException(status_code=400, detail="message and numbers are required")
+    
+    campaign_id = campaign_store.create_campaign(
+        payload.get("name", "advisory"),
+        payload["message"],
+        payload["numbers"],
+        payload.get("language", "hindi")
+    )
+    return {"campaign_id": campaign_id, "progress": campaign_store.progress(campaign_id)}
+
+@app.get("/campaigns/{campaign_id}", dependencies=[Depends(require_campaign_api_key)])
+async def get_campaign(campaign_id: int):
+    """Campaign details and job counts by status"""
+    campaign = campaign_store.get_campaign(campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return {**campaign, "progress": campaign_store.progress(campaign_id)}
+
+@app.post("/campaign_voice/{campaign_id}")
+async def campaign_voice(campaign_id: int):
+    """TwiML for an answered campaign call"""
+    campaign = campaign_store.get_campaign(campaign_id)
+    if campaign is None:
+        return Response(content="<Response><Hangup/></Response>", media_type="application/xml")
+    
+    response = telephony_service.create_campaign_response(campaign["message"], campaign["language"])
+    return Response(content=response, media_type="application/xml")
+
+@app.post("/campaign_status/{job_id}")
+async def campaign_status(job_id: int, request: Request, form: TwilioForm = Depends(twilio_form)):
+    """Twilio status callback for a campaign call"""
+    # A forged callback could mark calls completed or trigger redials
+    if not await twilio_signature_valid(request, config.TWILIO_AUTH_TOKEN, config.PUBLIC_BASE_URL):
+        raise HTTPException(status_code=403, detail="Invalid Twilio signature")
+    campaign_dispatcher.record_call_status(job_id, form.call_status)
+    return {"status": "ok"}
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -349,6 +487,10 @@ async def health_check():
             "stt_service": True,
             "tts_service": True,
             "telephony_service": telephony_service.twilio_client is not None
+        },
+        "circuit_breakers": {
+            "stt": stt_service.get_breaker_status(),
+            "tts": tts_service.get_breaker_status()
         }
     }
 
@@ -356,8 +498,17 @@ async def health_check():
 async def get_stats():
     """Get conversation statistics"""
     return {
-        "active_conversations": len(conversation_contexts),
-        "total_contexts": len(conversation_contexts)
+        "active_conversations": await session_store.count(),
+        "total_contexts": await session_store.count(),
+        "sessions": await session_store.stats(),
+        "profiles": await profile_store.count(),
+        "conversation_memory": conversation_memory.stats(),
+        "stt_hedging": stt_service.get_hedge_stats(),
+        "stt_cache": stt_service.result_cache.stats(),
+        "audio_store": audio_store.stats(),
+        "tts_synthesis": tts_service.get_synthesis_stats(),
+        "deferred_answers": answer_queue.stats(),
+        "campaigns": campaign_dispatcher.stats()
     }
 
 if __name__ == "__main__":
@@ -366,5 +517,4 @@ if __name__ == "__main__":
         host=config.HOST,
         port=config.PORT,
         reload=config.DEBUG
->>>>>>> e15bec281abf2b62dc4fb58236aef25909e43dfc
     ) 
\ No newline at end of file
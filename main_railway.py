@@ -1,11 +1,16 @@
-from fastapi import FastAPI, Request, Form, HTTPException
+from fastapi import FastAPI, Form, HTTPException, Depends
 from fastapi.responses import Response, PlainTextResponse
+import asyncio
 import logging
 import json
 from typing import Dict, Any
 import uvicorn
 import os
 
+from services.call_session import CallSession
+from services.session_store import create_session_store
+from services.twilio_form import TwilioForm, twilio_form
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,6 +32,10 @@ except Exception as e:
         TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER", "+12182199792")
         VAKYANSH_STT_URL = os.getenv("VAKYANSH_STT_URL", "https://asr-api.open-speech-ekstep.frappe.cloud/v1/inference")
         VAKYANSH_TTS_URL = os.getenv("VAKYANSH_TTS_URL", "https://tts-api.open-speech-ekstep.frappe.cloud/v1/inference")
+        REDIS_URL = os.getenv("REDIS_URL", "")
+        SESSION_TTL = float(os.getenv("SESSION_TTL", 1800))
+        SESSION_MAX = int(os.getenv("SESSION_MAX", 100000))
+        SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", 30))
     config = BasicConfig()
     logger.info("Using BasicConfig")
 
@@ -62,8 +71,8 @@ except Exception as e:
     logger.warning(f"Telephony service import failed: {e}")
     telephony_service = None
 
-# In-memory storage for conversation context
-conversation_contexts = {}
+# Per-call conversation state; set REDIS_URL to share it across workers and nodes
+session_store = create_session_store(config.REDIS_URL, ttl=config.SESSION_TTL, max_sessions=config.SESSION_MAX)
 
 @app.get("/")
 async def root():
@@ -86,6 +95,10 @@ async def health_check():
             "tts_service": tts_service is not None,
             "telephony_service": telephony_service is not None
         },
+        "circuit_breakers": {
+            "stt": stt_service.get_breaker_status() if stt_service else None,
+            "tts": tts_service.get_breaker_status() if tts_service else None
+        },
         "note": "App is running successfully on Railway"
     }
 
@@ -114,22 +127,17 @@ async def get_url():
     }
 
 @app.post("/voice")
-async def handle_incoming_call(request: Request):
+async def handle_incoming_call(form: TwilioForm = Depends(twilio_form)):
     """Handle incoming call - initial greeting"""
     try:
         # Get call details from Twilio
-        form_data = await request.form()
-        call_sid = form_data.get("CallSid")
-        from_number = form_data.get("From")
+        call_sid = form.call_sid
+        from_number = form.farmer_number
         
         logger.info(f"New call from {from_number}, SID: {call_sid}")
         
         # Initialize conversation context
-        conversation_contexts[call_sid] = {
-            "from_number": from_number,
-            "context": {},
-            "language": "hindi"
-        }
+        await session_store.save(call_sid, CallSession(from_number, language="hindi"))
         
         # Simple greeting response
         greeting_response = """<?xml version="1.0" encoding="UTF-8"?>
@@ -147,21 +155,22 @@ async def handle_incoming_call(request: Request):
         return Response(content="<Response><Say>Sorry, there was an error.</Say></Response>", media_type="application/xml")
 
 @app.post("/process_context")
-async def process_farming_context(request: Request):
+async def process_farming_context(form: TwilioForm = Depends(twilio_form)):
     """Process farmer's farming details"""
     try:
-        form_data = await request.form()
-        call_sid = form_data.get("CallSid")
-        speech_result = form_data.get("SpeechResult", "")
+        call_sid = form.call_sid
+        speech_result = form.speech_result
         
         logger.info(f"Processing context for call {call_sid}: {speech_result}")
         
-        if not call_sid or call_sid not in conversation_contexts:
+        conversation = await session_store.get(call_sid) if call_sid else None
+        if conversation is None:
             raise HTTPException(status_code=400, detail="Invalid call session")
         
         # Simple context extraction
         context = {"crop": "wheat", "location": "Haryana", "water_condition": "shortage"}
-        conversation_contexts[call_sid]["context"] = context
+        conversation.context = context
+        await session_store.save(call_sid, conversation)
         
         # Ask for query
         query_response = """<?xml version="1.0" encoding="UTF-8"?>
@@ -179,16 +188,15 @@ async def process_farming_context(request: Request):
         return Response(content="<Response><Say>Sorry, there was an error.</Say></Response>", media_type="application/xml")
 
 @app.post("/process_query")
-async def process_farmer_query(request: Request):
+async def process_farmer_query(form: TwilioForm = Depends(twilio_form)):
     """Process farmer's question and generate AI response"""
     try:
-        form_data = await request.form()
-        call_sid = form_data.get("CallSid")
-        speech_result = form_data.get("SpeechResult", "")
+        call_sid = form.call_sid
+        speech_result = form.speech_result
         
         logger.info(f"Processing query for call {call_sid}: {speech_result}")
         
-        if not call_sid or call_sid not in conversation_contexts:
+        if not call_sid or await session_store.get(call_sid) is None:
             raise HTTPException(status_code=400, detail="Invalid call session")
         
         # Check if user wants to end call
@@ -219,19 +227,17 @@ async def process_farmer_query(request: Request):
         return Response(content="<Response><Say>Sorry, there was an error.</Say></Response>", media_type="application/xml")
 
 @app.post("/webhook/twilio")
-async def twilio_webhook(request: Request):
+async def twilio_webhook(form: TwilioForm = Depends(twilio_form)):
     """Handle Twilio webhook events"""
     try:
-        form_data = await request.form()
-        event_type = form_data.get("EventType")
-        call_sid = form_data.get("CallSid")
+        event_type = form.event_type
+        call_sid = form.call_sid
         
         logger.info(f"Twilio webhook: {event_type} for call {call_sid}")
         
         if event_type == "call-completed":
             # Clean up conversation context
-            if call_sid in conversation_contexts:
-                del conversation_contexts[call_sid]
+            if await session_store.delete(call_sid):
                 logger.info(f"Cleaned up context for call {call_sid}")
         
         return {"status": "ok"}
@@ -240,12 +246,18 @@ async def twilio_webhook(request: Request):
         logger.error(f"Error handling Twilio webhook: {e}")
         return {"status": "error", "message": str(e)}
 
+@app.on_event("startup")
+async def start_session_sweeper():
+    """Expire sessions of calls whose call-completed callback never arrived"""
+    asyncio.ensure_future(session_store.run_sweeper(config.SESSION_SWEEP_INTERVAL))
+
 @app.get("/stats")
 async def get_stats():
     """Get conversation statistics"""
     return {
-        "active_conversations": len(conversation_contexts),
-        "total_contexts": len(conversation_contexts),
+        "active_conversations": await session_store.count(),
+        "total_contexts": await session_store.count(),
+        "sessions": await session_store.stats(),
         "deployment": "railway"
     }
 
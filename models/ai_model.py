@@ -1,9 +1,11 @@
 import torch
 from transformers import AutoTokenizer, AutoModelForCausalLM
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Sequence, Tuple
 import os
 
+from services.conversation_memory import estimate_tokens
+
 class ParamAIModel:
     def __init__(self, model_path: str = "./models/param-1-2.9b-instruct", device: str = "cpu"):
         self.model_path = model_path
@@ -83,14 +85,14 @@ class ParamAIModel:
         else:
             return "english"
     
-    def generate_response(self, context: Dict[str, Any], query: str) -> str:
-        """Generate a farming advice response based on context and query"""
+    def generate_response(self, context: Dict[str, Any], query: str, history: Optional[str] = None) -> str:
+        """Generate a farming advice response based on context, query and the call's earlier turns"""
         try:
             # Detect language
             detected_lang = self._detect_language(query)
             
             # Build the prompt
-            prompt = self._build_prompt(context, query, detected_lang)
+            prompt = self._build_prompt(context, query, detected_lang, history)
             
             if self.model is None:
                 # Fallback response
@@ -119,12 +121,63 @@ class ParamAIModel:
             self.logger.error(f"Error generating response: {e}")
             return self._generate_fallback_response(context, query, "hindi")
     
-    def _build_prompt(self, context: Dict[str, Any], query: str, language: str) -> str:
+    def summarize(self, summary: str, turns: Sequence[Tuple[str, str]], language: str = "hindi",
+                  max_tokens: int = 96) -> str:
+        """Fold earlier conversation turns into a short running summary"""
+        conversation = "\n".join(f"Farmer: {query}\nAdvisor: {answer}" for query, answer in turns)
+        try:
+            if self.model is None:
+                return self._fallback_summary(summary, turns, max_tokens)
+            
+            lang_name = self.language_map.get(language, "हिंदी")
+            prompt = f"""Summarize this conversation between a farmer and an agriculture advisor in {lang_name}, in under {max_tokens} tokens. Keep the crop problems, the advice given and any quantities.
+
+Summary so far: {summary or "None"}
+
+{conversation}
+
+Summary:"""
+            inputs = self.tokenizer(prompt, return_tensors="pt", truncation=True, max_length=512)
+            
+            with torch.no_grad():
+                outputs = self.model.generate(
+                    inputs.input_ids,
+                    max_new_tokens=max_tokens,
+                    do_sample=False,
+                    pad_token_id=self.tokenizer.eos_token_id
+                )
+            
+            return self.tokenizer.decode(outputs[0][inputs.input_ids.shape[1]:], skip_special_tokens=True).strip()
+            
+        except Exception as e:
+            self.logger.error(f"Error summarizing conversation: {e}")
+            return self._fallback_summary(summary, turns, max_tokens)
+    
+    def count_tokens(self, text: str) -> int:
+        """Token count with the model's tokenizer, estimated when it is not loaded"""
+        if self.tokenizer is None:
+            return estimate_tokens(text)
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+    
+    def _fallback_summary(self, summary: str, turns: Sequence[Tuple[str, str]], max_tokens: int) -> str:
+        """Keep the farmer's questions, newest last, within the token limit"""
+        questions = [summary] if summary else []
+        questions.extend(query for query, _ in turns)
+        text = "; ".join(questions)
+        while len(questions) > 1 and self.count_tokens(text) > max_tokens:
+            questions.pop(0)
+            text = "; ".join(questions)
+        return text
+    
+    def _build_prompt(self, context: Dict[str, Any], query: str, language: str, history: Optional[str] = None) -> str:
         """Build a multilingual prompt for the AI model"""
         
         # Get language name in native script
         lang_name = self.language_map.get(language, "हिंदी")
         
+        # Earlier turns of this call, already trimmed to the memory's token budget
+        history_section = f"Conversation so far:\n{history}\n\n" if history else ""
+        
         prompt = f"""You are an expert agriculture advisor. Please respond in {lang_name}.
 
 Farmer Location: {context.get('location', 'Unknown')}
@@ -133,7 +186,7 @@ Water Condition: {context.get('water_condition', 'Unknown')}
 Soil Type: {context.get('soil_type', 'Unknown')}
 Season: {context.get('season', 'Unknown')}
 
-Farmer Query: "{query}"
+{history_section}Farmer Query: "{query}"
 
 Give a clear, short, and practical answer in simple {lang_name} that a farmer can easily understand and follow. Focus on:
 1. Immediate actionable steps
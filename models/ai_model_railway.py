@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import requests
 import json
 
@@ -42,8 +42,8 @@ class RailwayAIModel:
         else:
             return "english"
     
-    def generate_response(self, context: Dict[str, Any], query: str) -> str:
-        """Generate a farming advice response based on context and query"""
+    def generate_response(self, context: Dict[str, Any], query: str, history: Optional[str] = None) -> str:
+        """Generate a farming advice response based on context and query (history is not used here)"""
         try:
             # Detect language
             detected_lang = self._detect_language(query)
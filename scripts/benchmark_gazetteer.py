@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark for farming context extraction as the vocabulary grows.
+
+Compares the compiled gazetteer (single longest-match scan) with the old
+approach of running a substring check for every keyword, at 1x, 10x and
+100x the bundled vocabulary. The gazetteer cost should stay flat while the
+keyword loop grows linearly. Also reports the per-utterance cost of fuzzy
+matching on misspelled ASR output, which should stay well under 1 ms.
+
+    python scripts/benchmark_gazetteer.py [--repeat 2000]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.gazetteer import DEFAULT_GAZETTEER_DIR, Gazetteer
+
+UTTERANCES = [
+    "Haryana mein gehun ki kheti kar raha hun, paani ki kami hai",
+    "Karnal district mein basmati dhan lagaya hai, kali mitti hai aur paani bharpur hai",
+    "मैं पंजाब में कपास की खेती करता हूं, खरीफ में पानी कम है",
+    "Nashik mein pyaz aur angoor, domat mitti, rabi season",
+    "my tomato crop in Kolar has leaf curl, what should I spray",
+]
+
+NOISY_UTTERANCES = [
+    "Hariyaana mein gehoon ki kheti, paaani ki kamee hai",
+    "gahun aur sarso lagaya hai karnaal mein",
+    "tamaatar aur bhindee, chiknee mitti, kharif",
+]
+
+
+def load_surfaces(directory: str):
+    """Return (slot, canonical, surface) triples from the bundled data files"""
+    triples = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".tsv"):
+            continue
+        slot = filename[:-len(".tsv")]
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                canonical, _, surfaces = line.partition("\t")
+                for surface in surfaces.split("|"):
+                    triples.append((slot, canonical, surface.strip().lower()))
+    return triples
+
+
+def synthetic_surfaces(count: int, rng: random.Random):
+    """Random pseudo-words that never occur in the sample utterances"""
+    triples = []
+    for i in range(count):
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+        triples.append(("crop", f"synthetic-{i}", f"zq{word}"))
+    return triples
+
+
+def keyword_loop(triples, text: str) -> dict:
+    """The pre-gazetteer approach: one substring test per keyword"""
+    text_lower = text.lower()
+    context = {}
+    for slot, canonical, surface in triples:
+        if slot not in context and surface in text_lower:
+            context[slot] = canonical
+    return context
+
+
+def time_per_call(func, repeat: int, utterances=UTTERANCES) -> float:
+    """Mean microseconds per utterance"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in utterances:
+            func(text)
+    return (time.perf_counter() - started) / (repeat * len(utterances)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000, help="passes over the sample utterances")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    base = load_surfaces(DEFAULT_GAZETTEER_DIR)
+
+    print(f"{'vocabulary':>12} {'gazetteer us':>14} {'keyword loop us':>16}")
+    for factor in (1, 10, 100):
+        triples = base + synthetic_surfaces(len(base) * (factor - 1), rng)
+
+        gazetteer = Gazetteer()
+        for slot, canonical, surface in triples:
+            gazetteer.add(slot, canonical, surface)
+
+        loop_repeat = max(1, args.repeat // factor)
+        gazetteer_us = time_per_call(gazetteer.extract, args.repeat)
+        loop_us = time_per_call(lambda text: keyword_loop(triples, text), loop_repeat)
+        print(f"{len(triples):>12} {gazetteer_us:>14.1f} {loop_us:>16.1f}")
+
+    fuzzy = Gazetteer.from_directory(DEFAULT_GAZETTEER_DIR)
+    fuzzy.enable_fuzzy()
+    fuzzy_us = time_per_call(fuzzy.extract, args.repeat, NOISY_UTTERANCES)
+    print(f"\nfuzzy matching on noisy utterances: {fuzzy_us:.1f} us per utterance")
+
+
+if __name__ == "__main__":
+    main()
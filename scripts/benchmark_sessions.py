@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for in-process call sessions.
+
+Builds the same sessions twice - as the nested dicts the handlers used to
+keep (one dict per call plus one context dict, with strings as JSON decoding
+produces them) and as slotted ``CallSession`` objects with interned slot
+codes - and reports the bytes tracemalloc attributes to each.
+
+    python scripts/benchmark_sessions.py [--sessions 100000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.call_session import LANGUAGES, CallSession, get_vocabularies
+from services.gazetteer import CONTEXT_SLOTS
+
+
+def sample_payloads(count: int, rng: random.Random):
+    """JSON session payloads as they arrive from a store, with realistic slot fill"""
+    vocabularies = get_vocabularies()
+    choices = {slot: [vocabularies[slot].value(code) for code in range(1, len(vocabularies[slot]) + 1)]
+               for slot in CONTEXT_SLOTS}
+    payloads = []
+    for i in range(count):
+        context = {slot: rng.choice(values) for slot, values in choices.items()
+                   if values and rng.random() < 0.8}
+        payloads.append(json.dumps({
+            "from_number": f"+9198{i:08d}",
+            "context": context,
+            "language": rng.choice(LANGUAGES[:3]),
+        }, ensure_ascii=False))
+    return payloads
+
+
+def measure(build):
+    """Bytes still allocated after ``build()`` returns, and the result"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dict and slotted session memory")
+    parser.add_argument("--sessions", type=int, default=100000, help="Number of sessions")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    args = parser.parse_args()
+
+    payloads = sample_payloads(args.sessions, random.Random(args.seed))
+    # Vocabularies are shared by all sessions; build them outside the measurement
+    get_vocabularies()
+
+    dict_bytes, dicts = measure(lambda: {f"CA{i}": json.loads(p) for i, p in enumerate(payloads)})
+    slot_bytes, sessions = measure(
+        lambda: {f"CA{i}": CallSession.from_dict(json.loads(p)) for i, p in enumerate(payloads)}
+    )
+    assert all(sessions[sid].to_dict()["context"] == dicts[sid]["context"] for sid in list(dicts)[:1000])
+
+    print(f"{args.sessions} sessions")
+    print(f"  {'nested dicts':<16} {dict_bytes / 2 ** 20:8.1f} MB  {dict_bytes / args.sessions:6.0f} B/session")
+    print(f"  {'CallSession':<16} {slot_bytes / 2 ** 20:8.1f} MB  {slot_bytes / args.sessions:6.0f} B/session")
+    print(f"  saving: {100 * (1 - slot_bytes / dict_bytes):.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for reading Twilio webhook parameters.
+
+Times, per request, Starlette's ``await request.form()`` plus the handful of
+``.get`` calls the handlers made, against the ``twilio_form`` dependency
+that parses only the needed keys from the raw body. A fresh Request is built
+for every iteration on both sides, so the figures include body receipt.
+Also times the bare parsers (``urllib.parse.parse_qsl`` vs
+``parse_twilio_form``).
+
+    python scripts/benchmark_twilio_form.py [--repeat 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from urllib.parse import parse_qsl, urlencode
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.requests import Request
+
+from services.twilio_form import parse_twilio_form, twilio_form
+
+# A /process_query callback as Twilio sends it
+TWILIO_PARAMS = {
+    "AccountSid": "AC" + "0" * 32,
+    "ApiVersion": "2010-04-01",
+    "CallSid": "CA" + "1" * 32,
+    "CallStatus": "in-progress",
+    "Called": "+911140000000",
+    "CalledCity": "",
+    "CalledCountry": "IN",
+    "CalledState": "",
+    "CalledZip": "",
+    "Caller": "+919876543210",
+    "CallerCity": "",
+    "CallerCountry": "IN",
+    "CallerState": "",
+    "CallerZip": "",
+    "Confidence": "0.8723",
+    "Direction": "inbound",
+    "From": "+919876543210",
+    "FromCity": "",
+    "FromCountry": "IN",
+    "FromState": "",
+    "FromZip": "",
+    "Language": "hi-IN",
+    "SpeechResult": "गेहूं में पीला रतुआ लगा है कौन सी दवा डालूं",
+    "To": "+911140000000",
+    "ToCity": "",
+    "ToCountry": "IN",
+    "ToState": "",
+    "ToZip": "",
+}
+
+
+def make_request(body: bytes) -> Request:
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/process_query",
+        "query_string": b"",
+        "headers": [
+            (b"content-type", b"application/x-www-form-urlencoded"),
+            (b"content-length", str(len(body)).encode("ascii")),
+        ],
+    }
+    return Request(scope, receive)
+
+
+async def starlette_form(body: bytes):
+    form_data = await make_request(body).form()
+    return (form_data.get("CallSid"), form_data.get("From"),
+            form_data.get("SpeechResult", ""), form_data.get("Confidence", "0"))
+
+
+async def fast_form(body: bytes):
+    return await twilio_form(make_request(body))
+
+
+async def time_async(func, body: bytes, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await func(body)
+    return (time.perf_counter() - start) / repeat
+
+
+def time_sync(func, body: bytes, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(body)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Twilio webhook form parsing")
+    parser.add_argument("--repeat", type=int, default=20000, help="Iterations per measurement")
+    args = parser.parse_args()
+
+    body = urlencode(TWILIO_PARAMS).encode("ascii")
+    form = parse_twilio_form(body)
+    assert (form.call_sid, form.speech_result) == (TWILIO_PARAMS["CallSid"], TWILIO_PARAMS["SpeechResult"])
+
+    print(f"Body: {len(body)} bytes, {len(TWILIO_PARAMS)} parameters, {args.repeat} iterations")
+
+    slow = asyncio.run(time_async(starlette_form, body, args.repeat))
+    fast = asyncio.run(time_async(fast_form, body, args.repeat))
+    print(f"  {'request.form()':<28} {slow * 1e6:8.1f} us/request")
+    print(f"  {'twilio_form dependency':<28} {fast * 1e6:8.1f} us/request  ({slow / fast:.1f}x)")
+
+    slow = time_sync(lambda data: parse_qsl(data.decode("ascii"), keep_blank_values=True), body, args.repeat)
+    fast = time_sync(parse_twilio_form, body, args.repeat)
+    print(f"  {'parse_qsl':<28} {slow * 1e6:8.1f} us/body")
+    print(f"  {'parse_twilio_form':<28} {fast * 1e6:8.1f} us/body  ({slow / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Re-run farming context extraction over archived transcripts.
+
+Input is a text file (one transcript per line) or JSONL (one object per
+line with a text field). Results stream out as JSONL, CSV or Parquet, in
+input order, using a process pool sized to the machine by default.
+
+    python scripts/extract_contexts.py transcripts.jsonl -o contexts.jsonl
+    python scripts/extract_contexts.py calls.txt -o contexts.csv --workers 8
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.batch_context import extract_contexts, read_transcripts, write_csv, write_jsonl, write_parquet
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="transcript file (.txt or .jsonl)")
+    parser.add_argument("-o", "--output", default="-", help="output file; format from extension (.jsonl, .csv, .parquet), '-' for stdout JSONL")
+    parser.add_argument("--format", choices=["jsonl", "csv", "parquet"], help="override the output format")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="transcripts per worker task")
+    parser.add_argument("--text-field", default="text", help="JSONL field holding the transcript")
+    parser.add_argument("--id-field", default="id", help="JSONL field holding the transcript id")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    output_format = args.format or os.path.splitext(args.output)[1].lstrip(".") or "jsonl"
+    if args.output == "-":
+        output_format = args.format or "jsonl"
+
+    transcripts = read_transcripts(args.input, text_field=args.text_field, id_field=args.id_field)
+    results = extract_contexts(transcripts, workers=args.workers, chunk_size=args.chunk_size)
+
+    started = time.perf_counter()
+    if output_format == "parquet":
+        count = write_parquet(results, args.output)
+    else:
+        writer = write_csv if output_format == "csv" else write_jsonl
+        if args.output == "-":
+            count = writer(results, sys.stdout)
+        else:
+            with open(args.output, "w", encoding="utf-8", newline="") as out:
+                count = writer(results, out)
+
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else 0.0
+    print(f"Extracted context from {count} transcripts in {elapsed:.1f}s ({rate:.0f}/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
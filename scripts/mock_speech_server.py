@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Vakyansh STT and TTS endpoints, for load testing.
+
+Implements the request/response shapes STTService and TTSService use:
+
+    POST /stt   multipart form: audio=<file>, language=<code>  ->  {"text": "..."}
+    POST /tts   JSON {"text", "voice", "language"}              ->  audio/wav bytes
+    GET  /health
+
+Latency, error rate and payload size are configurable, and all randomness
+comes from one seeded generator so runs are reproducible. Latency specs:
+
+    constant:0.2            always 200 ms
+    uniform:0.1,0.5         uniform between 100 and 500 ms
+    normal:0.3,0.05         mean 300 ms, stddev 50 ms (clamped at 0)
+    lognormal:-1.2,0.5      exp(N(mu, sigma)) seconds, a long right tail
+    exponential:0.25        mean 250 ms
+
+Example:
+
+    python scripts/mock_speech_server.py --port 8001 --stt-latency lognormal:-1.2,0.5 --error-rate 0.02
+    VAKYANSH_STT_URL=http://localhost:8001/stt VAKYANSH_TTS_URL=http://localhost:8001/tts python main.py
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+from typing import Callable
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.audio_codec import pcm16_to_wav
+
+TRANSCRIPTS = [
+    "Haryana mein gehun ki kheti kar raha hun, paani ki kami hai",
+    "Punjab mein dhan ki kheti, kali mitti, paani bharpur hai",
+    "kaunsi dawa use karein",
+    "mere tamatar ke patte peele ho rahe hain",
+    "khad kitni daalni chahiye",
+]
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """Turn a ``kind:params`` spec into a sampler returning seconds"""
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(",") if value]
+
+    if kind == "constant":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda: math.exp(rng.gauss(values[0], values[1]))
+    if kind == "exponential":
+        return lambda: rng.expovariate(1.0 / values[0])
+    raise ValueError(f"Unknown latency distribution '{kind}'")
+
+
+def create_app(
+    stt_latency: str = "constant:0",
+    tts_latency: str = "constant:0",
+    error_rate: float = 0.0,
+    transcript_words: int = 0,
+    tts_seconds_per_char: float = 0.06,
+    sample_rate: int = 8000,
+    seed: int = 42,
+) -> FastAPI:
+    """Build the mock app; ``transcript_words=0`` returns canned farmer utterances as-is"""
+    rng = random.Random(seed)
+    stt_delay = parse_latency(stt_latency, rng)
+    tts_delay = parse_latency(tts_latency, rng)
+    stats = {"stt_requests": 0, "tts_requests": 0, "errors": 0}
+
+    app = FastAPI(title="Mock Speech Server")
+
+    def should_fail() -> bool:
+        if rng.random() < error_rate:
+            stats["errors"] += 1
+            return True
+        return False
+
+    @app.post("/stt")
+    async def stt(request: Request):
+        stats["stt_requests"] += 1
+        form = await request.form()
+        await asyncio.sleep(stt_delay())
+        if should_fail():
+            return JSONResponse({"error": "injected failure"}, status_code=500)
+
+        text = rng.choice(TRANSCRIPTS)
+        if transcript_words:
+            words = text.split()
+            text = " ".join(words[i % len(words)] for i in range(transcript_words))
+        return {"text": text, "language": form.get("language")}
+
+    @app.post("/tts")
+    async def tts(request: Request):
+        stats["tts_requests"] += 1
+        payload = await request.json()
+        await asyncio.sleep(tts_delay())
+        if should_fail():
+            return JSONResponse({"error": "injected failure"}, status_code=500)
+
+        # A quiet tone whose length follows the text, like real synthesis
+        seconds = max(0.2, len(payload.get("text", "")) * tts_seconds_per_char)
+        t = np.arange(int(sample_rate * seconds)) / sample_rate
+        samples = (2000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+        return Response(content=pcm16_to_wav(samples, sample_rate), media_type="audio/wav")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy", **stats}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8001)))
+    parser.add_argument("--stt-latency", default=os.environ.get("MOCK_STT_LATENCY", "lognormal:-1.2,0.5"))
+    parser.add_argument("--tts-latency", default=os.environ.get("MOCK_TTS_LATENCY", "lognormal:-1.0,0.5"))
+    parser.add_argument("--error-rate", type=float, default=float(os.environ.get("MOCK_ERROR_RATE", 0.0)))
+    parser.add_argument("--transcript-words", type=int, default=0, help="fixed transcript length in words (0 = canned utterances)")
+    parser.add_argument("--tts-seconds-per-char", type=float, default=0.06, help="synthesized audio length per input character")
+    parser.add_argument("--sample-rate", type=int, default=8000)
+    parser.add_argument("--seed", type=int, default=int(os.environ.get("MOCK_SEED", 42)))
+    args = parser.parse_args()
+
+    app = create_app(
+        stt_latency=args.stt_latency,
+        tts_latency=args.tts_latency,
+        error_rate=args.error_rate,
+        transcript_words=args.transcript_words,
+        tts_seconds_per_char=args.tts_seconds_per_char,
+        sample_rate=args.sample_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Pre-render the greeting and query prompts for every language into the
+prompt audio cache, so /voice and /process_context can <Play> them with no
+synthesis at call time. Only prompts whose text or voice changed since the
+last run are re-synthesized.
+
+    python scripts/render_prompts.py [--cache-dir ./audio_cache/prompts] [--format mulaw] [--force]
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from services.audio_format import OUTPUT_FORMATS
+from services.prompt_audio import PromptAudioCache
+from services.tts_service import TTSService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cache-dir", default=Config.PROMPT_AUDIO_DIR, help="prompt audio directory")
+    parser.add_argument("--format", default=Config.TTS_OUTPUT_FORMAT, choices=OUTPUT_FORMATS, help="audio output format")
+    parser.add_argument("--force", action="store_true", help="re-render every prompt")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    cache = PromptAudioCache(args.cache_dir, TTSService(Config.VAKYANSH_TTS_URL), output_format=args.format)
+    summary = cache.build(force=args.force)
+
+    print(f"Rendered {summary['rendered']}, unchanged {summary['unchanged']}, failed {summary['failed']}")
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Production launcher for the Farmer AI Assistant.
+
+Sizes the worker pool from the CPUs and memory actually available (cgroup
+limits included) and the model's footprint, then serves the app with
+gunicorn and uvicorn workers when gunicorn is installed: the app is imported
+once in the master before forking (so the model weights are shared
+copy-on-write), and workers are recycled gracefully after a bounded number
+of requests. Without gunicorn it falls back to uvicorn's own multi-worker
+mode. uvloop and httptools are used when installed. Never reloads.
+
+    python server.py [main:app | main_railway:app] [--workers N] [--dry-run]
+"""
+
+import argparse
+import importlib.util
+import logging
+import math
+import os
+import sys
+from typing import Any, Dict, List
+
+from config import Config
+
+logger = logging.getLogger("server")
+
+# Param-1-2.9B-Instruct, loaded in float32 on CPU and float16 on CUDA
+MODEL_PARAMETERS = 2.9e9
+
+# Headroom left for the OS, page cache and the master process
+MEMORY_RESERVE = 0.1
+
+
+def cpu_count() -> int:
+    """CPUs this process may use, honouring CPU affinity and a cgroup CPU quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    quota = None
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            limit, period = f.read().split()
+        if limit != "max":
+            quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                limit = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = int(f.read())
+            if limit > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return cpus
+
+
+def memory_limit() -> int:
+    """Bytes of memory available: the container's cgroup limit, or the machine's RAM"""
+    physical = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value.isdigit():
+            # cgroup v1 reports "no limit" as a huge number
+            return min(physical, int(value))
+    return physical
+
+
+def model_memory(config, app: str) -> int:
+    """Resident size of the AI model the app loads at import, in bytes"""
+    if not app.startswith("main:"):
+        # The Railway app answers without a local model
+        return 0
+    if config.MODEL_MEMORY_MB:
+        return config.MODEL_MEMORY_MB * 1024 * 1024
+    return int(MODEL_PARAMETERS * (2 if config.DEVICE == "cuda" else 4))
+
+
+def plan_workers(cpus: int, memory: int, model_bytes: int, worker_bytes: int, preload: bool) -> int:
+    """How many workers fit.
+
+    Answer generation is CPU-bound, so more workers than CPUs only adds
+    contention. With preload the model is paid for once, in the master;
+    without it every worker loads its own copy.
+    """
+    usable = memory * (1 - MEMORY_RESERVE) - (model_bytes if preload else 0)
+    per_worker = worker_bytes + (0 if preload else model_bytes)
+    by_memory = int(usable // per_worker) if usable > 0 else 0
+    return max(1, min(cpus, by_memory))
+
+
+def single_worker_reasons(config, app: str) -> List[str]:
+    """Why this configuration keeps per-call state inside one process, if it does"""
+    reasons = []
+    stateless = app.startswith("main:") and config.STATELESS_SESSIONS
+    if not config.REDIS_URL and not stateless:
+        reasons.append("sessions are process-local (set REDIS_URL or STATELESS_SESSIONS)")
+    if app.startswith("main:") and config.DEFERRED_ANSWERS and not stateless:
+        reasons.append("deferred answers are polled from the worker that generated them "
+                       "(set DEFERRED_ANSWERS=False)")
+    if app.startswith("main:") and not config.AUDIO_STORE_DIR:
+        reasons.append("synthesized audio clips are kept in process memory (set AUDIO_STORE_DIR)")
+    return reasons
+
+
+def server_plan(config, app: str, workers: int = 0, gunicorn: bool = True) -> Dict[str, Any]:
+    """Worker count and process options for ``app`` under ``config``"""
+    cpus = cpu_count()
+    memory = memory_limit()
+    model_bytes = model_memory(config, app)
+    # CUDA cannot be initialized before fork, so each worker has to load the model itself
+    preload = gunicorn and config.DEVICE != "cuda"
+
+    if not workers:
+        workers = config.SERVER_WORKERS or plan_workers(
+            cpus, memory, model_bytes, config.SERVER_WORKER_MEMORY_MB * 1024 * 1024, preload
+        )
+        if config.DEVICE == "cuda":
+            workers = 1
+
+    max_requests = config.SERVER_MAX_REQUESTS if gunicorn else 0
+    reasons = single_worker_reasons(config, app)
+    if reasons:
+        if workers > 1:
+            logger.warning(f"Running 1 worker instead of {workers}: " + "; ".join(reasons))
+        workers = 1
+        # Recycling the only worker would drop every live call's state
+        max_requests = 0
+
+    return {
+        "workers": workers,
+        "preload": preload,
+        "max_requests": max_requests,
+        "cpus": cpus,
+        "memory_mb": memory // (1024 * 1024),
+        "model_mb": model_bytes // (1024 * 1024),
+        # Split the CPUs between the workers' inference threads instead of oversubscribing
+        "threads_per_worker": max(1, cpus // workers),
+    }
+
+
+def installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def run_gunicorn(app: str, config, plan: Dict[str, Any]):
+    from gunicorn.app.base import BaseApplication
+    from gunicorn.util import import_app
+
+    options = {
+        "bind": f"{config.HOST}:{config.PORT}",
+        "workers": plan["workers"],
+        # Picks uvloop and httptools when they are installed
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": plan["preload"],
+        "max_requests": plan["max_requests"],
+        "max_requests_jitter": config.SERVER_MAX_REQUESTS_JITTER if plan["max_requests"] else 0,
+        "graceful_timeout": config.SERVER_GRACEFUL_TIMEOUT,
+        "timeout": config.SERVER_TIMEOUT,
+        "reload": False,
+    }
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return import_app(app)
+
+    Application().run()
+
+
+def run_uvicorn(app: str, config, plan: Dict[str, Any]):
+    import uvicorn
+
+    uvicorn.run(
+        app,
+        host=config.HOST,
+        port=config.PORT,
+        workers=plan["workers"],
+        loop="uvloop" if installed("uvloop") else "asyncio",
+        http="httptools" if installed("httptools") else "h11",
+        timeout_graceful_shutdown=config.SERVER_GRACEFUL_TIMEOUT,
+        reload=False
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Farmer AI Assistant in production")
+    parser.add_argument("app", nargs="?", default="main:app", help="ASGI app to serve (module:attribute)")
+    parser.add_argument("--workers", type=int, default=0, help="Worker count (default: from CPUs and memory)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = Config()
+    gunicorn = installed("gunicorn")
+    plan = server_plan(config, args.app, args.workers, gunicorn)
+
+    logger.info(
+        f"Serving {args.app} with {'gunicorn' if gunicorn else 'uvicorn'}: {plan['workers']} workers "
+        f"({plan['cpus']} CPUs, {plan['memory_mb']} MB, model {plan['model_mb']} MB), "
+        f"preload={plan['preload']}, max_requests={plan['max_requests']}, "
+        f"loop={'uvloop' if installed('uvloop') else 'asyncio'}, http={'httptools' if installed('httptools') else 'h11'}"
+    )
+    if args.dry_run:
+        return
+    if not gunicorn:
+        logger.warning("gunicorn is not installed: no preload and no worker recycling")
+
+    os.environ.setdefault("OMP_NUM_THREADS", str(plan["threads_per_worker"]))
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if gunicorn:
+        run_gunicorn(args.app, config, plan)
+    else:
+        run_uvicorn(args.app, config, plan)
+
+
+if __name__ == "__main__":
+    main()
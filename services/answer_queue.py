@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Dict, Optional, Tuple
+
+
+class AnswerQueue:
+    """Deferred answers keyed by call SID.
+
+    The webhook that receives the question submits the answer coroutine and
+    returns straight away; the poll endpoint Twilio is redirected to waits a
+    bounded time for it. One answer per call is kept: submitting again
+    cancels the previous one. Entries nobody collects expire after ``ttl``.
+    """
+
+    READY = "ready"
+    PENDING = "pending"
+    FAILED = "failed"
+    MISSING = "missing"
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self.logger = logging.getLogger(__name__)
+        self._jobs = {}
+        self._stats = {"submitted": 0, "delivered": 0, "failed": 0, "expired": 0, "discarded": 0}
+
+    def submit(self, key: str, answer: Awaitable) -> None:
+        """Start computing ``answer`` in the background for ``key``"""
+        self._purge()
+        self.discard(key, count=False)
+        self._jobs[key] = (asyncio.ensure_future(answer), time.monotonic())
+        self._stats["submitted"] += 1
+
+    async def wait(self, key: str, timeout: float) -> Tuple[str, Optional[Any]]:
+        """Wait up to ``timeout`` seconds; returns (status, answer) and forgets delivered answers"""
+        job = self._jobs.get(key)
+        if job is None:
+            return self.MISSING, None
+
+        task, _ = job
+        if not task.done():
+            try:
+                # Shielded: a poll timing out must not cancel the answer
+                await asyncio.wait_for(asyncio.shield(task), timeout)
+            except asyncio.TimeoutError:
+                return self.PENDING, None
+            except Exception:
+                pass
+
+        self._jobs.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            if not task.cancelled():
+                self.logger.error(f"Deferred answer for {key} failed: {task.exception()}")
+            self._stats["failed"] += 1
+            return self.FAILED, None
+
+        self._stats["delivered"] += 1
+        return self.READY, task.result()
+
+    def age(self, key: str) -> Optional[float]:
+        """Seconds since the answer for ``key`` was submitted"""
+        job = self._jobs.get(key)
+        return time.monotonic() - job[1] if job else None
+
+    def discard(self, key: str, count: bool = True) -> None:
+        """Cancel and forget the answer for ``key`` (e.g. the caller hung up)"""
+        job = self._jobs.pop(key, None)
+        if job is not None:
+            job[0].cancel()
+            if count:
+                self._stats["discarded"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        stats = dict(self._stats)
+        stats["pending"] = sum(1 for task, _ in self._jobs.values() if not task.done())
+        stats["waiting_for_poll"] = len(self._jobs) - stats["pending"]
+        return stats
+
+    def _purge(self):
+        now = time.monotonic()
+        for key, (task, submitted) in list(self._jobs.items()):
+            if now - submitted > self.ttl:
+                task.cancel()
+                del self._jobs[key]
+                self._stats["expired"] += 1
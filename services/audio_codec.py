@@ -0,0 +1,77 @@
+import io
+import struct
+import wave
+
+import numpy as np
+
+
+def _build_ulaw_decode_table() -> np.ndarray:
+    """G.711 mu-law byte -> 16-bit linear PCM"""
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    sign = codes & 0x80
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(sign != 0, -magnitude, magnitude).astype(np.int16)
+
+
+ULAW_DECODE_TABLE = _build_ulaw_decode_table()
+
+
+def ulaw_to_pcm16(data: bytes) -> np.ndarray:
+    """Decode mu-law bytes to int16 samples"""
+    return ULAW_DECODE_TABLE[np.frombuffer(data, dtype=np.uint8)]
+
+
+def pcm16_to_ulaw(samples: np.ndarray) -> bytes:
+    """Encode int16 samples as G.711 mu-law bytes"""
+    pcm = samples.astype(np.int32)
+    sign = np.where(pcm < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(pcm), 32635) + 0x84
+    exponent = np.clip(np.floor(np.log2(magnitude)).astype(np.int32) - 7, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8).tobytes()
+
+
+def resample_pcm16(samples: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+    """Resample int16 samples, low-pass filtering first when downsampling"""
+    if from_rate == to_rate or len(samples) == 0:
+        return samples.astype(np.int16)
+
+    signal = samples.astype(np.float32)
+    if to_rate < from_rate:
+        # Hamming-windowed sinc at the new Nyquist frequency, so speech energy
+        # above it does not alias into the band
+        cutoff = to_rate / from_rate / 2
+        taps = np.arange(-32, 33)
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.hamming(len(taps))
+        signal = np.convolve(signal, kernel / kernel.sum(), mode="same")
+
+    count = int(round(len(signal) * to_rate / from_rate))
+    positions = np.arange(count) * (from_rate / to_rate)
+    resampled = np.interp(positions, np.arange(len(signal)), signal)
+    return np.clip(np.round(resampled), -32768, 32767).astype(np.int16)
+
+
+def pcm16_to_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Wrap mono int16 samples in a WAV container"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def ulaw_to_wav(data: bytes, sample_rate: int) -> bytes:
+    """Wrap mono mu-law bytes in a WAV container (format 7, with the fact chunk non-PCM WAVs need)"""
+    fmt = struct.pack("<HHIIHHH", 7, 1, sample_rate, sample_rate, 1, 8, 0)
+    body = b"".join([
+        b"WAVE",
+        b"fmt ", struct.pack("<I", len(fmt)), fmt,
+        b"fact", struct.pack("<II", 4, len(data)),
+        b"data", struct.pack("<I", len(data)), data,
+        b"\0" if len(data) & 1 else b"",
+    ])
+    return b"RIFF" + struct.pack("<I", len(body)) + body
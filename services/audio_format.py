@@ -0,0 +1,41 @@
+import io
+from typing import Tuple
+
+import numpy as np
+from pydub import AudioSegment
+
+from services.audio_codec import pcm16_to_ulaw, pcm16_to_wav, resample_pcm16, ulaw_to_wav
+from services.audio_stream import WavStreamDecoder
+
+# "native" is whatever the engine produced (MP3 from Edge/gTTS); "wav" is
+# 16-bit PCM and "mulaw" is 8-bit G.711 mu-law, both mono at the telephony rate
+OUTPUT_FORMATS = ("native", "wav", "mulaw")
+TELEPHONY_SAMPLE_RATE = 8000
+
+
+def decode_audio(audio_data: bytes) -> Tuple[np.ndarray, int]:
+    """Decode engine output to mono int16 samples and their sample rate"""
+    if audio_data[:4] == b"RIFF":
+        decoder = WavStreamDecoder()
+        samples = decoder.feed(audio_data)
+        if samples is None:
+            raise ValueError("WAV has no audio frames")
+        return samples, decoder.sample_rate
+
+    # Compressed formats (MP3) go through pydub/ffmpeg
+    segment = AudioSegment.from_file(io.BytesIO(audio_data)).set_channels(1).set_sample_width(2)
+    return np.frombuffer(segment.raw_data, dtype="<i2"), segment.frame_rate
+
+
+def convert_audio(audio_data: bytes, output_format: str, sample_rate: int = TELEPHONY_SAMPLE_RATE) -> bytes:
+    """Convert synthesized audio to one of OUTPUT_FORMATS"""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown audio output format '{output_format}'")
+    if output_format == "native":
+        return audio_data
+
+    samples, rate = decode_audio(audio_data)
+    samples = resample_pcm16(samples, rate, sample_rate)
+    if output_format == "mulaw":
+        return ulaw_to_wav(pcm16_to_ulaw(samples), sample_rate)
+    return pcm16_to_wav(samples, sample_rate)
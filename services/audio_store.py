@@ -0,0 +1,228 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+CONTENT_TYPES = {"mp3": "audio/mpeg", "wav": "audio/wav", "ulaw": "audio/basic"}
+
+# Clip ids are content hashes, so a URL always names the same bytes
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_CLIP_ID = re.compile(r"^[0-9a-f]{32}\.(mp3|wav|ulaw)$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def audio_content_type(audio_data: bytes) -> Tuple[str, str]:
+    """Sniff (extension, MIME type) from the audio bytes the TTS chain returned"""
+    if audio_data[:4] == b"RIFF":
+        return "wav", CONTENT_TYPES["wav"]
+    return "mp3", CONTENT_TYPES["mp3"]
+
+
+def clip_id_for(audio_data: bytes, extension: Optional[str] = None) -> str:
+    """Content-addressed clip id: hash of the audio plus its file extension"""
+    extension = extension or audio_content_type(audio_data)[0]
+    return f"{hashlib.blake2b(audio_data, digest_size=16).hexdigest()}.{extension}"
+
+
+def is_clip_id(clip_id: str) -> bool:
+    return bool(_CLIP_ID.match(clip_id))
+
+
+class AudioStore:
+    """Bounded two-tier LRU of synthesized clips, keyed by content hash.
+
+    The memory tier holds up to ``memory_bytes`` of recently used clips; the
+    optional disk tier under ``disk_dir`` holds up to ``disk_bytes`` and is
+    re-indexed (oldest first) on startup. Both tiers evict least recently
+    used clips first. Clips missing from the index are still looked up on
+    disk, so workers sharing ``disk_dir`` serve each other's clips.
+    """
+
+    def __init__(self, memory_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None,
+                 disk_bytes: int = 1024 * 1024 * 1024):
+        self.memory_bytes = memory_bytes
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+        self.logger = logging.getLogger(__name__)
+
+        self._memory = OrderedDict()
+        self._memory_used = 0
+        self._disk = OrderedDict()
+        self._disk_used = 0
+        self._lock = threading.Lock()
+        self._stats = {"puts": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._index_disk()
+
+    def put(self, audio_data: bytes, extension: Optional[str] = None) -> str:
+        """Store a clip and return its id; storing the same audio twice is a no-op"""
+        clip_id = clip_id_for(audio_data, extension)
+        with self._lock:
+            self._stats["puts"] += 1
+            self._remember(clip_id, audio_data)
+            on_disk = clip_id in self._disk
+
+        if self.disk_dir and not on_disk:
+            self._write_disk(clip_id, audio_data)
+        return clip_id
+
+    def get(self, clip_id: str) -> Optional[bytes]:
+        if not is_clip_id(clip_id):
+            return None
+
+        with self._lock:
+            audio_data = self._memory.get(clip_id)
+            if audio_data is not None:
+                self._memory.move_to_end(clip_id)
+                self._stats["memory_hits"] += 1
+                return audio_data
+            on_disk = clip_id in self._disk
+
+        audio_data = None
+        if on_disk:
+            audio_data = self._read_disk(clip_id)
+        elif self.disk_dir:
+            # Another worker may have written it after this one indexed the directory
+            audio_data = self._read_disk(clip_id, indexed=False)
+
+        with self._lock:
+            if audio_data is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            if clip_id in self._disk:
+                self._disk.move_to_end(clip_id)
+            else:
+                self._disk[clip_id] = len(audio_data)
+                self._disk_used += len(audio_data)
+            self._remember(clip_id, audio_data)
+        return audio_data
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "memory_clips": len(self._memory),
+                "memory_bytes": self._memory_used,
+                "disk_clips": len(self._disk),
+                "disk_bytes": self._disk_used,
+            })
+        return stats
+
+    def _remember(self, clip_id: str, audio_data: bytes):
+        # Caller holds the lock
+        if clip_id in self._memory:
+            self._memory.move_to_end(clip_id)
+            return
+        if len(audio_data) > self.memory_bytes:
+            return
+
+        self._memory[clip_id] = audio_data
+        self._memory_used += len(audio_data)
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted)
+            self._stats["evictions"] += 1
+
+    def _index_disk(self):
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if is_clip_id(name):
+                stat = os.stat(os.path.join(self.disk_dir, name))
+                entries.append((stat.st_mtime, name, stat.st_size))
+
+        for _, name, size in sorted(entries):
+            self._disk[name] = size
+            self._disk_used += size
+
+    def _read_disk(self, clip_id: str, indexed: bool = True) -> Optional[bytes]:
+        try:
+            with open(os.path.join(self.disk_dir, clip_id), "rb") as f:
+                return f.read()
+        except OSError as e:
+            if not indexed and isinstance(e, FileNotFoundError):
+                return None
+            self.logger.error(f"Audio store read failed: {e}")
+            with self._lock:
+                size = self._disk.pop(clip_id, None)
+                if size is not None:
+                    self._disk_used -= size
+            return None
+
+    def _write_disk(self, clip_id: str, audio_data: bytes):
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.disk_dir)
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio_data)
+            os.replace(temp_path, os.path.join(self.disk_dir, clip_id))
+        except OSError as e:
+            self.logger.error(f"Audio store write failed: {e}")
+            return
+
+        evicted = []
+        with self._lock:
+            if clip_id not in self._disk:
+                self._disk[clip_id] = len(audio_data)
+                self._disk_used += len(audio_data)
+            while self._disk_used > self.disk_bytes and len(self._disk) > 1:
+                name, size = self._disk.popitem(last=False)
+                self._disk_used -= size
+                evicted.append(name)
+
+        for name in evicted:
+            try:
+                os.unlink(os.path.join(self.disk_dir, name))
+            except OSError:
+                pass
+
+
+def clip_response(clip_id: str, audio_data: bytes, range_header: Optional[str] = None,
+                  if_none_match: Optional[str] = None) -> Tuple[int, Dict[str, str], bytes]:
+    """HTTP semantics for serving a clip: returns (status, headers, body).
+
+    Supports conditional requests (ETag / If-None-Match -> 304) and a single
+    byte range (-> 206, or 416 if unsatisfiable).
+    """
+    extension = clip_id.rsplit(".", 1)[-1]
+    etag = f'"{clip_id}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+        "Content-Type": CONTENT_TYPES.get(extension, "application/octet-stream"),
+    }
+
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return 304, headers, b""
+
+    total = len(audio_data)
+    if not range_header:
+        return 200, headers, audio_data
+
+    match = _RANGE.match(range_header.strip())
+    if not match or not (match.group(1) or match.group(2)):
+        headers["Content-Range"] = f"bytes */{total}"
+        return 416, headers, b""
+
+    start, end = match.groups()
+    if start:
+        start = int(start)
+        end = min(int(end), total - 1) if end else total - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(0, total - int(end))
+        end = total - 1
+
+    if start >= total or start > end:
+        headers["Content-Range"] = f"bytes */{total}"
+        return 416, headers, b""
+
+    headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+    return 206, headers, audio_data[start:end + 1]
@@ -0,0 +1,195 @@
+import struct
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from services.audio_codec import ulaw_to_pcm16
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_MULAW = 7
+
+
+class WavStreamDecoder:
+    """Incremental WAV parser that turns arbitrary byte chunks into mono int16 samples.
+
+    Handles 16-bit PCM and 8-bit mu-law (what Twilio recordings use). Only a
+    partial header or a partial sample frame is ever buffered between feeds.
+    """
+
+    def __init__(self):
+        self.sample_rate = None
+        self.channels = None
+        self._format = None
+        self._sample_width = None
+        self._buffer = b""
+        self._in_data = False
+        self._skip = 0
+
+    def feed(self, chunk: bytes) -> Optional[np.ndarray]:
+        """Consume a chunk; returns the samples it completed, or None"""
+        self._buffer += chunk
+
+        if not self._in_data:
+            self._parse_header()
+            if not self._in_data:
+                return None
+
+        frame_bytes = self._sample_width * self.channels
+        usable = len(self._buffer) - len(self._buffer) % frame_bytes
+        if usable == 0:
+            return None
+
+        data, self._buffer = self._buffer[:usable], self._buffer[usable:]
+        if self._format == WAVE_FORMAT_MULAW:
+            samples = ulaw_to_pcm16(data)
+        else:
+            samples = np.frombuffer(data, dtype="<i2")
+
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1).astype(np.int16)
+        return samples
+
+    def _parse_header(self):
+        if self._format is None:
+            if len(self._buffer) < 12:
+                return
+            if self._buffer[:4] != b"RIFF" or self._buffer[8:12] != b"WAVE":
+                raise ValueError("Not a RIFF/WAVE stream")
+            self._buffer = self._buffer[12:]
+            self._format = 0
+
+        while True:
+            if self._skip:
+                skipped = min(self._skip, len(self._buffer))
+                self._buffer = self._buffer[skipped:]
+                self._skip -= skipped
+                if self._skip:
+                    return
+
+            if len(self._buffer) < 8:
+                return
+
+            chunk_id = self._buffer[:4]
+            chunk_size = struct.unpack("<I", self._buffer[4:8])[0]
+
+            if chunk_id == b"data":
+                if self.sample_rate is None:
+                    raise ValueError("WAV data chunk before fmt chunk")
+                self._buffer = self._buffer[8:]
+                self._in_data = True
+                return
+
+            if chunk_id == b"fmt ":
+                if len(self._buffer) < 8 + 16:
+                    return
+                audio_format, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", self._buffer[8:24])
+                if audio_format not in (WAVE_FORMAT_PCM, WAVE_FORMAT_MULAW):
+                    raise ValueError(f"Unsupported WAV format {audio_format}")
+                if audio_format == WAVE_FORMAT_PCM and bits != 16:
+                    raise ValueError(f"Unsupported PCM sample width {bits}")
+                self._format = audio_format
+                self.channels = channels
+                self.sample_rate = sample_rate
+                self._sample_width = bits // 8
+
+            # Skip the rest of this chunk (chunks are word-aligned)
+            self._buffer = self._buffer[8:]
+            self._skip = chunk_size + (chunk_size & 1)
+
+
+class SpeechSegmenter:
+    """Energy VAD plus segmenter over a stream of int16 samples.
+
+    Audio is split into ``frame_ms`` frames; a frame is voiced when its RMS
+    exceeds ``energy_threshold``. A segment closes after ``min_silence_ms`` of
+    silence or once it reaches ``max_segment_ms``, so at most one segment
+    (plus a partial frame) is held in memory. Segments with less than
+    ``min_speech_ms`` of voiced audio are dropped as noise.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        frame_ms: int = 30,
+        energy_threshold: float = 500.0,
+        min_silence_ms: int = 600,
+        min_speech_ms: int = 250,
+        max_segment_ms: int = 15000,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_size = max(1, sample_rate * frame_ms // 1000)
+        self.energy_threshold = energy_threshold
+        self.silence_frames_to_close = max(1, min_silence_ms // frame_ms)
+        self.min_voiced_frames = max(1, min_speech_ms // frame_ms)
+        self.max_frames = max(1, max_segment_ms // frame_ms)
+
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._frames = []
+        self._voiced = 0
+        self._trailing_silence = 0
+
+    def feed(self, samples: np.ndarray) -> List[np.ndarray]:
+        """Consume samples; returns any segments that closed"""
+        if self._pending.size:
+            samples = np.concatenate([self._pending, samples])
+
+        closed = []
+        count = len(samples) // self.frame_size
+        for i in range(count):
+            frame = samples[i * self.frame_size:(i + 1) * self.frame_size]
+            segment = self._add_frame(frame)
+            if segment is not None:
+                closed.append(segment)
+
+        self._pending = samples[count * self.frame_size:].copy()
+        return closed
+
+    def flush(self) -> List[np.ndarray]:
+        """Close whatever segment is open at end of stream"""
+        segment = self._close()
+        return [segment] if segment is not None else []
+
+    def _add_frame(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        rms = float(np.sqrt(np.mean(frame.astype(np.float32) ** 2)))
+        voiced = rms >= self.energy_threshold
+
+        if not self._frames and not voiced:
+            return None
+
+        self._frames.append(frame)
+        if voiced:
+            self._voiced += 1
+            self._trailing_silence = 0
+        else:
+            self._trailing_silence += 1
+
+        if self._trailing_silence >= self.silence_frames_to_close or len(self._frames) >= self.max_frames:
+            return self._close()
+        return None
+
+    def _close(self) -> Optional[np.ndarray]:
+        frames, voiced = self._frames, self._voiced
+        self._frames, self._voiced, self._trailing_silence = [], 0, 0
+
+        if voiced < self.min_voiced_frames:
+            return None
+        return np.concatenate(frames)
+
+
+def iter_speech_segments(chunks: Iterable[bytes], **segmenter_options) -> Iterator[tuple]:
+    """Yield ``(samples, sample_rate)`` speech segments from a WAV byte stream as they close"""
+    decoder = WavStreamDecoder()
+    segmenter = None
+
+    for chunk in chunks:
+        samples = decoder.feed(chunk)
+        if samples is None:
+            continue
+        if segmenter is None:
+            segmenter = SpeechSegmenter(decoder.sample_rate, **segmenter_options)
+        for segment in segmenter.feed(samples):
+            yield segment, decoder.sample_rate
+
+    if segmenter is not None:
+        for segment in segmenter.flush():
+            yield segment, decoder.sample_rate
@@ -0,0 +1,128 @@
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from services.gazetteer import CONTEXT_SLOTS, get_default_gazetteer
+
+# Transcript records are (id, text); ids default to the line number
+Transcript = Tuple[str, str]
+
+
+def read_transcripts(path: str, text_field: str = "text", id_field: str = "id") -> Iterator[Transcript]:
+    """Stream transcripts from a file without loading it into memory.
+
+    ``.jsonl`` files are read as one JSON object per line using ``text_field``
+    and ``id_field``; anything else is treated as one transcript per line.
+    """
+    is_jsonl = path.endswith(".jsonl")
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+
+            if is_jsonl:
+                record = json.loads(line)
+                yield str(record.get(id_field, line_number)), record.get(text_field) or ""
+            else:
+                yield str(line_number), line
+
+
+def _extract_chunk(chunk: List[Transcript]) -> List[Dict[str, Optional[str]]]:
+    """Worker entry point; each process compiles the gazetteer once and reuses it"""
+    gazetteer = get_default_gazetteer()
+    results = []
+    for transcript_id, text in chunk:
+        context = gazetteer.extract(text)
+        context["id"] = transcript_id
+        results.append(context)
+    return results
+
+
+def _chunks(items: Iterable, chunk_size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def extract_contexts(
+    transcripts: Iterable,
+    workers: Optional[int] = None,
+    chunk_size: int = 2000,
+    max_pending: Optional[int] = None,
+) -> Iterator[Dict[str, Optional[str]]]:
+    """Extract farming context from many transcripts, yielding results in input order.
+
+    ``transcripts`` may hold plain strings or ``(id, text)`` pairs. Work is
+    split into chunks so per-task pickling overhead is amortized, and at most
+    ``max_pending`` chunks (default: two per worker) are in flight, so memory
+    stays bounded however long the input is. ``workers=1`` runs in-process.
+    """
+    workers = workers or os.cpu_count() or 1
+    records = (
+        item if isinstance(item, tuple) else (str(index), item)
+        for index, item in enumerate(transcripts, 1)
+    )
+
+    if workers == 1:
+        for chunk in _chunks(records, chunk_size):
+            yield from _extract_chunk(chunk)
+        return
+
+    max_pending = max_pending or workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in _chunks(records, chunk_size):
+            pending.append(executor.submit(_extract_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+
+        for future in pending:
+            yield from future.result()
+
+
+def write_jsonl(results: Iterable[Dict[str, Optional[str]]], out: TextIO) -> int:
+    """Write one JSON object per result; returns the number written"""
+    count = 0
+    for result in results:
+        out.write(json.dumps(result, ensure_ascii=False))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def write_csv(results: Iterable[Dict[str, Optional[str]]], out: TextIO) -> int:
+    """Write results as columns (id plus one column per slot); returns the number written"""
+    writer = csv.DictWriter(out, fieldnames=("id",) + CONTEXT_SLOTS)
+    writer.writeheader()
+    count = 0
+    for result in results:
+        writer.writerow(result)
+        count += 1
+    return count
+
+
+def write_parquet(results: Iterable[Dict[str, Optional[str]]], path: str, batch_size: int = 50000) -> int:
+    """Write results to a Parquet file in row batches; requires pyarrow"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("pyarrow is required for Parquet output (pip install pyarrow)")
+
+    columns = ("id",) + CONTEXT_SLOTS
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for batch in _chunks(results, batch_size):
+            table = pa.Table.from_pydict({column: [row[column] for row in batch] for column in columns}, schema=schema)
+            writer.write_table(table)
+            count += len(batch)
+    return count
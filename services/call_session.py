@@ -0,0 +1,148 @@
+import hashlib
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from services.gazetteer import CONTEXT_SLOTS, get_default_gazetteer
+
+LANGUAGES = (
+    "hindi", "english", "punjabi", "gujarati", "marathi", "telugu",
+    "tamil", "kannada", "bengali", "odia", "assamese", "malayalam",
+)
+
+
+class Vocabulary:
+    """Two-way map between a slot's values and small integer codes.
+
+    Code 0 is "unknown". Values outside the seed list get the next free code,
+    so anything the extractor produces can be stored. Only the first
+    ``seeded`` codes are the same in every process running the same data;
+    later ones depend on arrival order and must not leave the process.
+    """
+
+    __slots__ = ("_codes", "_values", "seeded")
+
+    def __init__(self, values: Iterable[str] = ()):
+        self._codes = {None: 0}
+        self._values = [None]
+        for value in values:
+            self.code(value)
+        self.seeded = len(self._values) - 1
+
+    def code(self, value: Optional[str]) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def value(self, code: int) -> Optional[str]:
+        return self._values[code]
+
+    def __len__(self) -> int:
+        return len(self._values) - 1
+
+
+_vocabularies = None
+
+
+def get_vocabularies() -> Dict[str, Vocabulary]:
+    """Process-wide vocabularies, seeded from the gazetteer's canonical values"""
+    global _vocabularies
+    if _vocabularies is None:
+        values = get_default_gazetteer().values
+        vocabularies = {slot: Vocabulary(values.get(slot, ())) for slot in CONTEXT_SLOTS}
+        vocabularies["language"] = Vocabulary(LANGUAGES)
+        _vocabularies = vocabularies
+    return _vocabularies
+
+
+def vocabulary_fingerprint() -> bytes:
+    """Digest of the seeded vocabularies; equal fingerprints mean equal stable codes"""
+    digest = hashlib.blake2b(digest_size=8)
+    for slot, vocabulary in sorted(get_vocabularies().items()):
+        digest.update(slot.encode("utf-8"))
+        for code in range(1, vocabulary.seeded + 1):
+            digest.update(b"\0" + vocabulary.value(code).encode("utf-8"))
+    return digest.digest()
+
+
+class CallSession:
+    """State of one call, as compact as Python objects get.
+
+    ``__slots__`` removes the per-instance dict, and the language and the
+    five context slots are stored as small integer codes into shared
+    vocabularies instead of one string (and one nested dict) per call.
+    ``context`` rebuilds the dict the AI model expects on demand.
+
+    ``history`` holds the (query, answer) turns not yet folded into
+    ``summary`` (see ``ConversationMemory``). It is a tuple, so copies share
+    it safely and sessions without history share the empty one.
+    """
+
+    __slots__ = ("from_number", "turns", "last_activity", "history", "summary", "_language", "_location",
+                 "_crop", "_water_condition", "_soil_type", "_season")
+
+    def __init__(self, from_number: Optional[str] = None, language: str = "hindi",
+                 context: Optional[Dict[str, str]] = None, turns: int = 0,
+                 history: Tuple[Tuple[str, str], ...] = (), summary: str = ""):
+        vocabularies = get_vocabularies()
+        self.from_number = from_number
+        self.turns = turns
+        self.last_activity = 0.0
+        self.history = history
+        self.summary = summary
+        self._language = vocabularies["language"].code(language)
+        for slot in CONTEXT_SLOTS:
+            setattr(self, f"_{slot}", vocabularies[slot].code((context or {}).get(slot)))
+
+    @property
+    def language(self) -> str:
+        return get_vocabularies()["language"].value(self._language)
+
+    @language.setter
+    def language(self, language: str):
+        self._language = get_vocabularies()["language"].code(language)
+
+    @property
+    def context(self) -> Dict[str, str]:
+        """Known context slots as a dict (unknown slots are left out)"""
+        vocabularies = get_vocabularies()
+        context = {}
+        for slot in CONTEXT_SLOTS:
+            value = vocabularies[slot].value(getattr(self, f"_{slot}"))
+            if value is not None:
+                context[slot] = value
+        return context
+
+    @context.setter
+    def context(self, context: Dict[str, str]):
+        vocabularies = get_vocabularies()
+        for slot in CONTEXT_SLOTS:
+            setattr(self, f"_{slot}", vocabularies[slot].code(context.get(slot)))
+
+    def copy(self) -> "CallSession":
+        clone = CallSession.__new__(CallSession)
+        for name in CallSession.__slots__:
+            setattr(clone, name, getattr(self, name))
+        return clone
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"from_number": self.from_number, "context": self.context, "language": self.language,
+                "turns": self.turns}
+        if self.history:
+            data["history"] = [list(turn) for turn in self.history]
+        if self.summary:
+            data["summary"] = self.summary
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CallSession":
+        return cls(data.get("from_number"), data.get("language", "hindi"), data.get("context"),
+                   data.get("turns", 0), tuple(tuple(turn) for turn in data.get("history", ())),
+                   data.get("summary", ""))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CallSession) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"CallSession({self.to_dict()!r})"
+
@@ -0,0 +1,403 @@
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Job lifecycle: queued -> in_progress -> dialed -> completed, with failed
+# attempts going back to queued (after a backoff) until max_attempts
+QUEUED = "queued"
+IN_PROGRESS = "in_progress"
+DIALED = "dialed"
+COMPLETED = "completed"
+FAILED = "failed"
+JOB_STATUSES = (QUEUED, IN_PROGRESS, DIALED, COMPLETED, FAILED)
+
+# Twilio CallStatus values that mean the farmer was not reached
+RETRYABLE_CALL_STATUSES = ("busy", "no-answer", "failed", "canceled")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    message TEXT NOT NULL,
+    language TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id),
+    phone TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    call_sid TEXT,
+    last_error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS jobs_campaign ON jobs (campaign_id, status);
+"""
+
+
+class CampaignStore:
+    """SQLite-backed job queue for outbound call campaigns.
+
+    Every number is one row in ``jobs``; claiming due jobs flips them to
+    in_progress in the same transaction, so a restart can tell which calls
+    were mid-dial (see ``requeue_in_progress``).
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if db_path != ":memory:" and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self._dispatcher_lock = None
+        self._connect()
+        # A worker forked from a preloading master must not share the master's connection
+        store = weakref.ref(self)
+        os.register_at_fork(after_in_child=lambda: store() and store()._connect())
+
+    def _connect(self):
+        # An inherited connection is left unclosed; closing it here could disturb the parent's
+        self._inherited = getattr(self, "_conn", None)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def acquire_dispatcher_lock(self) -> bool:
+        """Whether this process may run the dispatcher: one per database, however many workers"""
+        if self.db_path == ":memory:" or self._dispatcher_lock is not None:
+            return True
+        try:
+            import fcntl
+        except ImportError:
+            return True
+
+        lock_file = open(f"{self.db_path}.dispatcher.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # Held until the process exits
+        self._dispatcher_lock = lock_file
+        return True
+
+    def create_campaign(self, name: str, message: str, numbers: Iterable[str], language: str = "hindi") -> int:
+        """Queue one job per (deduplicated) number; returns the campaign id"""
+        now = time.time()
+        unique_numbers = list(dict.fromkeys(number.strip() for number in numbers if number.strip()))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            cursor = self._conn.execute(
+                "INSERT INTO campaigns (name, message, language, created_at) VALUES (?, ?, ?, ?)",
+                (name, message, language, now)
+            )
+            campaign_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO jobs (campaign_id, phone, status, next_attempt_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                ((campaign_id, number, QUEUED, now, now) for number in unique_numbers)
+            )
+            self._conn.execute("COMMIT")
+        return campaign_id
+
+    def get_campaign(self, campaign_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM campaigns WHERE id = ?", (campaign_id,)).fetchone()
+        return dict(row) if row else None
+
+    def claim_due(self, limit: int, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Mark up to ``limit`` due jobs in_progress and return them, oldest first"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            rows = self._conn.execute(
+                "SELECT jobs.*, campaigns.language FROM jobs JOIN campaigns ON campaigns.id = jobs.campaign_id "
+                "WHERE status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at, jobs.id LIMIT ?",
+                (QUEUED, now, limit)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                ((IN_PROGRESS, now, row["id"]) for row in rows)
+            )
+            self._conn.execute("COMMIT")
+
+        jobs = [dict(row) for row in rows]
+        for job in jobs:
+            job["attempts"] += 1
+        return jobs
+
+    def mark_dialed(self, job_id: int, call_sid: str):
+        self._update(job_id, status=DIALED, call_sid=call_sid, last_error=None)
+
+    def mark_completed(self, job_id: int):
+        self._update(job_id, status=COMPLETED)
+
+    def mark_retry(self, job_id: int, error: str, next_attempt_at: float):
+        self._update(job_id, status=QUEUED, last_error=error, next_attempt_at=next_attempt_at)
+
+    def mark_failed(self, job_id: int, error: str):
+        self._update(job_id, status=FAILED, last_error=error)
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def requeue_in_progress(self) -> int:
+        """Return jobs left mid-dial by a crash to the queue; returns how many"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), updated_at = ? WHERE status = ?",
+                (QUEUED, time.time(), IN_PROGRESS)
+            )
+        return cursor.rowcount
+
+    def claim_stale_dials(self, timeout: float, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Take back dialed jobs whose status callback has not arrived within ``timeout`` seconds.
+
+        They are flipped to in_progress in the same transaction, so a callback
+        arriving late is ignored instead of racing the retry.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? AND updated_at <= ? ORDER BY updated_at, id",
+                (DIALED, now - timeout)
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                ((IN_PROGRESS, now, row["id"]) for row in rows)
+            )
+            self._conn.execute("COMMIT")
+        return [dict(row) for row in rows]
+
+    def next_due_at(self) -> Optional[float]:
+        """When the earliest queued job becomes due, or None if nothing is queued"""
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(next_attempt_at) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()
+        return row[0]
+
+    def progress(self, campaign_id: Optional[int] = None) -> Dict[str, int]:
+        """Job counts by status, for one campaign or all of them"""
+        query = "SELECT status, COUNT(*), SUM(attempts) FROM jobs"
+        params = ()
+        if campaign_id is not None:
+            query += " WHERE campaign_id = ?"
+            params = (campaign_id,)
+        with self._lock:
+            rows = self._conn.execute(query + " GROUP BY status", params).fetchall()
+
+        progress = {status: 0 for status in JOB_STATUSES}
+        attempts = 0
+        for status, count, status_attempts in rows:
+            progress[status] = count
+            attempts += status_attempts or 0
+        progress["total"] = sum(progress[status] for status in JOB_STATUSES)
+        progress["attempts"] = attempts
+        return progress
+
+    def _update(self, job_id: int, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, bursting up to ``capacity``.
+
+    The default capacity of one token paces dials evenly, since carriers
+    enforce CPS limits over windows shorter than a second.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        while True:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class MockDialer:
+    """Stand-in for Twilio call creation, for load tests and local runs"""
+
+    def __init__(self, failure_rate: float = 0.0, latency: float = 0.0, seed: int = 42):
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.calls = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, job: Dict[str, Any]) -> Optional[str]:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            if self._rng.random() < self.failure_rate:
+                raise RuntimeError("injected dial failure")
+            self.calls.append(job["phone"])
+            return f"CAmock{len(self.calls):08d}"
+
+
+class CampaignDispatcher:
+    """Drains the campaign queue at the carrier's calls-per-second limit.
+
+    Due jobs are dialed concurrently (at most ``concurrency`` in flight), each
+    dial first taking a token from a bucket refilled at ``calls_per_second``.
+    ``dialer(job)`` returns a call SID, or None / raises on failure; failed
+    dials are retried with exponential backoff until ``max_attempts``. Dialed
+    calls whose status callback never arrives within ``dial_timeout`` seconds
+    are treated as unanswered.
+    """
+
+    def __init__(
+        self,
+        store: CampaignStore,
+        dialer: Callable[[Dict[str, Any]], Optional[str]],
+        calls_per_second: float = 1.0,
+        concurrency: int = 10,
+        max_attempts: int = 3,
+        retry_base: float = 60.0,
+        retry_max: float = 3600.0,
+        poll_interval: float = 1.0,
+        dial_timeout: float = 900.0,
+    ):
+        self.store = store
+        self.dialer = dialer
+        self.bucket = TokenBucket(calls_per_second)
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.poll_interval = poll_interval
+        self.dial_timeout = dial_timeout
+        self.logger = logging.getLogger(__name__)
+
+        self._stopping = False
+        self._in_flight = set()
+        self._started_at = None
+        self._next_sweep = 0.0
+        self._stats = {"dials": 0, "dialed": 0, "dial_failures": 0, "retries_scheduled": 0, "gave_up": 0,
+                       "dial_timeouts": 0}
+
+    async def run(self, stop_when_idle: bool = False):
+        """Dispatch until stopped (or, with ``stop_when_idle``, until no job is left queued)"""
+        self._stopping = False
+        self._started_at = time.monotonic()
+        requeued = self.store.requeue_in_progress()
+        if requeued:
+            self.logger.info(f"Requeued {requeued} campaign jobs left in progress")
+
+        try:
+            while not self._stopping:
+                if time.monotonic() >= self._next_sweep:
+                    self.sweep_stale_dials()
+                    self._next_sweep = time.monotonic() + min(self.dial_timeout, 60.0)
+
+                free = self.concurrency - len(self._in_flight)
+                jobs = self.store.claim_due(free) if free > 0 else []
+
+                for job in jobs:
+                    await self.bucket.acquire()
+                    self._in_flight.add(asyncio.ensure_future(self._dial(job)))
+
+                if jobs:
+                    self._in_flight = {task for task in self._in_flight if not task.done()}
+                    continue
+
+                if self._in_flight:
+                    _, self._in_flight = await asyncio.wait(
+                        self._in_flight, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    continue
+
+                next_due = self.store.next_due_at()
+                if next_due is None and stop_when_idle:
+                    break
+                wait = self.poll_interval if next_due is None else min(self.poll_interval, max(0.0, next_due - time.time()))
+                await asyncio.sleep(wait)
+        finally:
+            if self._in_flight:
+                await asyncio.gather(*self._in_flight, return_exceptions=True)
+                self._in_flight = set()
+
+    def stop(self):
+        self._stopping = True
+
+    def record_call_status(self, job_id: int, call_status: str):
+        """Apply a Twilio status callback: completed calls finish, unanswered ones retry"""
+        job = self.store.get_job(job_id)
+        if job is None or job["status"] != DIALED:
+            return
+        if call_status == "completed":
+            self.store.mark_completed(job_id)
+        elif call_status in RETRYABLE_CALL_STATUSES:
+            self._retry_or_fail(job, f"call {call_status}")
+
+    def sweep_stale_dials(self) -> int:
+        """Retry (or fail) dialed jobs that never got a status callback; returns how many"""
+        jobs = self.store.claim_stale_dials(self.dial_timeout)
+        for job in jobs:
+            self._stats["dial_timeouts"] += 1
+            self._retry_or_fail(job, "no status callback")
+        if jobs:
+            self.logger.warning(f"{len(jobs)} campaign calls had no status callback after {self.dial_timeout:.0f}s")
+        return len(jobs)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["in_flight"] = len(self._in_flight)
+        if self._started_at is not None:
+            elapsed = time.monotonic() - self._started_at
+            stats["dials_per_second"] = round(stats["dials"] / elapsed, 3) if elapsed > 0 else 0.0
+        stats["jobs"] = self.store.progress()
+        return stats
+
+    async def _dial(self, job: Dict[str, Any]):
+        self._stats["dials"] += 1
+        try:
+            call_sid = await asyncio.to_thread(self.dialer, job)
+            error = "dialer returned no call SID"
+        except Exception as e:
+            call_sid, error = None, str(e)
+
+        if call_sid:
+            self._stats["dialed"] += 1
+            self.store.mark_dialed(job["id"], call_sid)
+        else:
+            self._stats["dial_failures"] += 1
+            self.logger.error(f"Dialing {job['phone']} failed: {error}")
+            self._retry_or_fail(job, error)
+
+    def _retry_or_fail(self, job: Dict[str, Any], error: str):
+        if job["attempts"] >= self.max_attempts:
+            self._stats["gave_up"] += 1
+            self.store.mark_failed(job["id"], error)
+            return
+
+        delay = min(self.retry_max, self.retry_base * 2 ** (job["attempts"] - 1))
+        # Jitter so a carrier outage does not produce a synchronized retry wave
+        delay *= random.uniform(0.5, 1.0)
+        self._stats["retries_scheduled"] += 1
+        self.store.mark_retry(job["id"], error, time.time() + delay)
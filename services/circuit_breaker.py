@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+class CircuitBreaker:
+    """Per-engine circuit breaker with a sliding failure-rate window.
+
+    CLOSED: calls pass through and outcomes are recorded in the window.
+    OPEN: calls are rejected immediately so the caller moves on to the next
+    engine. If a ``probe`` is given, a background thread polls it every
+    ``probe_interval`` seconds and moves the breaker to HALF_OPEN on success;
+    without a probe, the breaker goes HALF_OPEN after ``open_duration``.
+    HALF_OPEN: a single trial call is let through; its outcome closes or
+    re-opens the breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 5,
+        open_duration: float = 30.0,
+        probe: Optional[Callable[[], bool]] = None,
+        probe_interval: float = 10.0,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.probe = probe
+        self.probe_interval = probe_interval
+        self.logger = logging.getLogger(__name__)
+
+        self._outcomes = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._probe_thread = None
+        self._last_probe_ok = None
+        self._times_opened = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be attempted right now"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.OPEN and self.probe is None:
+                if time.monotonic() - self._opened_at >= self.open_duration:
+                    self._state = self.HALF_OPEN
+
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+
+            self._rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self.logger.info(f"Circuit '{self.name}' closed")
+                self._state = self.CLOSED
+                self._outcomes.clear()
+                self._trial_in_flight = False
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trial_in_flight = False
+                self._open()
+                return
+
+            self._outcomes.append(False)
+            if self._state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+                if self._failure_rate() >= self.failure_threshold:
+                    self._open()
+
+    def call(self, func: Callable, *args) -> Any:
+        """Call ``func`` through the breaker; None means rejected or failed"""
+        if not self.allow_request():
+            return None
+
+        try:
+            result = func(*args)
+        except Exception as e:
+            self.logger.error(f"Circuit '{self.name}' call failed: {e}")
+            result = None
+
+        if result is None:
+            self.record_failure()
+        else:
+            self.record_success()
+        return result
+
+    async def call_async(self, func: Callable, *args) -> Any:
+        """Await ``func(*args)`` through the breaker; None means rejected or failed"""
+        if not self.allow_request():
+            return None
+
+        try:
+            result = await func(*args)
+        except Exception as e:
+            self.logger.error(f"Circuit '{self.name}' call failed: {e}")
+            result = None
+
+        if result is None:
+            self.record_failure()
+        else:
+            self.record_success()
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "failure_rate": round(self._failure_rate(), 3),
+                "calls_in_window": len(self._outcomes),
+                "times_opened": self._times_opened,
+                "rejected_calls": self._rejected,
+                "last_probe_ok": self._last_probe_ok,
+            }
+
+    def _failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _open(self):
+        # Caller holds the lock
+        self.logger.warning(f"Circuit '{self.name}' opened (failure rate {self._failure_rate():.0%})")
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._times_opened += 1
+
+        if self.probe is not None and (self._probe_thread is None or not self._probe_thread.is_alive()):
+            self._probe_thread = threading.Thread(
+                target=self._probe_loop, name=f"probe-{self.name}", daemon=True
+            )
+            self._probe_thread.start()
+
+    def _probe_loop(self):
+        """Probe the upstream in the background until it looks healthy again"""
+        while True:
+            time.sleep(self.probe_interval)
+
+            with self._lock:
+                if self._state != self.OPEN:
+                    return
+
+            try:
+                healthy = bool(self.probe())
+            except Exception as e:
+                self.logger.debug(f"Probe for '{self.name}' failed: {e}")
+                healthy = False
+
+            with self._lock:
+                self._last_probe_ok = healthy
+                if healthy and self._state == self.OPEN:
+                    self.logger.info(f"Circuit '{self.name}' half-open after successful probe")
+                    self._state = self.HALF_OPEN
+                    return
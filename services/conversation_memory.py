@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import weakref
+from concurrent.futures import Executor
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from services.call_session import CallSession
+
+Turn = Tuple[str, str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about three characters per token) when no tokenizer is loaded"""
+    return len(text) // 3 + 1
+
+
+class ConversationMemory:
+    """Per-call history for follow-up questions, bounded by a token budget.
+
+    Each answered turn is appended to the session's ``history``. Once the
+    summary plus the history passes ``compact_ratio`` of ``budget_tokens``,
+    everything but the last ``keep_turns`` turns is folded into the running
+    ``summary`` by ``summarize(summary, turns, language, max_tokens)``. That
+    runs in the background after the answer has gone out, so it never delays
+    a caller. ``render`` always fits the budget - if a compaction is still
+    running it leaves out the oldest turns - so the prompt stops growing
+    however long the call gets.
+    """
+
+    def __init__(self, summarize: Optional[Callable[[str, Sequence[Turn], str, int], str]] = None,
+                 budget_tokens: int = 256, keep_turns: int = 2, compact_ratio: float = 0.75,
+                 count_tokens: Callable[[str], int] = estimate_tokens):
+        self.summarize = summarize
+        self.budget_tokens = budget_tokens
+        self.keep_turns = keep_turns
+        self.compact_ratio = compact_ratio
+        self.count_tokens = count_tokens
+        self.logger = logging.getLogger(__name__)
+        self._compacting = set()
+        # Serializes each call's read-modify-write of its session between turns and compaction
+        self._locks = weakref.WeakValueDictionary()
+        self._stats = {"turns": 0, "compactions": 0, "failed_compactions": 0, "truncated_prompts": 0}
+
+    def render(self, session: CallSession) -> Optional[str]:
+        """Summary and as many recent turns as fit the budget, for the prompt; None if empty"""
+        budget = self.budget_tokens
+        lines = []
+        if session.summary:
+            summary = f"Earlier in this call: {session.summary}"
+            budget -= self.count_tokens(summary)
+            lines.append(summary)
+
+        turns = []
+        for query, answer in reversed(session.history):
+            turn = f"Farmer: {query}\nAdvisor: {answer}"
+            cost = self.count_tokens(turn)
+            if cost > budget:
+                self._stats["truncated_prompts"] += 1
+                break
+            budget -= cost
+            turns.append(turn)
+
+        lines.extend(reversed(turns))
+        return "\n".join(lines) if lines else None
+
+    def record(self, session: CallSession, query: str, answer: str) -> bool:
+        """Append a turn; returns whether the session is now due for compaction"""
+        session.history = session.history + ((query, answer),)
+        self._stats["turns"] += 1
+        return self.needs_compaction(session)
+
+    async def remember(self, call_sid: str, session_store, query: str, answer: str,
+                       executor: Optional[Executor] = None) -> bool:
+        """Record an answered turn in the stored session; returns whether the session existed.
+
+        The session is saved before any compaction is scheduled, so the
+        compaction always starts from a history that includes this turn.
+        """
+        async with self._lock(call_sid):
+            session = await session_store.get(call_sid)
+            if session is None:
+                return False
+            due = self.record(session, query, answer)
+            await session_store.save(call_sid, session)
+
+        if due:
+            asyncio.ensure_future(self.compact(call_sid, session_store, executor))
+        return True
+
+    def needs_compaction(self, session: CallSession) -> bool:
+        if len(session.history) <= self.keep_turns or self.summarize is None:
+            return False
+        used = self.count_tokens(session.summary) if session.summary else 0
+        used += sum(self.count_tokens(query) + self.count_tokens(answer) for query, answer in session.history)
+        return used > self.budget_tokens * self.compact_ratio
+
+    async def compact(self, call_sid: str, session_store, executor: Optional[Executor] = None) -> bool:
+        """Fold the call's older turns into its summary; returns whether it did.
+
+        The summarizer runs on ``executor``. The session is re-read under
+        the call's lock right before saving, and the result is dropped if the
+        summarized turns are no longer at the head of the history (the call
+        ended or moved on).
+        """
+        if call_sid in self._compacting:
+            return False
+        self._compacting.add(call_sid)
+        try:
+            session = await session_store.get(call_sid)
+            if session is None or not self.needs_compaction(session):
+                return False
+
+            turns = session.history[:-self.keep_turns]
+            loop = asyncio.get_running_loop()
+            summary = await loop.run_in_executor(
+                executor, self.summarize, session.summary, turns, session.language, self.budget_tokens // 3
+            )
+
+            async with self._lock(call_sid):
+                session = await session_store.get(call_sid)
+                if session is None or session.history[:len(turns)] != turns or not summary:
+                    return False
+                session.summary = summary
+                session.history = session.history[len(turns):]
+                await session_store.save(call_sid, session)
+            self._stats["compactions"] += 1
+            return True
+        except Exception as e:
+            self.logger.error(f"Summarizing history for call {call_sid} failed: {e}")
+            self._stats["failed_compactions"] += 1
+            return False
+        finally:
+            self._compacting.discard(call_sid)
+
+    def _lock(self, call_sid: str) -> asyncio.Lock:
+        lock = self._locks.get(call_sid)
+        if lock is None:
+            lock = self._locks[call_sid] = asyncio.Lock()
+        return lock
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "compacting": len(self._compacting)}
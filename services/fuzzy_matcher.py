@@ -0,0 +1,162 @@
+import re
+from collections import defaultdict
+from typing import List, Optional, Tuple
+
+# Common filler words in farmer utterances; never fuzzy-matched
+STOPWORDS = frozenset([
+    "mein", "main", "hai", "hain", "tha", "thi", "kar", "karta", "karte", "raha", "rahi", "rahe",
+    "kheti", "khet", "fasal", "mitti", "mera", "meri", "mere", "hamara", "hamari", "aur", "liye",
+    "lekin", "bahut", "abhi", "kuch", "nahi", "nahin", "hun", "hoon", "kaise", "kaun", "kaunsi",
+    "kya", "kyun", "wala", "wali", "the", "and", "have", "what", "with", "this", "that", "field",
+    "farm", "crop", "season", "soil", "district", "please", "about", "karein", "karen", "karna",
+    "dawa", "dawai", "kitna", "kitni", "kab", "daalun", "dalna", "chahiye", "sakte", "batao",
+    "karun", "karoon", "karu", "gaya", "gaye", "gayi", "loan", "nagar", "ropai", "ropayi", "bijai", "buvai",
+    "katai", "sinchai", "sichai",
+])
+
+# Spelling variants that ASR and romanization produce for the same sound
+_TRANSLITERATION_RULES = [
+    (re.compile(r"oo"), "u"),
+    (re.compile(r"ee"), "i"),
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"w"), "v"),
+    (re.compile(r"z"), "j"),
+    (re.compile(r"q"), "k"),
+    (re.compile(r"(.)\1+"), r"\1"),
+]
+
+
+def normalize(token: str) -> str:
+    """Fold common romanization variants (gehoon -> gehun, paani -> pani)"""
+    token = token.lower()
+    for pattern, replacement in _TRANSLITERATION_RULES:
+        token = pattern.sub(replacement, token)
+    return token
+
+
+def trigrams(term: str) -> List[str]:
+    padded = f"${term}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up with ``limit + 1`` once it exceeds ``limit``"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            cost = 0 if char_a == char_b else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            current.append(value)
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous = current
+
+    return previous[-1]
+
+
+def max_edits(length: int) -> int:
+    """Edit-distance cutoff for a normalized token of ``length`` characters.
+
+    Four-letter tokens only match once normalized: in romanized Hindi too
+    many everyday words (gaya, loan, pele) sit one edit from a crop or soil
+    name.
+    """
+    if length < 5:
+        return 0
+    if length < 7:
+        return 1
+    return 2
+
+
+class FuzzyMatcher:
+    """Character-trigram inverted index over single-token gazetteer surfaces.
+
+    A noisy token is normalized, candidates sharing enough trigrams are
+    pulled from the index (the q-gram lemma bounds how many a string within
+    k edits must share), and only those few are verified with a bounded
+    edit distance. Candidates must also share the first letter, which ASR
+    errors rarely change and which keeps short filler words from matching.
+    """
+
+    def __init__(self):
+        self._terms = []
+        self._entries = []
+        self._fuzzy_entries = []
+        self._term_ids = {}
+        self._index = defaultdict(list)
+
+    def add(self, surface: str, entries: List[Tuple[str, str]], fuzzy: bool = True):
+        """Index ``surface`` as resolving to the given ``(slot, canonical)`` entries.
+
+        With ``fuzzy=False`` the entries are only returned for tokens that
+        normalize to ``surface`` exactly, never for a token within an edit.
+        """
+        term = normalize(surface)
+        if len(term) < 4:
+            return
+
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = len(self._terms)
+            self._term_ids[term] = term_id
+            self._terms.append(term)
+            self._entries.append([])
+            self._fuzzy_entries.append([])
+            for gram in set(trigrams(term)):
+                self._index[gram].append(term_id)
+
+        for entry in entries:
+            if entry not in self._entries[term_id]:
+                self._entries[term_id].append(entry)
+            if fuzzy and entry not in self._fuzzy_entries[term_id]:
+                self._fuzzy_entries[term_id].append(entry)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def lookup(self, token: str) -> Optional[List[Tuple[str, str]]]:
+        """Return the entries of the closest indexed term, or None if nothing is close enough"""
+        if token in STOPWORDS:
+            return None
+
+        term = normalize(token)
+        exact = self._term_ids.get(term)
+        if exact is not None:
+            return self._entries[exact]
+
+        limit = max_edits(len(term))
+        if limit == 0:
+            return None
+
+        grams = set(trigrams(term))
+        shared = defaultdict(int)
+        for gram in grams:
+            for term_id in self._index.get(gram, ()):
+                shared[term_id] += 1
+
+        required = max(1, len(grams) - 3 * limit)
+        best_id, best_key = None, None
+        for term_id, count in shared.items():
+            if count < required or not self._fuzzy_entries[term_id]:
+                continue
+            candidate = self._terms[term_id]
+            if candidate[0] != term[0]:
+                continue
+            # The shorter side sets the allowance, so ganga cannot reach gana (ganna)
+            candidate_limit = min(limit, max_edits(len(candidate)))
+            if candidate_limit == 0:
+                continue
+            distance = bounded_edit_distance(term, candidate, candidate_limit)
+            if distance > candidate_limit:
+                continue
+            key = (distance, -count, len(candidate))
+            if best_key is None or key < best_key:
+                best_id, best_key = term_id, key
+
+        return self._fuzzy_entries[best_id] if best_id is not None else None
@@ -0,0 +1,234 @@
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from services.fuzzy_matcher import FuzzyMatcher, normalize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GAZETTEER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "gazetteer")
+
+# Slots extracted into the farming context, in the order they appear in the result
+CONTEXT_SLOTS = ("location", "crop", "water_condition", "soil_type", "season")
+
+# Location aliases up to this many (normalized) characters are never fuzzy-matched
+MAX_EXACT_ONLY_LOCATION_LENGTH = 6
+
+# Splits on whitespace and punctuation (including the danda) but keeps Indic
+# combining marks attached to their letters, which a plain \w+ would not.
+_TOKEN_SEPARATORS = re.compile(r"[\s,.!?;:।॥\"'()\[\]{}/\-]+")
+
+# Terminal marker inside trie nodes; tokens are never None
+_END = None
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split an utterance into tokens"""
+    return [token for token in _TOKEN_SEPARATORS.split(text.lower()) if token]
+
+
+class Gazetteer:
+    """Token trie over all slot vocabularies.
+
+    Every surface form (romanized or native script, single or multi-word)
+    is a path of tokens in one trie, so an utterance is resolved in a single
+    left-to-right scan: at each position the longest matching phrase wins
+    and the scan resumes after it. The cost depends on utterance length and
+    the longest phrase, not on vocabulary size.
+    """
+
+    def __init__(self):
+        self._root = {}
+        self._size = 0
+        self.values = {}
+        self.fuzzy = None
+
+    def add(self, slot: str, canonical: str, surface: str):
+        """Register ``surface`` as a way of saying ``canonical`` for ``slot``"""
+        tokens = tokenize(surface)
+        if not tokens:
+            return
+
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+
+        entries = node.setdefault(_END, [])
+        if (slot, canonical) not in entries:
+            entries.append((slot, canonical))
+            self._size += 1
+
+        slot_values = self.values.setdefault(slot, [])
+        if canonical not in slot_values:
+            slot_values.append(canonical)
+
+    def load_file(self, slot: str, path: str):
+        """Load a ``canonical<TAB>surface|surface|...`` file for one slot"""
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+
+                canonical, _, surfaces = line.partition("\t")
+                canonical = canonical.strip()
+                for surface in surfaces.split("|"):
+                    self.add(slot, canonical, surface.strip())
+
+    @classmethod
+    def from_directory(cls, directory: str = DEFAULT_GAZETTEER_DIR) -> "Gazetteer":
+        """Build a gazetteer from ``<slot>.tsv`` files in ``directory``"""
+        gazetteer = cls()
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(".tsv"):
+                gazetteer.load_file(filename[:-len(".tsv")], os.path.join(directory, filename))
+
+        logger.info(f"Gazetteer loaded with {len(gazetteer)} surface forms from {directory}")
+        return gazetteer
+
+    def __len__(self) -> int:
+        return self._size
+
+    def enable_fuzzy(self) -> FuzzyMatcher:
+        """Index every single-token surface form for misspelling-tolerant lookup.
+
+        Short location aliases only match once normalized, never within an
+        edit: Hindi is full of words one edit from a district (ropai/ropar,
+        nagar/nagaur), and a wrong district skews every later answer.
+        """
+        matcher = FuzzyMatcher()
+        for token, node in self._root.items():
+            entries = node.get(_END)
+            if token is _END or not entries:
+                continue
+            if len(normalize(token)) > MAX_EXACT_ONLY_LOCATION_LENGTH:
+                matcher.add(token, entries)
+                continue
+            locations = [entry for entry in entries if entry[0] == "location"]
+            others = [entry for entry in entries if entry[0] != "location"]
+            if locations:
+                matcher.add(token, locations, fuzzy=False)
+            if others:
+                matcher.add(token, others)
+
+        self.fuzzy = matcher
+        return matcher
+
+    def scan(self, tokens: List[str]) -> Iterable[Tuple[int, int, List[Tuple[str, str]]]]:
+        """Yield ``(start, end, [(slot, canonical), ...])`` for each longest match"""
+        root = self._root
+        i = 0
+        count = len(tokens)
+        while i < count:
+            node = root.get(tokens[i])
+            if node is None:
+                i += 1
+                continue
+
+            match_end, match_entries = None, None
+            j = i
+            while node is not None:
+                j += 1
+                entries = node.get(_END)
+                if entries is not None:
+                    match_end, match_entries = j, entries
+                node = node.get(tokens[j]) if j < count else None
+
+            if match_end is None:
+                i += 1
+                continue
+
+            yield i, match_end, match_entries
+            i = match_end
+
+    def extract(self, text: str) -> Dict[str, Optional[str]]:
+        """Extract the farming context slots from an utterance in one pass.
+
+        The first mention of each slot wins. Water is special-cased the same
+        way the keyword rules always did it: a shortage/excess modifier only
+        counts when water itself is mentioned, and a bare mention is 'normal'.
+        If fuzzy matching is enabled, the tokens the exact scan left unmatched
+        are resolved through it afterwards, and only fill slots that no exact
+        match anywhere in the utterance filled.
+        """
+        return self.extract_with_fuzzy_slots(text)[0]
+
+    def extract_with_fuzzy_slots(self, text: str) -> Tuple[Dict[str, Optional[str]], Set[str]]:
+        """Like ``extract``, plus the slots that only a fuzzy match filled.
+
+        Those are guesses from a misspelled token, so they should not outlive
+        the call (e.g. in a saved profile) unless the farmer confirms them.
+        """
+        context = {slot: None for slot in CONTEXT_SLOTS}
+        fuzzy_slots = set()
+        water_levels = []
+        tokens = tokenize(text)
+        unmatched = []
+        position = 0
+
+        for start, end, entries in self.scan(tokens):
+            unmatched.extend(tokens[position:start])
+            _fill(context, water_levels, entries)
+            position = end
+        unmatched.extend(tokens[position:])
+
+        if self.fuzzy is not None:
+            fuzzy_slots = self._fill_fuzzy(context, water_levels, unmatched)
+
+        context["water_condition"] = _resolve_water_condition(water_levels)
+        if context["water_condition"] is None:
+            fuzzy_slots.discard("water_condition")
+        return context, fuzzy_slots
+
+    def _fill_fuzzy(self, context: Dict[str, Optional[str]], water_levels: List[str], tokens: List[str]) -> Set[str]:
+        """Fill empty slots from fuzzy matches of ``tokens``; returns the slots it filled"""
+        empty = {slot for slot, value in context.items() if value is None}
+        fuzzy_levels = []
+        for token in tokens:
+            entries = self.fuzzy.lookup(token)
+            if entries is not None:
+                _fill(context, fuzzy_levels, entries)
+
+        # Water is filled the same way: fuzzy hits only supply the parts
+        # (the mention, the modifier) that no exact match supplied
+        has_mention = "mention" in water_levels
+        has_modifier = any(level != "mention" for level in water_levels)
+        filled = {slot for slot in empty if context[slot] is not None}
+        for level in fuzzy_levels:
+            if (level == "mention" and not has_mention) or (level != "mention" and not has_modifier):
+                water_levels.append(level)
+                filled.add("water_condition")
+        return filled
+
+
+def _fill(context: Dict[str, Optional[str]], water_levels: List[str], entries: List[Tuple[str, str]]):
+    for slot, canonical in entries:
+        if slot == "water_condition":
+            water_levels.append(canonical)
+        elif slot in context and context[slot] is None:
+            context[slot] = canonical
+
+
+def _resolve_water_condition(levels: List[str]) -> Optional[str]:
+    if "mention" not in levels:
+        return None
+
+    for level in levels:
+        if level != "mention":
+            return level
+    return "normal"
+
+
+_default_gazetteer = None
+
+
+def get_default_gazetteer() -> Gazetteer:
+    """Process-wide gazetteer compiled once from the bundled data files"""
+    global _default_gazetteer
+    if _default_gazetteer is None:
+        gazetteer = Gazetteer.from_directory(os.getenv("GAZETTEER_DIR", DEFAULT_GAZETTEER_DIR))
+        if os.getenv("GAZETTEER_FUZZY", "True").lower() == "true":
+            gazetteer.enable_fuzzy()
+        _default_gazetteer = gazetteer
+    return _default_gazetteer
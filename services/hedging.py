@@ -0,0 +1,152 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Rolling window of observed latencies (in seconds) for one engine"""
+
+    def __init__(self, window_size: int = 200):
+        self._samples = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the q-th percentile (0..1) of the window, or None if empty"""
+        with self._lock:
+            samples = sorted(self._samples)
+
+        if not samples:
+            return None
+
+        index = min(len(samples) - 1, int(round(q * (len(samples) - 1))))
+        return samples[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class HedgePolicy:
+    """Hedging settings for one engine.
+
+    The hedge fires once the engine has been outstanding for its observed
+    ``percentile`` latency, clamped to ``[min_delay, max_delay]``. Until
+    ``min_samples`` latencies have been seen, ``initial_delay`` is used.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        percentile: float = 0.95,
+        initial_delay: float = 3.0,
+        min_delay: float = 0.5,
+        max_delay: float = 10.0,
+        min_samples: int = 20,
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+
+    def hedge_delay(self, tracker: LatencyTracker) -> float:
+        """Seconds to wait on the primary before firing the hedge"""
+        delay = self.initial_delay
+        if len(tracker) >= self.min_samples:
+            observed = tracker.percentile(self.percentile)
+            if observed is not None:
+                delay = observed
+
+        return max(self.min_delay, min(self.max_delay, delay))
+
+
+class HedgeMetrics:
+    """Thread-safe counters describing how hedged requests were resolved"""
+
+    COUNTERS = (
+        "requests",
+        "primary_wins",
+        "primary_failures",
+        "hedges_fired",
+        "hedge_wins",
+        "both_failed",
+    )
+
+    def __init__(self):
+        self._counts = {name: 0 for name in self.COUNTERS}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counts)
+
+        fired = stats["hedges_fired"]
+        stats["hedge_win_rate"] = stats["hedge_wins"] / fired if fired else 0.0
+        return stats
+
+
+def hedged_call(
+    primary: Callable[[], Any],
+    fallback: Callable[[], Any],
+    delay: float,
+    executor: Executor,
+    metrics: HedgeMetrics,
+    is_success: Callable[[Any], bool] = lambda result: result is not None,
+) -> Any:
+    """Run ``primary``, hedging with ``fallback`` if it is still pending after ``delay``.
+
+    If the primary fails before the hedge fires, the fallback is run inline,
+    exactly as an unhedged fallback chain would. Once both are in flight the
+    first successful result wins and the loser is cancelled; a loser that is
+    already running cannot be interrupted, so its result is simply discarded.
+    """
+    metrics.increment("requests")
+    primary_future = executor.submit(primary)
+
+    done, _ = wait([primary_future], timeout=delay)
+    if done:
+        result = _result_or_none(primary_future)
+        if is_success(result):
+            metrics.increment("primary_wins")
+            return result
+
+        metrics.increment("primary_failures")
+        return fallback()
+
+    metrics.increment("hedges_fired")
+    hedge_future = executor.submit(fallback)
+    pending = {primary_future: "primary_wins", hedge_future: "hedge_wins"}
+
+    while pending:
+        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        for future in done:
+            counter = pending.pop(future)
+            result = _result_or_none(future)
+            if is_success(result):
+                metrics.increment(counter)
+                for loser in pending:
+                    loser.cancel()
+                return result
+
+    metrics.increment("both_failed")
+    return None
+
+
+def _result_or_none(future) -> Any:
+    try:
+        return future.result()
+    except Exception as e:
+        logger.error(f"Hedged request failed: {e}")
+        return None
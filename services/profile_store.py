@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Dict, Optional
+
+from services.call_session import CallSession
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    phone TEXT PRIMARY KEY,
+    context TEXT NOT NULL,
+    language TEXT NOT NULL,
+    calls INTEGER NOT NULL DEFAULT 1,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class ProfileStore:
+    """Farmer profiles: the last farming context extracted for a caller number.
+
+    A repeat caller with a fresh profile can skip the context-gathering turn.
+    ``get`` returns the profile as a ready-to-save ``CallSession``.
+    """
+
+    async def get(self, phone: str, max_age: Optional[float] = None) -> Optional[CallSession]:
+        """Profile for ``phone``, or None if unknown or older than ``max_age`` seconds"""
+        raise NotImplementedError
+
+    async def save(self, phone: str, context: Dict[str, Optional[str]], language: str = "hindi") -> None:
+        raise NotImplementedError
+
+    async def delete(self, phone: str) -> bool:
+        raise NotImplementedError
+
+    async def count(self) -> int:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class SQLiteProfileStore(ProfileStore):
+    """Profiles in one SQLite table keyed by phone number.
+
+    The phone number is the primary key of a WITHOUT ROWID table, so a
+    lookup is a single B-tree search. WAL mode keeps reads from blocking on
+    the writes that end each context turn. Queries run inline: they touch
+    one row and take microseconds.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if db_path != ":memory:" and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self.logger = logging.getLogger(__name__)
+        self._connect()
+        # A worker forked from a preloading master must not share the master's connection
+        store = weakref.ref(self)
+        os.register_at_fork(after_in_child=lambda: store() and store()._connect())
+
+    def _connect(self):
+        # An inherited connection is left unclosed; closing it here could disturb the parent's
+        self._inherited = getattr(self, "_conn", None)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    async def get(self, phone: str, max_age: Optional[float] = None) -> Optional[CallSession]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT context, language, updated_at FROM profiles WHERE phone = ?", (phone,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        context, language, updated_at = row
+        if max_age is not None and time.time() - updated_at > max_age:
+            return None
+        return CallSession(phone, language, json.loads(context))
+
+    async def save(self, phone: str, context: Dict[str, Optional[str]], language: str = "hindi") -> None:
+        # Only known slots are kept, so a profile never stores "don't know"
+        known = {slot: value for slot, value in context.items() if value}
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO profiles (phone, context, language, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(phone) DO UPDATE SET context = excluded.context, language = excluded.language, "
+                "calls = calls + 1, updated_at = excluded.updated_at",
+                (phone, json.dumps(known, ensure_ascii=False, separators=(",", ":")), language, time.time())
+            )
+
+    async def delete(self, phone: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM profiles WHERE phone = ?", (phone,))
+        return cursor.rowcount > 0
+
+    async def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
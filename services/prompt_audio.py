@@ -0,0 +1,107 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, Optional, Tuple
+
+from services.audio_store import clip_id_for, is_clip_id
+
+
+class PromptAudioCache:
+    """Pre-rendered audio for the fixed greeting and query prompts in every language.
+
+    Clips live in ``cache_dir`` named by the hash of their audio, and
+    ``manifest.json`` maps ``<prompt>:<language>`` to the clip plus a hash of
+    the text, voice and output format it was rendered from. ``build()`` only
+    re-synthesizes entries where one of those changed, so rebuilding is cheap.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, cache_dir: str, tts_service, output_format: str = "native"):
+        self.cache_dir = cache_dir
+        self.tts_service = tts_service
+        self.output_format = output_format
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._manifest = self._load_manifest()
+
+    def static_prompts(self) -> Dict[Tuple[str, str], str]:
+        """Every (prompt, language) -> text the IVR speaks verbatim"""
+        prompts = {}
+        for language in self.tts_service.voice_mapping:
+            prompts[("greeting", language)] = self.tts_service.get_greeting_message(language)
+            prompts[("query_prompt", language)] = self.tts_service.get_query_prompt(language)
+        return prompts
+
+    def build(self, force: bool = False) -> Dict[str, int]:
+        """Render missing or changed prompts; returns counts of rendered/unchanged/failed"""
+        summary = {"rendered": 0, "unchanged": 0, "failed": 0}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        for (prompt, language), text in self.static_prompts().items():
+            key = f"{prompt}:{language}"
+            source_hash = self._source_hash(text, language)
+            entry = self._manifest.get(key)
+
+            if not force and entry and entry["source_hash"] == source_hash and self.has_clip(entry["clip_id"]):
+                summary["unchanged"] += 1
+                continue
+
+            audio_data = self.tts_service.text_to_speech(text, language, output_format=self.output_format)
+            if not audio_data:
+                self.logger.error(f"Could not render prompt {key}")
+                summary["failed"] += 1
+                continue
+
+            clip_id = clip_id_for(audio_data)
+            self._write_atomic(self.path_for(clip_id), audio_data)
+            with self._lock:
+                self._manifest[key] = {"clip_id": clip_id, "source_hash": source_hash, "text": text}
+            summary["rendered"] += 1
+
+        if summary["rendered"]:
+            self._write_atomic(
+                os.path.join(self.cache_dir, self.MANIFEST),
+                json.dumps(self._manifest, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8")
+            )
+
+        self.logger.info(f"Prompt audio build: {summary}")
+        return summary
+
+    def clip_for(self, prompt: str, language: str) -> Optional[str]:
+        """Clip id of a pre-rendered prompt, or None if it has not been rendered"""
+        entry = self._manifest.get(f"{prompt}:{language.lower()}")
+        return entry["clip_id"] if entry else None
+
+    def path_for(self, clip_id: str) -> str:
+        """Path of a prompt clip; only clip ids are accepted, so nothing else in the directory is reachable"""
+        if not is_clip_id(clip_id):
+            raise ValueError(f"Not a clip id: {clip_id!r}")
+        return os.path.join(self.cache_dir, clip_id)
+
+    def has_clip(self, clip_id: str) -> bool:
+        return is_clip_id(clip_id) and os.path.isfile(self.path_for(clip_id))
+
+    def _source_hash(self, text: str, language: str) -> str:
+        voice = self.tts_service.voice_mapping.get(language, {})
+        source = json.dumps([text, voice, self.output_format], ensure_ascii=False, sort_keys=True)
+        return hashlib.blake2b(source.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(os.path.join(self.cache_dir, self.MANIFEST), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Ignoring unreadable prompt manifest: {e}")
+            return {}
+
+    def _write_atomic(self, path: str, data: bytes):
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
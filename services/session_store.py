@@ -0,0 +1,256 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from services.call_session import CallSession
+
+Session = CallSession
+
+
+class SessionStore:
+    """Per-call conversation state, keyed by Twilio CallSid.
+
+    Handlers load the session, change it and save it back; nothing is shared
+    by reference, so the same code works when the next webhook for a call
+    lands on another worker or node (see ``RedisSessionStore``).
+
+    Every read or write counts as activity. Sessions idle for longer than
+    ``ttl`` seconds expire (a missed call-completed callback must not leak
+    them), and beyond ``max_sessions`` the least recently active session is
+    evicted. ``stats()`` tells clean completions apart from expiries and
+    evictions.
+    """
+
+    ttl: float
+    max_sessions: int
+
+    async def get(self, call_sid: str) -> Optional[Session]:
+        raise NotImplementedError
+
+    async def get_many(self, call_sids: Iterable[str]) -> List[Optional[Session]]:
+        return [await self.get(call_sid) for call_sid in call_sids]
+
+    async def save(self, call_sid: str, session: Session) -> None:
+        raise NotImplementedError
+
+    async def delete(self, call_sid: str) -> bool:
+        """Remove a finished call's session; returns whether it existed"""
+        raise NotImplementedError
+
+    async def count(self) -> int:
+        raise NotImplementedError
+
+    async def sweep(self) -> int:
+        """Drop expired sessions; returns how many"""
+        raise NotImplementedError
+
+    async def stats(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+    async def run_sweeper(self, interval: float = 30.0) -> None:
+        """Sweep expired sessions every ``interval`` seconds, forever"""
+        logger = logging.getLogger(__name__)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                expired = await self.sweep()
+                if expired:
+                    logger.info(f"Expired {expired} idle sessions")
+            except Exception as e:
+                logger.error(f"Session sweep failed: {e}")
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store; only correct with a single worker.
+
+    Sessions are kept as slotted ``CallSession`` objects in an OrderedDict
+    ordered by last activity. With one TTL for every session that order is
+    also the expiry order, so the sweeper pops expired sessions from the
+    front and LRU eviction pops the same end - both O(1) per session.
+    """
+
+    def __init__(self, ttl: float = 1800.0, max_sessions: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._clock = clock
+        self._sessions = OrderedDict()
+        self._stats = {"created": 0, "completed": 0, "expired": 0, "evicted": 0}
+
+    async def get(self, call_sid: str) -> Optional[Session]:
+        session = self._sessions.get(call_sid)
+        if session is None:
+            return None
+
+        now = self._clock()
+        if now - session.last_activity > self.ttl:
+            del self._sessions[call_sid]
+            self._stats["expired"] += 1
+            return None
+
+        session.last_activity = now
+        self._sessions.move_to_end(call_sid)
+        # A copy, so callers must save() changes, as with Redis
+        return session.copy()
+
+    async def save(self, call_sid: str, session: Session) -> None:
+        if call_sid not in self._sessions:
+            self._stats["created"] += 1
+        session = session.copy()
+        session.last_activity = self._clock()
+        self._sessions[call_sid] = session
+        self._sessions.move_to_end(call_sid)
+
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self._stats["evicted"] += 1
+
+    async def delete(self, call_sid: str) -> bool:
+        if self._sessions.pop(call_sid, None) is None:
+            return False
+        self._stats["completed"] += 1
+        return True
+
+    async def count(self) -> int:
+        return len(self._sessions)
+
+    async def sweep(self) -> int:
+        cutoff = self._clock() - self.ttl
+        expired = 0
+        while self._sessions:
+            if next(iter(self._sessions.values())).last_activity >= cutoff:
+                break
+            self._sessions.popitem(last=False)
+            expired += 1
+        self._stats["expired"] += expired
+        return expired
+
+    async def stats(self) -> Dict[str, int]:
+        return {**self._stats, "active": len(self._sessions)}
+
+
+class RedisSessionStore(SessionStore):
+    """Sessions as compact JSON strings under ``<prefix>:<CallSid>``.
+
+    Session keys carry a Redis TTL that every read or write refreshes. A
+    sorted set ``<prefix>:index`` scores live sessions by last activity, so
+    counting, sweeping stale index entries and LRU eviction never scan keys.
+    Counters shared by all workers live in the ``<prefix>:stats`` hash.
+    Each operation is one pipelined round trip; bulk reads use a single MGET.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "session", client=None,
+                 ttl: float = 1800.0, max_sessions: int = 100000):
+        if client is None:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError:
+                raise RuntimeError("redis is required for the Redis session store (pip install redis)")
+            client = aioredis.from_url(url)
+
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.index_key = f"{prefix}:index"
+        self.stats_key = f"{prefix}:stats"
+        self.logger = logging.getLogger(__name__)
+
+    def _key(self, call_sid: str) -> str:
+        return f"{self.prefix}:{call_sid}"
+
+    async def get(self, call_sid: str) -> Optional[Session]:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.get(self._key(call_sid))
+            pipe.pexpire(self._key(call_sid), int(self.ttl * 1000))
+            pipe.zadd(self.index_key, {call_sid: time.time()}, xx=True)
+            payload, _, _ = await pipe.execute()
+        return decode_session(payload) if payload is not None else None
+
+    async def get_many(self, call_sids: Iterable[str]) -> List[Optional[Session]]:
+        keys = [self._key(call_sid) for call_sid in call_sids]
+        if not keys:
+            return []
+        payloads = await self.client.mget(keys)
+        return [decode_session(payload) if payload is not None else None for payload in payloads]
+
+    async def save(self, call_sid: str, session: Session) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(call_sid), encode_session(session), px=int(self.ttl * 1000))
+            pipe.zadd(self.index_key, {call_sid: time.time()})
+            pipe.zcard(self.index_key)
+            _, added, count = await pipe.execute()
+
+        if added:
+            await self.client.hincrby(self.stats_key, "created", 1)
+        if count > self.max_sessions:
+            await self._evict(count - self.max_sessions)
+
+    async def delete(self, call_sid: str) -> bool:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.delete(self._key(call_sid))
+            pipe.zrem(self.index_key, call_sid)
+            deleted, _ = await pipe.execute()
+
+        if deleted:
+            await self.client.hincrby(self.stats_key, "completed", 1)
+        return bool(deleted)
+
+    async def count(self) -> int:
+        return await self.client.zcard(self.index_key)
+
+    async def sweep(self) -> int:
+        # The session keys expire on their own; this drops their index entries
+        expired = await self.client.zremrangebyscore(self.index_key, "-inf", time.time() - self.ttl)
+        if expired:
+            await self.client.hincrby(self.stats_key, "expired", expired)
+        return expired
+
+    async def stats(self) -> Dict[str, int]:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(self.stats_key)
+            pipe.zcard(self.index_key)
+            counters, active = await pipe.execute()
+
+        stats = {name: 0 for name in ("created", "completed", "expired", "evicted")}
+        stats.update({_text(name): int(value) for name, value in counters.items()})
+        stats["active"] = active
+        return stats
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def _evict(self, excess: int):
+        oldest = await self.client.zpopmin(self.index_key, excess)
+        if not oldest:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.delete(*[self._key(_text(call_sid)) for call_sid, _ in oldest])
+            pipe.hincrby(self.stats_key, "evicted", len(oldest))
+            await pipe.execute()
+
+
+def encode_session(session: Session) -> bytes:
+    """Compact JSON: no whitespace, non-ASCII (Devanagari etc.) kept as UTF-8"""
+    return json.dumps(session.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_session(payload: bytes) -> Session:
+    return CallSession.from_dict(json.loads(payload))
+
+
+def create_session_store(redis_url: Optional[str] = None, ttl: float = 1800.0, max_sessions: int = 100000) -> SessionStore:
+    """Redis-backed store when a URL is configured, otherwise process-local"""
+    if redis_url:
+        return RedisSessionStore(redis_url, ttl=ttl, max_sessions=max_sessions)
+    return InMemorySessionStore(ttl=ttl, max_sessions=max_sessions)
+
+
+def _text(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
@@ -0,0 +1,102 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import time
+import zlib
+from typing import Optional, Union
+
+from services.call_session import CallSession, get_vocabularies, vocabulary_fingerprint
+from services.gazetteer import CONTEXT_SLOTS
+
+TOKEN_VERSION = 1
+MAC_BYTES = 12
+
+# First byte of the token body: how the JSON payload is stored
+_PLAIN = b"j"
+_DEFLATED = b"z"
+
+
+class SessionSigner:
+    """Carries a ``CallSession`` in a URL instead of a session store.
+
+    The token is the session packed as a short JSON array - issue time, turn
+    count, caller number and the language and context slot codes - deflated
+    when that makes it shorter, base64url-encoded and followed by a truncated
+    HMAC-SHA256. The MAC covers the CallSid too, so a token only works for
+    the call it was issued for, and tokens older than ``max_age`` are refused.
+
+    Slot codes are only portable for seeded vocabulary values, so other
+    values travel as strings. The signing key mixes in the vocabulary
+    fingerprint: nodes built from different gazetteer data reject each
+    other's tokens rather than misread the codes.
+    """
+
+    def __init__(self, secret: Union[str, bytes], max_age: float = 1800.0):
+        if isinstance(secret, str):
+            secret = secret.encode("utf-8")
+        self.key = hmac.new(secret, b"session-token:" + vocabulary_fingerprint(), hashlib.sha256).digest()
+        self.max_age = max_age
+        self.logger = logging.getLogger(__name__)
+
+    def encode(self, call_sid: str, session: CallSession) -> str:
+        vocabularies = get_vocabularies()
+        fields = [TOKEN_VERSION, int(time.time()), session.turns, session.from_number or "",
+                  _pack(vocabularies["language"], session._language)]
+        fields.extend(_pack(vocabularies[slot], getattr(session, f"_{slot}")) for slot in CONTEXT_SLOTS)
+
+        payload = json.dumps(fields, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        deflated = _deflate(payload)
+        body = _DEFLATED + deflated if len(deflated) < len(payload) else _PLAIN + payload
+        return _b64encode(body) + "." + _b64encode(self._mac(call_sid, body))
+
+    def decode(self, call_sid: str, token: Optional[str]) -> Optional[CallSession]:
+        """The session in ``token``, or None if it is missing, forged, for another call or expired"""
+        if not token or "." not in token:
+            return None
+        try:
+            encoded_body, encoded_mac = token.split(".", 1)
+            body = _b64decode(encoded_body)
+            if not hmac.compare_digest(_b64decode(encoded_mac), self._mac(call_sid, body)):
+                self.logger.warning(f"Rejected session token with a bad signature for call {call_sid}")
+                return None
+
+            payload = zlib.decompress(body[1:], -zlib.MAX_WBITS) if body[:1] == _DEFLATED else body[1:]
+            version, issued, turns, from_number, language, *slots = json.loads(payload)
+        except Exception as e:
+            self.logger.warning(f"Rejected malformed session token for call {call_sid}: {e}")
+            return None
+
+        if version != TOKEN_VERSION or time.time() - issued > self.max_age:
+            return None
+
+        vocabularies = get_vocabularies()
+        session = CallSession(from_number or None, _unpack(vocabularies["language"], language) or "hindi",
+                              turns=turns)
+        session.context = {slot: _unpack(vocabularies[slot], value) for slot, value in zip(CONTEXT_SLOTS, slots)}
+        return session
+
+    def _mac(self, call_sid: str, body: bytes) -> bytes:
+        return hmac.new(self.key, call_sid.encode("utf-8") + b"\0" + body, hashlib.sha256).digest()[:MAC_BYTES]
+
+
+def _pack(vocabulary, code: int) -> Union[int, str]:
+    return code if code <= vocabulary.seeded else vocabulary.value(code)
+
+
+def _unpack(vocabulary, value: Union[int, str]) -> Optional[str]:
+    return vocabulary.value(value) if isinstance(value, int) else value
+
+
+def _deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
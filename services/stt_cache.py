@@ -0,0 +1,113 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from services.audio_stream import WavStreamDecoder
+
+
+def audio_fingerprint(audio_data: bytes, language_code: str) -> str:
+    """Content key for an utterance: hash of its normalized PCM plus the language.
+
+    WAV input is decoded to mono 16-bit samples first, so the same audio
+    wrapped in a different header (or mu-law instead of PCM) hashes the same.
+    Anything that is not a WAV we can decode is hashed as raw bytes.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        decoder = WavStreamDecoder()
+        samples = decoder.feed(audio_data)
+        if samples is None:
+            raise ValueError("no audio frames")
+        digest.update(str(decoder.sample_rate).encode())
+        digest.update(samples.astype("<i2").tobytes())
+    except ValueError:
+        digest.update(audio_data)
+
+    return f"{language_code}-{digest.hexdigest()}"
+
+
+class STTResultCache:
+    """Two-tier transcript cache: an in-memory LRU in front of an optional disk directory"""
+
+    def __init__(self, max_entries: int = 10000, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.logger = logging.getLogger(__name__)
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return text
+
+        text = self._read_disk(key)
+        with self._lock:
+            if text is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+
+        self._remember(key, text)
+        return text
+
+    def put(self, key: str, text: str):
+        self._remember(key, text)
+        self._write_disk(key, text)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def _remember(self, key: str, text: str):
+        with self._lock:
+            self._entries[key] = text
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[-2:], f"{key}.txt")
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self.logger.error(f"STT cache read failed: {e}")
+            return None
+
+    def _write_disk(self, key: str, text: str):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write-then-rename so concurrent readers never see a partial entry
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(temp_path, path)
+        except OSError as e:
+            self.logger.error(f"STT cache write failed: {e}")
@@ -1,17 +1,52 @@
 import requests
 import logging
 import os
-from typing import Optional
+import itertools
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
 import wave
 import numpy as np
 from pydub import AudioSegment
 import tempfile
 
+from services.audio_codec import pcm16_to_wav
+from services.audio_stream import iter_speech_segments
+from services.circuit_breaker import CircuitBreaker
+from services.gazetteer import get_default_gazetteer
+from services.hedging import HedgeMetrics, HedgePolicy, LatencyTracker, hedged_call
+from services.stt_cache import STTResultCache, audio_fingerprint
+
 class STTService:
-    def __init__(self, stt_url: str = "http://localhost:8001/stt"):
+    # Streaming recognition of Twilio recordings
+    STREAM_CHUNK_BYTES = 16384
+    MAX_SEGMENTS_IN_FLIGHT = 2
+    
+    def __init__(self, stt_url: str = "http://localhost:8001/stt",
+                 hedge_policies: Optional[Dict[str, HedgePolicy]] = None,
+                 breaker_options: Optional[dict] = None,
+                 result_cache: Optional[STTResultCache] = None):
         self.stt_url = stt_url
         self.logger = logging.getLogger(__name__)
         
+        # Identical audio (webhook retries, replayed prompts) is recognized only once
+        self.result_cache = result_cache if result_cache is not None else STTResultCache()
+        
+        # One circuit breaker per engine; an open breaker skips straight to the next engine
+        breaker_options = breaker_options or {}
+        self.breakers = {
+            "vakyansh": CircuitBreaker("stt.vakyansh", probe=self._probe_vakyansh, **breaker_options),
+            "google": CircuitBreaker("stt.google", **breaker_options)
+        }
+        
+        # Hedging: if an engine is slower than its observed p95, race the next engine
+        self.hedge_policies = hedge_policies if hedge_policies is not None else {"vakyansh": HedgePolicy()}
+        self.latency_trackers = {"vakyansh": LatencyTracker(), "google": LatencyTracker()}
+        self.hedge_metrics = HedgeMetrics()
+        self._hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="stt-hedge")
+        self._segment_executor = ThreadPoolExecutor(max_workers=self.MAX_SEGMENTS_IN_FLIGHT, thread_name_prefix="stt-segment")
+        
         # Language codes for Vakyansh STT
         self.language_codes = {
             "hindi": "hi-IN",
@@ -29,7 +64,36 @@ class STTService:
         }
     
     def convert_audio_to_text(self, audio_data: bytes, language: str = "hindi") -> Optional[str]:
-        """Convert audio to text using Vakyansh STT"""
+        """Convert audio to text using Vakyansh STT, hedged against the fallback engine"""
+        cache_key = audio_fingerprint(audio_data, self.language_codes.get(language.lower(), "hi-IN"))
+        text = self.result_cache.get(cache_key)
+        if text is not None:
+            return text
+        
+        text = self._recognize(audio_data, language)
+        if text:
+            self.result_cache.put(cache_key, text)
+        return text
+    
+    def _recognize(self, audio_data: bytes, language: str) -> Optional[str]:
+        """Run the engine chain: Vakyansh first, hedged with and falling back to Google"""
+        primary = lambda: self._call_engine("vakyansh", self._vakyansh_stt, audio_data, language)
+        fallback = lambda: self._fallback_stt(audio_data, language)
+        
+        if self.breakers["vakyansh"].state == CircuitBreaker.OPEN:
+            # Upstream known to be down: don't pay for a timeout or a hedge
+            return fallback()
+        
+        policy = self.hedge_policies.get("vakyansh")
+        if policy is None or not policy.enabled:
+            text = primary()
+            return text if text is not None else fallback()
+        
+        delay = policy.hedge_delay(self.latency_trackers["vakyansh"])
+        return hedged_call(primary, fallback, delay, self._hedge_executor, self.hedge_metrics)
+    
+    def _vakyansh_stt(self, audio_data: bytes, language: str) -> Optional[str]:
+        """Vakyansh STT request; returns None on failure"""
         try:
             # Get language code
             lang_code = self.language_codes.get(language.lower(), "hi-IN")
@@ -52,17 +116,44 @@ class STTService:
                 return result.get('text', '')
             else:
                 self.logger.error(f"STT API error: {response.status_code}")
-                return self._fallback_stt(audio_data, language)
+                return None
                 
         except Exception as e:
             self.logger.error(f"Error in STT conversion: {e}")
-            return self._fallback_stt(audio_data, language)
+            return None
+    
+    def _call_engine(self, engine: str, func: Callable, *args) -> Optional[str]:
+        """Call an engine through its circuit breaker and record its latency when it succeeds"""
+        started = time.monotonic()
+        result = self.breakers[engine].call(func, *args)
+        if result is not None:
+            self.latency_trackers[engine].record(time.monotonic() - started)
+        return result
+    
+    def _probe_vakyansh(self) -> bool:
+        """Background health probe: any non-5xx answer means the endpoint is reachable"""
+        response = requests.get(self.stt_url, timeout=5)
+        return response.status_code < 500
+    
+    def get_breaker_status(self) -> dict:
+        """Circuit breaker state per engine"""
+        return {engine: breaker.snapshot() for engine, breaker in self.breakers.items()}
+    
+    def get_hedge_stats(self) -> dict:
+        """Hedging counters plus the current hedge delay per engine"""
+        stats = self.hedge_metrics.snapshot()
+        stats["hedge_delays"] = {
+            engine: policy.hedge_delay(self.latency_trackers[engine])
+            for engine, policy in self.hedge_policies.items()
+            if policy.enabled and engine in self.latency_trackers
+        }
+        return stats
     
     def _fallback_stt(self, audio_data: bytes, language: str) -> Optional[str]:
         """Fallback STT using alternative methods"""
         try:
             # Try using Google Speech Recognition as fallback
-            return self._google_stt_fallback(audio_data, language)
+            return self._call_engine("google", self._google_stt_fallback, audio_data, language)
         except Exception as e:
             self.logger.error(f"Fallback STT failed: {e}")
             return None
@@ -103,109 +194,59 @@ class STTService:
             self.logger.error(f"Google STT fallback failed: {e}")
             return None
     
-    def process_twilio_audio(self, audio_url: str, account_sid: str, auth_token: str) -> Optional[str]:
+    def process_twilio_audio(self, audio_url: str, account_sid: str, auth_token: str,
+                             language: str = "hindi") -> Optional[str]:
         """Process audio from Twilio call"""
         try:
-            # Download audio from Twilio
-            response = requests.get(
+            # Stream the recording instead of holding it in memory
+            with requests.get(
                 audio_url,
                 auth=(account_sid, auth_token),
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                audio_data = response.content
-                return self.convert_audio_to_text(audio_data)
-            else:
-                self.logger.error(f"Failed to download audio: {response.status_code}")
-                return None
+                timeout=30,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    self.logger.error(f"Failed to download audio: {response.status_code}")
+                    return None
+                
+                chunks = response.iter_content(chunk_size=self.STREAM_CHUNK_BYTES)
+                first_chunk = next(chunks, b"")
+                
+                if not first_chunk.startswith(b"RIFF"):
+                    # Not a WAV stream (e.g. MP3): recognize the whole recording as before
+                    return self.convert_audio_to_text(first_chunk + b"".join(chunks), language)
+                
+                return self.transcribe_stream(itertools.chain([first_chunk], chunks), language)
                 
         except Exception as e:
             self.logger.error(f"Error processing Twilio audio: {e}")
             return None
     
-    def extract_farming_context(self, text: str) -> dict:
-        """Extract farming-related context from transcribed text"""
-        context = {
-            'location': None,
-            'crop': None,
-            'water_condition': None,
-            'soil_type': None,
-            'season': None
-        }
-        
-        text_lower = text.lower()
-        
-        # Extract location
-        location_keywords = {
-            'haryana': 'हरियाणा',
-            'punjab': 'पंजाब', 
-            'gujarat': 'गुजरात',
-            'maharashtra': 'महाराष्ट्र',
-            'karnataka': 'कर्नाटक',
-            'tamil nadu': 'तमिलनाडु'
-        }
-        
-        for english_loc, hindi_loc in location_keywords.items():
-            if english_loc in text_lower:
-                context['location'] = hindi_loc
-                break
-        
-        # Extract crop
-        crop_keywords = {
-            'gehun': 'wheat',
-            'chawal': 'rice', 
-            'makka': 'maize',
-            'bajra': 'pearl millet',
-            'jowar': 'sorghum',
-            'cotton': 'cotton',
-            'sugarcane': 'sugarcane',
-            'potato': 'potato',
-            'tomato': 'tomato',
-            'onion': 'onion'
-        }
-        
-        for hindi_crop, english_crop in crop_keywords.items():
-            if hindi_crop in text_lower or english_crop in text_lower:
-                context['crop'] = english_crop
-                break
-        
-        # Extract water condition
-        if 'paani' in text_lower or 'water' in text_lower:
-            if 'kami' in text_lower or 'shortage' in text_lower or 'less' in text_lower:
-                context['water_condition'] = 'shortage'
-            elif 'bharpur' in text_lower or 'excess' in text_lower or 'more' in text_lower:
-                context['water_condition'] = 'excess'
-            else:
-                context['water_condition'] = 'normal'
-        
-        # Extract soil type
-        soil_keywords = {
-            'kali': 'black soil',
-            'lal': 'red soil',
-            'peeli': 'yellow soil',
-            'balu': 'sandy soil',
-            'chikni': 'clay soil'
-        }
+    def transcribe_stream(self, chunks: Iterable[bytes], language: str = "hindi") -> Optional[str]:
+        """Transcribe a WAV byte stream segment by segment as speech segments close.
         
-        for hindi_soil, english_soil in soil_keywords.items():
-            if hindi_soil in text_lower or english_soil in text_lower:
-                context['soil_type'] = english_soil
-                break
+        Chunks are decoded and split on silence as they arrive; each segment is
+        sent to STT immediately, with at most MAX_SEGMENTS_IN_FLIGHT outstanding,
+        so memory per call is bounded regardless of recording length.
+        """
+        pending = deque()
+        texts = []
         
-        # Extract season
-        season_keywords = {
-            'rabi': 'rabi',
-            'kharif': 'kharif',
-            'zaid': 'zaid',
-            'summer': 'summer',
-            'winter': 'winter',
-            'monsoon': 'monsoon'
-        }
-        
-        for season in season_keywords:
-            if season in text_lower:
-                context['season'] = season
-                break
+        for samples, sample_rate in iter_speech_segments(chunks):
+            segment_wav = pcm16_to_wav(samples, sample_rate)
+            pending.append(self._segment_executor.submit(self.convert_audio_to_text, segment_wav, language))
+            if len(pending) >= self.MAX_SEGMENTS_IN_FLIGHT:
+                texts.append(pending.popleft().result())
         
-        return context 
\ No newline at end of file
+        texts.extend(future.result() for future in pending)
+        texts = [text for text in texts if text]
+        return " ".join(texts) if texts else None
+    
+    def extract_farming_context(self, text: str) -> dict:
+        """Extract farming-related context from transcribed text"""
+        # Single longest-match scan over the compiled gazetteer (data/gazetteer/*.tsv)
+        return get_default_gazetteer().extract(text)
+    
+    def extract_farming_context_with_fuzzy_slots(self, text: str) -> Tuple[dict, Set[str]]:
+        """Extract the farming context plus the slots only a fuzzy (misspelling-tolerant) match filled"""
+        return get_default_gazetteer().extract_with_fuzzy_slots(text)
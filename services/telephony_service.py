@@ -1,8 +1,14 @@
 import requests
 import logging
-from typing import Dict, Any, Optional
+import threading
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape
 from twilio.rest import Client
-from twilio.twiml import VoiceResponse
+from twilio.twiml.voice_response import VoiceResponse
+
+# Stand in for the answer and the signed session state while templates are rendered
+ANSWER_PLACEHOLDER = "__FARMER_AI_ANSWER__"
+STATE_PLACEHOLDER = "__FARMER_AI_STATE__"
 
 class TelephonyService:
     def __init__(self, config):
@@ -15,18 +21,29 @@ class TelephonyService:
         else:
             self.twilio_client = None
             self.logger.warning("Twilio credentials not configured")
+        
+        # Static TwiML serialized once: (kind, language, audio_url) -> bytes, and
+        # templates: (mode, language, stateful) -> parts around the placeholders
+        self._compiled = {}
+        self._templates = {}
+        self._compile_lock = threading.Lock()
     
-    def create_greeting_response(self, language: str = "hindi") -> str:
+    def create_greeting_response(self, language: str = "hindi", audio_url: Optional[str] = None,
+                                 state: Optional[str] = None) -> str:
         """Create TwiML response for initial greeting"""
         response = VoiceResponse()
         
-        greeting_text = self._get_greeting_text(language)
-        response.say(greeting_text, language=language)
+        # Play pre-rendered greeting audio when available
+        if audio_url:
+            response.play(audio_url)
+        else:
+            greeting_text = self._get_greeting_text(language)
+            response.say(greeting_text, language=language)
         
         # Gather speech input
         gather = response.gather(
             input='speech',
-            action='/process_context',
+            action=self._action('/process_context', state),
             method='POST',
             speech_timeout='auto',
             language=language
@@ -35,17 +52,22 @@ class TelephonyService:
         
         return str(response)
     
-    def create_query_response(self, language: str = "hindi") -> str:
+    def create_query_response(self, language: str = "hindi", audio_url: Optional[str] = None,
+                              state: Optional[str] = None) -> str:
         """Create TwiML response for asking query"""
         response = VoiceResponse()
         
-        query_text = self._get_query_text(language)
-        response.say(query_text, language=language)
+        # Play pre-rendered prompt audio when available
+        if audio_url:
+            response.play(audio_url)
+        else:
+            query_text = self._get_query_text(language)
+            response.say(query_text, language=language)
         
         # Gather speech input
         gather = response.gather(
             input='speech',
-            action='/process_query',
+            action=self._action('/process_query', state),
             method='POST',
             speech_timeout='auto',
             language=language
@@ -54,11 +76,20 @@ class TelephonyService:
         
         return str(response)
     
-    def create_ai_response(self, ai_text: str, language: str = "hindi") -> str:
-        """Create TwiML response with AI answer"""
+    def create_ai_response(self, ai_text: str, language: str = "hindi", audio_urls: Optional[List[str]] = None,
+                           state: Optional[str] = None, sentences: Optional[List[str]] = None) -> str:
+        """Create TwiML response with AI answer.
+        
+        A None in ``audio_urls`` marks a sentence that could not be synthesized;
+        the matching entry of ``sentences`` is spoken with <Say> instead.
+        """
         response = VoiceResponse()
         
-        response.say(ai_text, language=language)
+        # Play the synthesized answer segments in order when available
+        if audio_urls:
+            self._add_segments(response, audio_urls, sentences, language)
+        else:
+            response.say(ai_text, language=language)
         
         # Ask if they want to ask another question
         response.say("क्या आप कोई और सवाल पूछना चाहते हैं?", language=language)
@@ -66,7 +97,7 @@ class TelephonyService:
         # Gather for another question
         gather = response.gather(
             input='speech',
-            action='/process_query',
+            action=self._action('/process_query', state),
             method='POST',
             speech_timeout='auto',
             language=language
@@ -75,6 +106,127 @@ class TelephonyService:
         
         return str(response)
     
+    def create_partial_answer_response(self, audio_urls: List[Optional[str]], sentences: List[str],
+                                       continue_url: str, language: str = "hindi") -> str:
+        """Create TwiML that plays the first answer segments, then fetches the rest from ``continue_url``"""
+        response = VoiceResponse()
+        
+        self._add_segments(response, audio_urls, sentences, language)
+        response.redirect(continue_url, method='POST')
+        
+        return str(response)
+    
+    def _add_segments(self, response: VoiceResponse, audio_urls: List[Optional[str]],
+                      sentences: Optional[List[str]], language: str):
+        for index, audio_url in enumerate(audio_urls):
+            if audio_url:
+                response.play(audio_url)
+            elif sentences and index < len(sentences):
+                response.say(sentences[index], language=language)
+    
+    def compiled_greeting(self, language: str = "hindi", audio_url: Optional[str] = None,
+                          state: Optional[str] = None) -> bytes:
+        """Greeting TwiML as bytes, serialized once per language and prompt audio URL"""
+        return self._compiled_response("greeting", language, audio_url, self.create_greeting_response, state)
+    
+    def compiled_query(self, language: str = "hindi", audio_url: Optional[str] = None,
+                       state: Optional[str] = None) -> bytes:
+        """Query prompt TwiML as bytes, serialized once per language and prompt audio URL"""
+        return self._compiled_response("query", language, audio_url, self.create_query_response, state)
+    
+    def precompile_static_responses(self, languages: Iterable[str],
+                                    audio_url_for: Optional[Callable[[str, str], Optional[str]]] = None):
+        """Serialize the greeting, query prompt, AI response and hold templates for every language up front"""
+        audio_url_for = audio_url_for or (lambda prompt, language: None)
+        for language in languages:
+            self.compiled_greeting(language, audio_url_for("greeting", language))
+            self.compiled_query(language, audio_url_for("query_prompt", language))
+            for mode in ("say", "play", "hold", "poll"):
+                self._template(mode, language)
+    
+    def render_ai_response(self, ai_text: str, language: str = "hindi", audio_urls: Optional[List[str]] = None,
+                           state: Optional[str] = None, sentences: Optional[List[str]] = None) -> bytes:
+        """Same TwiML as create_ai_response, spliced into a pre-serialized template"""
+        if audio_urls and not any(audio_urls):
+            audio_urls = None
+        if audio_urls and not all(audio_urls):
+            # Some sentences fell back to <Say>; rare enough to build the TwiML directly
+            return self.create_ai_response(ai_text, language, audio_urls, state, sentences).encode("utf-8")
+        if audio_urls:
+            parts = self._template("play", language, stateful=state is not None)
+            answer = "</Play><Play>".join(escape(audio_url) for audio_url in audio_urls)
+        else:
+            parts = self._template("say", language, stateful=state is not None)
+            answer = escape(ai_text)
+        return _splice(parts, answer, state)
+    
+    def create_campaign_response(self, message: str, language: str = "hindi") -> str:
+        """Create TwiML for an outbound advisory call: the message, then the normal assistant flow"""
+        response = VoiceResponse()
+        
+        response.say(message, language=language)
+        response.redirect('/voice', method='POST')
+        
+        return str(response)
+    
+    def create_hold_response(self, poll_url: str, language: str = "hindi", announce: bool = True) -> str:
+        """Create TwiML that keeps the caller on hold and redirects to the answer poll endpoint"""
+        response = VoiceResponse()
+        
+        if announce:
+            response.say(self._get_hold_text(language), language=language)
+        response.redirect(poll_url, method='POST')
+        
+        return str(response)
+    
+    def render_hold_response(self, poll_url: str, language: str = "hindi", announce: bool = True) -> bytes:
+        """Same TwiML as create_hold_response, spliced into a pre-serialized template"""
+        parts = self._template("hold" if announce else "poll", language)
+        return _splice(parts, escape(poll_url))
+    
+    def _compiled_response(self, kind: str, language: str, audio_url: Optional[str], build: Callable,
+                           state: Optional[str] = None) -> bytes:
+        if state is not None:
+            # The state differs per call; splice it into a template with the rest serialized once
+            key = (kind, language, audio_url, STATE_PLACEHOLDER)
+            parts = self._compiled.get(key)
+            if parts is None:
+                twiml = build(language, audio_url=audio_url, state=STATE_PLACEHOLDER).encode("utf-8")
+                parts = tuple(twiml.split(STATE_PLACEHOLDER.encode("utf-8")))
+                with self._compile_lock:
+                    self._compiled[key] = parts
+            return _splice(parts, None, state)
+        
+        key = (kind, language, audio_url)
+        twiml = self._compiled.get(key)
+        if twiml is None:
+            twiml = build(language, audio_url=audio_url).encode("utf-8")
+            with self._compile_lock:
+                self._compiled[key] = twiml
+        return twiml
+    
+    def _template(self, mode: str, language: str, stateful: bool = False) -> Tuple[bytes, ...]:
+        key = (mode, language, stateful)
+        template = self._templates.get(key)
+        if template is None:
+            state = STATE_PLACEHOLDER if stateful else None
+            if mode == "play":
+                twiml = self.create_ai_response("", language, audio_urls=[ANSWER_PLACEHOLDER], state=state)
+            elif mode == "say":
+                twiml = self.create_ai_response(ANSWER_PLACEHOLDER, language, state=state)
+            else:
+                twiml = self.create_hold_response(ANSWER_PLACEHOLDER, language, announce=(mode == "hold"))
+            # The answer always comes before the Gather that carries the state
+            prefix, rest = twiml.encode("utf-8").split(ANSWER_PLACEHOLDER.encode("utf-8"))
+            template = (prefix, *rest.split(STATE_PLACEHOLDER.encode("utf-8")))
+            with self._compile_lock:
+                self._templates[key] = template
+        return template
+    
+    def _action(self, path: str, state: Optional[str]) -> str:
+        """Webhook URL for the next turn, carrying the signed session state in stateless mode"""
+        return f"{path}?state={state}" if state is not None else path
+    
     def _get_greeting_text(self, language: str) -> str:
         """Get greeting text in specified language"""
         greetings = {
@@ -93,7 +245,17 @@ class TelephonyService:
         }
         return prompts.get(language, prompts["hindi"])
     
-    def make_call(self, to_number: str, from_number: str = None) -> Optional[str]:
+    def _get_hold_text(self, language: str) -> str:
+        """Get hold message in specified language"""
+        messages = {
+            "hindi": "कृपया प्रतीक्षा करें, आपका जवाब तैयार हो रहा है।",
+            "english": "Please wait, your answer is being prepared.",
+            "punjabi": "ਕਿਰਪਾ ਕਰਕੇ ਉਡੀਕ ਕਰੋ, ਤੁਹਾਡਾ ਜਵਾਬ ਤਿਆਰ ਹੋ ਰਿਹਾ ਹੈ।"
+        }
+        return messages.get(language, messages["hindi"])
+    
+    def make_call(self, to_number: str, from_number: str = None, webhook_url: Optional[str] = None,
+                  status_callback: Optional[str] = None) -> Optional[str]:
         """Make an outbound call using Twilio"""
         if not self.twilio_client:
             self.logger.error("Twilio client not initialized")
@@ -101,12 +263,19 @@ class TelephonyService:
         
         try:
             from_number = from_number or self.config.TWILIO_PHONE_NUMBER
+            webhook_url = webhook_url or f"{self.config.PUBLIC_BASE_URL}/voice"
+            
+            options = {}
+            if status_callback:
+                options["status_callback"] = status_callback
+                options["status_callback_method"] = "POST"
             
             call = self.twilio_client.calls.create(
                 to=to_number,
                 from_=from_number,
-                url='https://your-domain.com/voice',  # Webhook URL
-                method='POST'
+                url=webhook_url,
+                method='POST',
+                **options
             )
             
             self.logger.info(f"Call initiated: {call.sid}")
@@ -114,4 +283,14 @@ class TelephonyService:
             
         except Exception as e:
             self.logger.error(f"Error making call: {e}")
-            return None 
\ No newline at end of file
+            return None
+
+
+def _splice(parts: Tuple[bytes, ...], answer: Optional[str] = None, state: Optional[str] = None) -> bytes:
+    """Join template parts around the answer (if the template has one) and the state"""
+    values = [value for value in (answer, state) if value is not None]
+    spliced = [parts[0]]
+    for value, part in zip(values, parts[1:]):
+        spliced.append(value.encode("utf-8"))
+        spliced.append(part)
+    return b"".join(spliced)
@@ -2,17 +2,62 @@ import requests
 import logging
 import tempfile
 import os
-from typing import Optional, Tuple
+import re
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import AsyncIterator, Callable, List, Optional, Tuple
 from gtts import gTTS
 import edge_tts
 import asyncio
 import io
 
+from services.audio_format import OUTPUT_FORMATS, convert_audio
+from services.audio_store import AudioStore
+from services.circuit_breaker import CircuitBreaker
+
+# Danda, question and exclamation marks always end a sentence; a full stop only
+# when followed by whitespace, so decimals like "2.5" stay intact
+SENTENCE_BOUNDARY = re.compile(r"(?<=[।?!])\s*|(?<=\.)\s+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split an answer into sentences for pipelined synthesis"""
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
 class TTSService:
-    def __init__(self, tts_url: str = "http://localhost:8002/tts"):
+    def __init__(self, tts_url: str = "http://localhost:8002/tts", breaker_options: Optional[dict] = None,
+                 audio_store: Optional[AudioStore] = None, public_base_url: str = "",
+                 max_concurrent_syntheses: int = 8, synthesis_cache_entries: int = 4096):
         self.tts_url = tts_url
         self.logger = logging.getLogger(__name__)
         
+        # Bounds in-flight syntheses on the app's event loop; created on first use
+        # so it binds to the running loop
+        self.max_concurrent_syntheses = max_concurrent_syntheses
+        self._synthesis_slots = None
+        
+        # Synthesized clips are served back to Twilio from /audio/{clip_id}
+        self.audio_store = audio_store or AudioStore()
+        self.public_base_url = public_base_url.rstrip("/")
+        
+        # Single-flight: identical concurrent requests share one synthesis, and
+        # finished ones are remembered as (text, voice, format) -> clip id in the store
+        self.synthesis_cache_entries = synthesis_cache_entries
+        self._synthesized = OrderedDict()
+        self._inflight = {}
+        self._inflight_async = {}
+        self._inflight_lock = threading.Lock()
+        self._synthesis_stats = {"syntheses": 0, "coalesced": 0, "cache_hits": 0}
+        
+        # One circuit breaker per engine; an open breaker skips straight to the next engine
+        breaker_options = breaker_options or {}
+        self.breakers = {
+            "vakyansh": CircuitBreaker("tts.vakyansh", probe=self._probe_vakyansh, **breaker_options),
+            "edge": CircuitBreaker("tts.edge", **breaker_options),
+            "gtts": CircuitBreaker("tts.gtts", **breaker_options)
+        }
+        
         # Voice mapping for different languages
         self.voice_mapping = {
             "hindi": {
@@ -77,8 +122,143 @@ class TTSService:
             }
         }
     
-    def text_to_speech(self, text: str, language: str = "hindi") -> Optional[bytes]:
-        """Convert text to speech using Vakyansh TTS"""
+    def text_to_speech(self, text: str, language: str = "hindi", output_format: str = "native") -> Optional[bytes]:
+        """Convert text to speech using Vakyansh TTS.
+        
+        ``output_format`` is one of OUTPUT_FORMATS: "native" returns the engine's
+        audio as-is, "wav" and "mulaw" convert it in-process to 8 kHz mono.
+        Identical concurrent requests wait on one synthesis, and finished
+        audio is reused from the audio store (per format) while it is still there.
+        """
+        key = self._synthesis_key(text, language, output_format)
+        audio_data = self._cached_audio(key)
+        if audio_data is not None:
+            return audio_data
+        
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self._synthesis_stats["syntheses"] += 1
+            else:
+                self._synthesis_stats["coalesced"] += 1
+        
+        if not leader:
+            return future.result()
+        
+        try:
+            if output_format != "native":
+                audio_data = self._convert(self.text_to_speech(text, language), output_format)
+            else:
+                audio_data = self.breakers["vakyansh"].call(self._vakyansh_tts, text, language)
+                if audio_data is None:
+                    audio_data = self._fallback_tts(text, language)
+            self._remember_audio(key, audio_data)
+            future.set_result(audio_data)
+            return audio_data
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+    
+    async def text_to_speech_async(self, text: str, language: str = "hindi", output_format: str = "native") -> Optional[bytes]:
+        """Async variant of text_to_speech for use on the app's event loop.
+        
+        Edge TTS is awaited directly; the blocking Vakyansh and gTTS calls run
+        in worker threads. At most ``max_concurrent_syntheses`` run at once, and
+        identical concurrent requests share one in-flight synthesis.
+        """
+        key = self._synthesis_key(text, language, output_format)
+        audio_data = self._cached_audio(key)
+        if audio_data is not None:
+            return audio_data
+        
+        task = self._inflight_async.get(key)
+        with self._inflight_lock:
+            if task is None:
+                self._synthesis_stats["syntheses"] += 1
+            else:
+                self._synthesis_stats["coalesced"] += 1
+        
+        if task is None:
+            task = asyncio.ensure_future(self._synthesize_async(key, text, language, output_format))
+            self._inflight_async[key] = task
+            task.add_done_callback(lambda done: self._inflight_async.pop(key, None))
+        
+        # Shielded so one caller giving up does not cancel the shared synthesis
+        return await asyncio.shield(task)
+    
+    async def _synthesize_async(self, key: tuple, text: str, language: str, output_format: str) -> Optional[bytes]:
+        if output_format != "native":
+            # Convert from the (shared, cached) native audio outside the synthesis slots
+            audio_data = await self.text_to_speech_async(text, language)
+            audio_data = await asyncio.to_thread(self._convert, audio_data, output_format)
+            self._remember_audio(key, audio_data)
+            return audio_data
+        
+        if self._synthesis_slots is None:
+            self._synthesis_slots = asyncio.Semaphore(self.max_concurrent_syntheses)
+        
+        async with self._synthesis_slots:
+            audio_data = await asyncio.to_thread(self.breakers["vakyansh"].call, self._vakyansh_tts, text, language)
+            
+            if audio_data is None:
+                audio_data = await self.breakers["edge"].call_async(self._edge_tts_stream, text, language)
+                if audio_data is None:
+                    self.logger.error("edge TTS fallback failed")
+            
+            if audio_data is None:
+                audio_data = await asyncio.to_thread(self.breakers["gtts"].call, self._gtts_fallback, text, language)
+                if audio_data is None:
+                    self.logger.error("gtts TTS fallback failed")
+        
+        self._remember_audio(key, audio_data)
+        return audio_data
+    
+    async def synthesize_pipelined(
+        self,
+        text: str,
+        language: str = "hindi",
+        max_parallel: int = 3,
+        on_first_segment: Optional[Callable[[bytes], None]] = None,
+        output_format: str = "native"
+    ) -> AsyncIterator[Optional[bytes]]:
+        """Synthesize a long answer sentence by sentence, yielding audio in order.
+        
+        Up to ``max_parallel`` sentences are synthesized ahead of the one being
+        yielded, so the first segment is ready after one short sentence rather
+        than the whole paragraph. A sentence that fails in every engine yields
+        None. ``on_first_segment`` is called with the first playable segment.
+        """
+        sentences = split_sentences(text)
+        pending = deque()
+        next_index = 0
+        first = True
+        
+        try:
+            while next_index < len(sentences) or pending:
+                while next_index < len(sentences) and len(pending) < max_parallel:
+                    pending.append(asyncio.ensure_future(
+                        self.text_to_speech_async(sentences[next_index], language, output_format)
+                    ))
+                    next_index += 1
+                
+                audio_data = await pending.popleft()
+                if first and audio_data is not None:
+                    first = False
+                    if on_first_segment:
+                        on_first_segment(audio_data)
+                yield audio_data
+        finally:
+            # The consumer stopped early: don't leave syntheses running
+            for task in pending:
+                task.cancel()
+    
+    def _vakyansh_tts(self, text: str, language: str) -> Optional[bytes]:
+        """Vakyansh TTS request; returns None on failure"""
         try:
             # Get voice configuration
             voice_config = self.voice_mapping.get(language.lower(), self.voice_mapping["hindi"])
@@ -101,57 +281,101 @@ class TTSService:
                 return response.content
             else:
                 self.logger.error(f"TTS API error: {response.status_code}")
-                return self._fallback_tts(text, language)
+                return None
                 
         except Exception as e:
             self.logger.error(f"Error in TTS conversion: {e}")
-            return self._fallback_tts(text, language)
+            return None
     
     def _fallback_tts(self, text: str, language: str) -> Optional[bytes]:
         """Fallback TTS using alternative methods"""
+        # Try Edge TTS first as it's better for Indian languages, then gTTS
+        for engine, synthesize in (("edge", self._edge_tts_fallback), ("gtts", self._gtts_fallback)):
+            audio_data = self.breakers[engine].call(synthesize, text, language)
+            if audio_data is not None:
+                return audio_data
+            self.logger.error(f"{engine} TTS fallback failed")
+        return None
+    
+    def _probe_vakyansh(self) -> bool:
+        """Background health probe: any non-5xx answer means the endpoint is reachable"""
+        response = requests.get(self.tts_url, timeout=5)
+        return response.status_code < 500
+    
+    def get_synthesis_stats(self) -> dict:
+        """Counts of real syntheses, coalesced duplicates and synthesis cache hits"""
+        with self._inflight_lock:
+            stats = dict(self._synthesis_stats)
+            stats["in_flight"] = len(self._inflight) + len(self._inflight_async)
+            stats["cached_texts"] = len(self._synthesized)
+        return stats
+    
+    def _synthesis_key(self, text: str, language: str, output_format: str) -> tuple:
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown audio output format '{output_format}'")
+        voice_config = self.voice_mapping.get(language.lower(), self.voice_mapping["hindi"])
+        return (text, tuple(sorted(voice_config.items())), output_format)
+    
+    def _convert(self, audio_data: Optional[bytes], output_format: str) -> Optional[bytes]:
+        """Convert native audio; on failure (e.g. no ffmpeg for MP3) keep the native audio"""
+        if audio_data is None:
+            return None
         try:
-            # Try Edge TTS first as it's better for Indian languages
-            return self._edge_tts_fallback(text, language)
+            return convert_audio(audio_data, output_format)
         except Exception as e:
-            self.logger.error(f"Edge TTS fallback failed: {e}")
-            try:
-                # Try gTTS as second fallback
-                return self._gtts_fallback(text, language)
-            except Exception as e2:
-                self.logger.error(f"gTTS fallback failed: {e2}")
-                return None
+            self.logger.error(f"Could not convert TTS audio to {output_format}: {e}")
+            return audio_data
+    
+    def _cached_audio(self, key: tuple) -> Optional[bytes]:
+        with self._inflight_lock:
+            clip_id = self._synthesized.get(key)
+            if clip_id is not None:
+                self._synthesized.move_to_end(key)
+        if clip_id is None:
+            return None
+        
+        # The store may have evicted the clip since
+        audio_data = self.audio_store.get(clip_id)
+        if audio_data is not None:
+            with self._inflight_lock:
+                self._synthesis_stats["cache_hits"] += 1
+        return audio_data
+    
+    def _remember_audio(self, key: tuple, audio_data: Optional[bytes]):
+        if audio_data is None:
+            return
+        clip_id = self.audio_store.put(audio_data)
+        with self._inflight_lock:
+            self._synthesized[key] = clip_id
+            self._synthesized.move_to_end(key)
+            while len(self._synthesized) > self.synthesis_cache_entries:
+                self._synthesized.popitem(last=False)
+    
+    def get_breaker_status(self) -> dict:
+        """Circuit breaker state per engine"""
+        return {engine: breaker.snapshot() for engine, breaker in self.breakers.items()}
     
     def _edge_tts_fallback(self, text: str, language: str) -> Optional[bytes]:
-        """Edge TTS fallback"""
+        """Edge TTS fallback for synchronous callers (not for use on a running event loop)"""
+        return asyncio.run(self._edge_tts_stream(text, language))
+    
+    async def _edge_tts_stream(self, text: str, language: str) -> Optional[bytes]:
+        """Edge TTS, collecting the streamed MP3 chunks in memory"""
         try:
             voice_config = self.voice_mapping.get(language.lower(), self.voice_mapping["hindi"])
-            voice = voice_config["edge"]
-            
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_file:
-                temp_path = temp_file.name
-            
-            # Use edge-tts
-            asyncio.run(self._generate_edge_audio(text, voice, temp_path))
+            communicate = edge_tts.Communicate(text, voice_config["edge"])
             
-            # Read the generated audio
-            with open(temp_path, 'rb') as f:
-                audio_data = f.read()
-            
-            # Clean up
-            os.unlink(temp_path)
+            audio = bytearray()
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio":
+                    audio.extend(chunk["data"])
             
-            return audio_data
+            return bytes(audio) if audio else None
             
         except Exception as e:
             self.logger.error(f"Edge TTS error: {e}")
             return None
     
-    async def _generate_edge_audio(self, text: str, voice: str, output_path: str):
-        """Generate audio using Edge TTS"""
-        communicate = edge_tts.Communicate(text, voice)
-        await communicate.save(output_path)
-    
     def _gtts_fallback(self, text: str, language: str) -> Optional[bytes]:
         """Google TTS fallback"""
         try:
@@ -187,7 +411,7 @@ class TTSService:
             
             if audio_data:
                 # Save audio to temporary file and get URL
-                audio_url = self._save_audio_for_twilio(audio_data)
+                audio_url = self.publish_audio(audio_data)
                 
                 # Create TwiML
                 twiml = f"""<?xml version="1.0" encoding="UTF-8"?>
@@ -219,12 +443,10 @@ class TTSService:
     </Gather>
 </Response>"""
     
-    def _save_audio_for_twilio(self, audio_data: bytes) -> str:
-        """Save audio file and return public URL for Twilio"""
-        # This would typically save to a cloud storage service
-        # For now, we'll return a placeholder
-        # In production, you'd save to S3, Google Cloud Storage, etc.
-        return "https://your-audio-storage-url.com/audio.mp3"
+    def publish_audio(self, audio_data: bytes) -> str:
+        """Save audio to the local audio store and return its public URL for Twilio"""
+        clip_id = self.audio_store.put(audio_data)
+        return f"{self.public_base_url}/audio/{clip_id}"
     
     def get_greeting_message(self, language: str = "hindi") -> str:
         """Get greeting message in specified language"""
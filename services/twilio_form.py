@@ -0,0 +1,126 @@
+import binascii
+import re
+from typing import Optional
+
+from fastapi import Request
+from twilio.request_validator import RequestValidator
+
+# Twilio parameter name -> TwilioForm attribute
+FIELDS = {
+    b"CallSid": "call_sid",
+    b"From": "from_number",
+    b"To": "to_number",
+    b"Direction": "direction",
+    b"SpeechResult": "speech_result",
+    b"Confidence": "confidence",
+    b"EventType": "event_type",
+    b"CallStatus": "call_status",
+}
+
+URLENCODED = "application/x-www-form-urlencoded"
+
+# A run of percent escapes, e.g. one Devanagari word
+_ESCAPES = re.compile(rb"(?:%[0-9A-Fa-f]{2})+")
+
+
+class TwilioForm:
+    """The handful of webhook parameters the handlers read, nothing else"""
+
+    __slots__ = ("call_sid", "from_number", "to_number", "direction", "speech_result", "confidence", "event_type",
+                 "call_status")
+
+    def __init__(self, call_sid: Optional[str] = None, from_number: Optional[str] = None,
+                 to_number: Optional[str] = None, direction: str = "", speech_result: str = "",
+                 confidence: float = 0.0, event_type: Optional[str] = None, call_status: str = ""):
+        self.call_sid = call_sid
+        self.from_number = from_number
+        self.to_number = to_number
+        self.direction = direction
+        self.speech_result = speech_result
+        self.confidence = confidence
+        self.event_type = event_type
+        self.call_status = call_status
+
+    @property
+    def farmer_number(self) -> Optional[str]:
+        """The farmer's side of the call: the caller, or the callee of an outbound (campaign) call"""
+        if self.direction.startswith("outbound"):
+            return self.to_number
+        return self.from_number
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"TwilioForm({fields})"
+
+
+def parse_twilio_form(body: bytes) -> TwilioForm:
+    """Pull the known fields out of an urlencoded body in a single split.
+
+    Only values of wanted keys are decoded, the scan stops once all of them
+    are found, and values without escapes skip percent-decoding. Twilio's
+    parameter names are plain ASCII and never repeated, so keys are matched
+    as raw bytes and the first occurrence wins.
+    """
+    form = TwilioForm()
+    wanted = FIELDS.copy()
+    for pair in body.split(b"&"):
+        key, _, value = pair.partition(b"=")
+        name = wanted.pop(key, None)
+        if name is None:
+            continue
+        _assign(form, name, _unquote(value))
+        if not wanted:
+            break
+    return form
+
+
+async def twilio_form(request: Request) -> TwilioForm:
+    """FastAPI dependency: the Twilio webhook parameters of ``request``"""
+    content_type = request.headers.get("content-type", "")
+    if content_type.split(";", 1)[0].strip().lower() == URLENCODED:
+        return parse_twilio_form(await request.body())
+
+    # Anything else (e.g. multipart from a test client) takes the general path
+    form = TwilioForm()
+    form_data = await request.form()
+    for key, name in FIELDS.items():
+        value = form_data.get(key.decode("ascii"))
+        if isinstance(value, str):
+            _assign(form, name, value)
+    return form
+
+
+async def twilio_signature_valid(request: Request, auth_token: str, public_base_url: str = "") -> bool:
+    """Whether ``request`` carries a valid X-Twilio-Signature for ``auth_token``.
+
+    Twilio signs the URL it requested; behind a proxy that is the public base
+    URL plus the path and query, not the URL the app sees.
+    """
+    signature = request.headers.get("x-twilio-signature")
+    if not signature or not auth_token:
+        return False
+
+    url = str(request.url)
+    if public_base_url:
+        url = public_base_url + request.url.path + (f"?{request.url.query}" if request.url.query else "")
+    params = {key: value for key, value in (await request.form()).items() if isinstance(value, str)}
+    return RequestValidator(auth_token).validate(url, params, signature)
+
+
+def _unquote(value: bytes) -> str:
+    """unquote_plus for bytes, decoding each run of escapes with one unhexlify call"""
+    if b"+" in value:
+        value = value.replace(b"+", b" ")
+    if b"%" in value:
+        value = _ESCAPES.sub(lambda match: binascii.unhexlify(match.group().replace(b"%", b"")), value)
+    return value.decode("utf-8", "replace")
+
+
+def _assign(form: TwilioForm, name: str, text: str):
+    if name == "confidence":
+        try:
+            form.confidence = float(text)
+        except ValueError:
+            form.confidence = 0.0
+    else:
+        setattr(form, name, text)
@@ -0,0 +1,66 @@
+import unittest
+import asyncio
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.answer_queue import AnswerQueue
+
+async def answer_after(delay, value):
+    await asyncio.sleep(delay)
+    return value
+
+async def failing_answer():
+    raise RuntimeError("model crashed")
+
+class TestAnswerQueue(unittest.TestCase):
+
+    def test_pending_then_ready(self):
+        """Test a poll that times out leaves the answer running for the next poll"""
+        async def run():
+            queue = AnswerQueue()
+            queue.submit("CA1", answer_after(0.05, b"<Response/>"))
+            first = await queue.wait("CA1", timeout=0.01)
+            second = await queue.wait("CA1", timeout=1.0)
+            third = await queue.wait("CA1", timeout=0.01)
+            return first, second, third, queue.stats()
+
+        first, second, third, stats = asyncio.run(run())
+
+        self.assertEqual(first, (AnswerQueue.PENDING, None))
+        self.assertEqual(second, (AnswerQueue.READY, b"<Response/>"))
+        self.assertEqual(third, (AnswerQueue.MISSING, None))
+        self.assertEqual(stats["delivered"], 1)
+
+    def test_failed_and_discarded_answers(self):
+        """Test errors surface as FAILED and hang-ups cancel the generation"""
+        async def run():
+            queue = AnswerQueue()
+            queue.submit("CA1", failing_answer())
+            failed = await queue.wait("CA1", timeout=1.0)
+
+            slow = answer_after(10, b"late")
+            queue.submit("CA2", slow)
+            queue.discard("CA2")
+            return failed, await queue.wait("CA2", timeout=0.01), queue.stats()
+
+        failed, discarded, stats = asyncio.run(run())
+
+        self.assertEqual(failed, (AnswerQueue.FAILED, None))
+        self.assertEqual(discarded, (AnswerQueue.MISSING, None))
+        self.assertEqual(stats["discarded"], 1)
+
+    def test_resubmit_replaces_previous_answer(self):
+        """Test a new question on the same call supersedes the old answer"""
+        async def run():
+            queue = AnswerQueue()
+            queue.submit("CA1", answer_after(0.05, b"old"))
+            queue.submit("CA1", answer_after(0.0, b"new"))
+            return await queue.wait("CA1", timeout=1.0)
+
+        self.assertEqual(asyncio.run(run()), (AnswerQueue.READY, b"new"))
+
+if __name__ == '__main__':
+    unittest.main()
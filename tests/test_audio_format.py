@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.audio_codec import ULAW_DECODE_TABLE, pcm16_to_ulaw, pcm16_to_wav, resample_pcm16, ulaw_to_pcm16
+from services.audio_format import convert_audio
+from services.audio_stream import WavStreamDecoder
+
+def tone(frequency, sample_rate, seconds=0.5, amplitude=8000):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+
+class TestAudioCodec(unittest.TestCase):
+
+    def test_ulaw_encode_inverts_decode_table(self):
+        """Test every mu-law code survives a decode/encode round trip"""
+        self.assertTrue(np.array_equal(ulaw_to_pcm16(pcm16_to_ulaw(ULAW_DECODE_TABLE)), ULAW_DECODE_TABLE))
+
+    def test_downsampling_keeps_speech_band_and_drops_aliases(self):
+        """Test a 1 kHz tone passes to 8 kHz while a 6 kHz tone is filtered out"""
+        speech = resample_pcm16(tone(1000, 24000), 24000, 8000)
+        alias = resample_pcm16(tone(6000, 24000), 24000, 8000)
+
+        self.assertEqual(len(speech), 4000)
+        self.assertGreater(np.abs(speech[100:-100]).max(), 7000)
+        self.assertLess(np.abs(alias[100:-100]).max(), 800)
+
+class TestConvertAudio(unittest.TestCase):
+
+    def setUp(self):
+        self.wav = pcm16_to_wav(tone(440, 16000), 16000)
+
+    def test_mulaw_output(self):
+        """Test 16 kHz PCM becomes 8 kHz mu-law WAV at a quarter of the size"""
+        converted = convert_audio(self.wav, "mulaw")
+
+        decoder = WavStreamDecoder()
+        samples = decoder.feed(converted)
+        self.assertEqual(decoder.sample_rate, 8000)
+        self.assertEqual(len(samples), 4000)
+        self.assertLess(len(converted), len(self.wav) / 3.5)
+
+    def test_wav_output_and_native_passthrough(self):
+        """Test PCM WAV output is resampled and native output is untouched"""
+        decoder = WavStreamDecoder()
+        decoder.feed(convert_audio(self.wav, "wav"))
+
+        self.assertEqual(decoder.sample_rate, 8000)
+        self.assertIs(convert_audio(self.wav, "native"), self.wav)
+        with self.assertRaises(ValueError):
+            convert_audio(self.wav, "ogg")
+
+if __name__ == '__main__':
+    unittest.main()
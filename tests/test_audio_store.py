@@ -0,0 +1,116 @@
+import unittest
+import tempfile
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.audio_store import AudioStore, clip_id_for, clip_response
+from services.tts_service import TTSService
+
+class TestAudioStore(unittest.TestCase):
+
+    def test_put_get_roundtrip(self):
+        """Test stored audio comes back under its content-hash id"""
+        store = AudioStore()
+
+        clip_id = store.put(b"ID3hello")
+
+        self.assertTrue(clip_id.endswith(".mp3"))
+        self.assertEqual(store.put(b"ID3hello"), clip_id)
+        self.assertEqual(store.get(clip_id), b"ID3hello")
+        self.assertIsNone(store.get("../config.py"))
+
+    def test_memory_tier_evicts_least_recently_used(self):
+        """Test the memory tier stays within its byte budget"""
+        store = AudioStore(memory_bytes=20)
+        first = store.put(b"ID3" + b"a" * 7)
+        second = store.put(b"ID3" + b"b" * 7)
+        store.get(first)
+
+        store.put(b"ID3" + b"c" * 7)
+
+        self.assertIsNotNone(store.get(first))
+        self.assertIsNone(store.get(second))
+        self.assertLessEqual(store.stats()["memory_bytes"], 20)
+
+    def test_disk_tier_survives_restart(self):
+        """Test clips are re-indexed from disk and the disk budget is enforced"""
+        disk_dir = tempfile.mkdtemp()
+        store = AudioStore(memory_bytes=0, disk_dir=disk_dir, disk_bytes=25)
+        old = store.put(b"ID3" + b"a" * 7)
+        kept = store.put(b"ID3" + b"b" * 7)
+        newest = store.put(b"ID3" + b"c" * 7)
+
+        reopened = AudioStore(disk_dir=disk_dir)
+
+        self.assertIsNone(reopened.get(old))
+        self.assertEqual(reopened.get(kept), b"ID3" + b"b" * 7)
+        self.assertEqual(reopened.get(newest), b"ID3" + b"c" * 7)
+        self.assertEqual(reopened.stats()["disk_hits"], 2)
+
+    def test_workers_share_disk_tier(self):
+        """Test a clip put by one worker is served by another sharing the directory"""
+        disk_dir = tempfile.mkdtemp()
+        worker_a = AudioStore(disk_dir=disk_dir)
+        worker_b = AudioStore(disk_dir=disk_dir)
+
+        clip_id = worker_a.put(b"ID3shared")
+
+        self.assertEqual(worker_b.get(clip_id), b"ID3shared")
+        self.assertEqual(worker_b.stats()["disk_clips"], 1)
+        self.assertIsNone(worker_b.get(clip_id_for(b"ID3missing")))
+
+    def test_tts_service_returns_store_url(self):
+        """Test synthesized audio is published under the public base URL"""
+        store = AudioStore()
+        tts_service = TTSService(audio_store=store, public_base_url="https://ivr.example.org/")
+
+        url = tts_service.publish_audio(b"ID3answer")
+
+        clip_id = url.rsplit("/", 1)[-1]
+        self.assertEqual(url, f"https://ivr.example.org/audio/{clip_id}")
+        self.assertEqual(store.get(clip_id), b"ID3answer")
+
+class TestClipResponse(unittest.TestCase):
+
+    def setUp(self):
+        self.audio = bytes(range(100))
+        self.clip_id = "0" * 32 + ".wav"
+
+    def test_full_response_is_cacheable(self):
+        """Test a plain request gets the clip with ETag and immutable caching"""
+        status, headers, body = clip_response(self.clip_id, self.audio)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body, self.audio)
+        self.assertEqual(headers["ETag"], f'"{self.clip_id}"')
+        self.assertIn("immutable", headers["Cache-Control"])
+        self.assertEqual(headers["Content-Type"], "audio/wav")
+
+    def test_if_none_match_returns_304(self):
+        """Test a matching ETag short-circuits to Not Modified"""
+        status, _, body = clip_response(self.clip_id, self.audio, if_none_match=f'"other", "{self.clip_id}"')
+
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b"")
+
+    def test_byte_ranges(self):
+        """Test explicit, open-ended and suffix ranges return 206 slices"""
+        status, headers, body = clip_response(self.clip_id, self.audio, range_header="bytes=10-19")
+        self.assertEqual((status, body), (206, self.audio[10:20]))
+        self.assertEqual(headers["Content-Range"], "bytes 10-19/100")
+
+        self.assertEqual(clip_response(self.clip_id, self.audio, range_header="bytes=90-")[2], self.audio[90:])
+        self.assertEqual(clip_response(self.clip_id, self.audio, range_header="bytes=-5")[2], self.audio[95:])
+
+    def test_unsatisfiable_range(self):
+        """Test ranges past the end of the clip return 416"""
+        status, headers, _ = clip_response(self.clip_id, self.audio, range_header="bytes=200-300")
+
+        self.assertEqual(status, 416)
+        self.assertEqual(headers["Content-Range"], "bytes */100")
+
+if __name__ == '__main__':
+    unittest.main()
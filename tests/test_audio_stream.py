@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.audio_codec import pcm16_to_wav, ulaw_to_pcm16
+from services.audio_stream import WavStreamDecoder, iter_speech_segments
+from services.stt_service import STTService
+
+SAMPLE_RATE = 8000
+
+def tone(seconds, amplitude=8000):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+
+def silence(seconds):
+    return np.zeros(int(SAMPLE_RATE * seconds), dtype=np.int16)
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+class TestAudioStream(unittest.TestCase):
+
+    def setUp(self):
+        samples = np.concatenate([silence(0.5), tone(1.0), silence(1.0), tone(0.8), silence(0.3)])
+        self.wav = pcm16_to_wav(samples, SAMPLE_RATE)
+
+    def test_ulaw_decoding(self):
+        """Test mu-law silence and full-scale codes"""
+        self.assertEqual(ulaw_to_pcm16(b"\xff")[0], 0)
+        self.assertEqual(ulaw_to_pcm16(b"\x00")[0], -32124)
+        self.assertEqual(ulaw_to_pcm16(b"\x80")[0], 32124)
+
+    def test_decoder_handles_split_header(self):
+        """Test samples survive arbitrary chunk boundaries"""
+        decoder = WavStreamDecoder()
+        decoded = [decoder.feed(chunk) for chunk in chunked(self.wav, 7)]
+        samples = np.concatenate([s for s in decoded if s is not None])
+
+        self.assertEqual(decoder.sample_rate, SAMPLE_RATE)
+        self.assertEqual(len(samples), (len(self.wav) - 44) // 2)
+
+    def test_segments_split_on_silence(self):
+        """Test two utterances separated by silence become two segments"""
+        segments = list(iter_speech_segments(chunked(self.wav, 1000)))
+
+        self.assertEqual(len(segments), 2)
+        self.assertTrue(all(rate == SAMPLE_RATE for _, rate in segments))
+
+    def test_long_speech_is_capped(self):
+        """Test continuous speech is cut at the maximum segment length"""
+        wav = pcm16_to_wav(tone(5.0), SAMPLE_RATE)
+        segments = list(iter_speech_segments(chunked(wav, 4096), max_segment_ms=1000))
+
+        self.assertEqual(len(segments), 5)
+        self.assertTrue(all(len(s) <= SAMPLE_RATE for s, _ in segments))
+
+    def test_transcribe_stream_joins_segments(self):
+        """Test each segment is recognized and the texts joined in order"""
+        stt_service = STTService()
+        # Segments are recognized concurrently, so answer by segment length (1.0s vs 0.8s of speech)
+        recognize = lambda audio, language: "pehla" if len(audio) > 1.3 * SAMPLE_RATE * 2 else "doosra"
+
+        with patch.object(stt_service, "convert_audio_to_text", side_effect=recognize):
+            text = stt_service.transcribe_stream(chunked(self.wav, 1000))
+
+        self.assertEqual(text, "pehla doosra")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import io
+import json
+import tempfile
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.batch_context import extract_contexts, read_transcripts, write_csv, write_jsonl
+
+TRANSCRIPTS = [
+    "Haryana mein gehun ki kheti kar raha hun, paani ki kami hai",
+    "मैं पंजाब में कपास की खेती करता हूं",
+    "kaunsi dawa use karein",
+]
+
+class TestBatchContext(unittest.TestCase):
+
+    def test_in_process_extraction(self):
+        """Test plain strings get line-number ids and extracted slots"""
+        results = list(extract_contexts(TRANSCRIPTS, workers=1))
+
+        self.assertEqual([r['id'] for r in results], ['1', '2', '3'])
+        self.assertEqual(results[0]['crop'], 'wheat')
+        self.assertEqual(results[1]['location'], 'पंजाब')
+
+    def test_process_pool_preserves_order(self):
+        """Test chunked multi-process extraction keeps input order"""
+        transcripts = [(str(i), TRANSCRIPTS[i % 3]) for i in range(50)]
+
+        results = list(extract_contexts(transcripts, workers=2, chunk_size=7))
+
+        self.assertEqual([r['id'] for r in results], [str(i) for i in range(50)])
+        self.assertEqual(results[3]['crop'], 'wheat')
+
+    def test_read_jsonl_transcripts(self):
+        """Test JSONL input uses the configured id and text fields"""
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8") as f:
+            f.write(json.dumps({"call_sid": "CA1", "transcript": TRANSCRIPTS[0]}) + "\n\n")
+            path = f.name
+
+        try:
+            records = list(read_transcripts(path, text_field="transcript", id_field="call_sid"))
+        finally:
+            os.unlink(path)
+
+        self.assertEqual(records, [("CA1", TRANSCRIPTS[0])])
+
+    def test_writers(self):
+        """Test JSONL and CSV writers emit one row per result"""
+        results = list(extract_contexts(TRANSCRIPTS, workers=1))
+
+        jsonl = io.StringIO()
+        self.assertEqual(write_jsonl(results, jsonl), 3)
+        self.assertEqual(json.loads(jsonl.getvalue().splitlines()[0])['crop'], 'wheat')
+
+        columns = io.StringIO()
+        self.assertEqual(write_csv(results, columns), 3)
+        self.assertTrue(columns.getvalue().startswith("id,location,crop"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.call_session import CallSession, Vocabulary, get_vocabularies
+from services.session_store import decode_session, encode_session
+
+class TestCallSession(unittest.TestCase):
+    """Test cases for the slotted call session model"""
+
+    def test_vocabulary_codes(self):
+        """Test seeded values get stable codes, None is 0 and new values are appended"""
+        vocabulary = Vocabulary(["wheat", "rice"])
+
+        self.assertEqual(vocabulary.code(None), 0)
+        self.assertEqual(vocabulary.code("rice"), 2)
+        self.assertEqual(vocabulary.code("millet"), 3)
+        self.assertEqual(vocabulary.value(3), "millet")
+        self.assertEqual(len(vocabulary), 3)
+
+    def test_context_round_trip(self):
+        """Test the context dict comes back unchanged, minus unknown slots"""
+        session = CallSession("+919876543210", "english",
+                              {"crop": "wheat", "location": "Haryana", "season": None})
+
+        self.assertEqual(session.context, {"crop": "wheat", "location": "Haryana"})
+        self.assertEqual(session.language, "english")
+        self.assertEqual(session.from_number, "+919876543210")
+
+    def test_values_are_interned_codes(self):
+        """Test slots hold small integer codes shared across sessions"""
+        first = CallSession(context={"crop": "wheat"})
+        second = CallSession(context={"crop": "wheat"})
+
+        self.assertIsInstance(first._crop, int)
+        self.assertEqual(first._crop, second._crop)
+        self.assertEqual(get_vocabularies()["crop"].value(first._crop), "wheat")
+
+    def test_no_instance_dict(self):
+        """Test sessions carry no per-instance __dict__"""
+        session = CallSession()
+
+        self.assertFalse(hasattr(session, "__dict__"))
+        with self.assertRaises(AttributeError):
+            session.notes = "x"
+
+    def test_copy_is_independent(self):
+        """Test changing a copy leaves the original alone"""
+        session = CallSession("+91", context={"crop": "wheat"})
+        clone = session.copy()
+        clone.context = {"crop": "rice"}
+
+        self.assertEqual(session.context, {"crop": "wheat"})
+        self.assertEqual(clone.from_number, "+91")
+
+    def test_serialized_form_unchanged(self):
+        """Test the stored JSON keeps the dict layout existing sessions use"""
+        session = CallSession("+919876543210", "hindi", {"crop": "wheat"})
+        payload = encode_session(session)
+
+        self.assertEqual(payload, b'{"from_number":"+919876543210","context":{"crop":"wheat"},"language":"hindi","turns":0}')
+        self.assertEqual(decode_session(payload), session)
+
+if __name__ == '__main__':
+    unittest.main()
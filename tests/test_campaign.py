@@ -0,0 +1,128 @@
+import unittest
+import asyncio
+import tempfile
+import time
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.campaign import CampaignDispatcher, CampaignStore, MockDialer, TokenBucket
+
+class TestCampaignStore(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = os.path.join(tempfile.mkdtemp(), "campaigns.db")
+        self.store = CampaignStore(self.db_path)
+
+    def test_numbers_are_deduplicated_and_claimed_once(self):
+        """Test each unique number becomes one job that is only claimed once"""
+        campaign_id = self.store.create_campaign("rabi", "गेहूं की बुवाई", ["+911", "+912", "+911", " "])
+
+        first = self.store.claim_due(10)
+        second = self.store.claim_due(10)
+
+        self.assertEqual(sorted(job["phone"] for job in first), ["+911", "+912"])
+        self.assertEqual(second, [])
+        self.assertEqual(self.store.progress(campaign_id)["in_progress"], 2)
+
+    def test_jobs_survive_restart(self):
+        """Test a restart requeues jobs that were mid-dial without counting the attempt"""
+        campaign_id = self.store.create_campaign("rabi", "msg", ["+911"])
+        self.store.claim_due(1)
+
+        reopened = CampaignStore(self.db_path)
+
+        self.assertEqual(reopened.requeue_in_progress(), 1)
+        self.assertEqual(reopened.claim_due(1)[0]["attempts"], 1)
+        self.assertEqual(reopened.get_campaign(campaign_id)["name"], "rabi")
+
+    def test_one_dispatcher_per_database(self):
+        """Test only one store per database file gets the dispatcher lock"""
+        other = CampaignStore(self.db_path)
+
+        self.assertTrue(self.store.acquire_dispatcher_lock())
+        self.assertTrue(self.store.acquire_dispatcher_lock())
+        self.assertFalse(other.acquire_dispatcher_lock())
+
+class TestCampaignDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.store = CampaignStore(":memory:")
+
+    def test_dispatch_respects_calls_per_second(self):
+        """Test every number is dialed and the token bucket paces the dials"""
+        campaign_id = self.store.create_campaign("rabi", "msg", [f"+91{i}" for i in range(6)])
+        dialer = MockDialer()
+        dispatcher = CampaignDispatcher(self.store, dialer, calls_per_second=20, concurrency=4)
+
+        start = time.monotonic()
+        asyncio.run(dispatcher.run(stop_when_idle=True))
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(len(dialer.calls), 6)
+        self.assertEqual(self.store.progress(campaign_id)["dialed"], 6)
+        # One token up front, then 5 more at 20 per second
+        self.assertGreaterEqual(elapsed, 0.2)
+
+    def test_failed_dials_retry_then_give_up(self):
+        """Test failures back off and retry until max_attempts"""
+        self.store.create_campaign("rabi", "msg", ["+911"])
+        dispatcher = CampaignDispatcher(
+            self.store, MockDialer(failure_rate=1.0), calls_per_second=100, max_attempts=3, retry_base=0.01
+        )
+
+        asyncio.run(dispatcher.run(stop_when_idle=True))
+
+        progress = self.store.progress()
+        self.assertEqual(progress["failed"], 1)
+        self.assertEqual(progress["attempts"], 3)
+        self.assertEqual(dispatcher.stats()["retries_scheduled"], 2)
+
+    def test_unanswered_call_is_retried(self):
+        """Test a no-answer status callback puts the job back in the queue"""
+        self.store.create_campaign("rabi", "msg", ["+911", "+912"])
+        dispatcher = CampaignDispatcher(self.store, MockDialer(), calls_per_second=100, retry_base=0.0)
+        asyncio.run(dispatcher.run(stop_when_idle=True))
+
+        dispatcher.record_call_status(1, "no-answer")
+        dispatcher.record_call_status(2, "completed")
+
+        progress = self.store.progress()
+        self.assertEqual((progress["queued"], progress["completed"]), (1, 1))
+
+    def test_missing_status_callback_times_out(self):
+        """Test dialed jobs without a status callback are retried and a late callback is ignored"""
+        self.store.create_campaign("rabi", "msg", ["+911", "+912"])
+        dispatcher = CampaignDispatcher(self.store, MockDialer(), calls_per_second=100, max_attempts=1)
+        asyncio.run(dispatcher.run(stop_when_idle=True))
+
+        self.assertEqual(dispatcher.sweep_stale_dials(), 0)
+        dispatcher.dial_timeout = 0.0
+        self.assertEqual(dispatcher.sweep_stale_dials(), 2)
+        dispatcher.record_call_status(1, "completed")
+
+        progress = self.store.progress()
+        self.assertEqual((progress["dialed"], progress["failed"], progress["completed"]), (0, 2, 0))
+        self.assertEqual(self.store.get_job(1)["last_error"], "no status callback")
+        self.assertEqual(dispatcher.stats()["dial_timeouts"], 2)
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_bucket_allows_burst_then_paces(self):
+        """Test the bucket hands out its capacity at once and then refills at the rate"""
+        now = [0.0]
+        bucket = TokenBucket(rate=10, capacity=2, clock=lambda: now[0])
+
+        async def run():
+            await bucket.acquire()
+            await bucket.acquire()
+            now[0] += 0.1
+            await bucket.acquire()
+
+        asyncio.run(run())
+        self.assertLess(bucket._tokens, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import time
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.circuit_breaker import CircuitBreaker
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def _trip(self, breaker, failures=5):
+        for _ in range(failures):
+            breaker.call(lambda: None)
+
+    def test_opens_after_failure_rate_exceeded(self):
+        """Test the breaker opens once the window failure rate crosses the threshold"""
+        breaker = CircuitBreaker("test", failure_threshold=0.5, min_calls=4)
+        breaker.call(lambda: "ok")
+        self._trip(breaker, failures=3)
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_open_breaker_skips_calls(self):
+        """Test calls are not attempted while the breaker is open"""
+        breaker = CircuitBreaker("test", min_calls=2, open_duration=60)
+        self._trip(breaker, failures=2)
+        calls = []
+
+        result = breaker.call(lambda: calls.append(1) or "ok")
+
+        self.assertIsNone(result)
+        self.assertEqual(calls, [])
+        self.assertEqual(breaker.snapshot()["rejected_calls"], 1)
+
+    def test_half_open_trial_closes_breaker(self):
+        """Test a successful trial after the cooldown closes the breaker"""
+        breaker = CircuitBreaker("test", min_calls=2, open_duration=0.01)
+        self._trip(breaker, failures=2)
+        time.sleep(0.02)
+
+        self.assertEqual(breaker.call(lambda: "ok"), "ok")
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_trial_failure_reopens(self):
+        """Test a failed trial re-opens the breaker"""
+        breaker = CircuitBreaker("test", min_calls=2, open_duration=0.01)
+        self._trip(breaker, failures=2)
+        time.sleep(0.02)
+
+        breaker.call(lambda: None)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(breaker.snapshot()["times_opened"], 2)
+
+    def test_background_probe_moves_to_half_open(self):
+        """Test a healthy probe lets traffic back through"""
+        breaker = CircuitBreaker("test", min_calls=2, probe=lambda: True, probe_interval=0.01)
+        self._trip(breaker, failures=2)
+
+        deadline = time.monotonic() + 1.0
+        while breaker.state == CircuitBreaker.OPEN and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.snapshot()["last_probe_ok"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+import asyncio
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.call_session import CallSession
+from services.conversation_memory import ConversationMemory
+from services.session_store import InMemorySessionStore
+
+def word_count(text):
+    return len(text.split())
+
+def first_words(summary, turns, language, max_tokens):
+    return " | ".join(([summary] if summary else []) + [query for query, _ in turns])
+
+class TestConversationMemory(unittest.TestCase):
+    """Test cases for bounded per-call history"""
+
+    def make_memory(self, **options):
+        options.setdefault("budget_tokens", 40)
+        return ConversationMemory(first_words, keep_turns=2, count_tokens=word_count, **options)
+
+    def test_render_recent_turns(self):
+        """Test history renders summary and turns in order"""
+        memory = self.make_memory()
+        session = CallSession(summary="gehun mein khad ki baat hui")
+        memory.record(session, "kitna daalun?", "do bori per acre")
+
+        self.assertEqual(
+            memory.render(session),
+            "Earlier in this call: gehun mein khad ki baat hui\nFarmer: kitna daalun?\nAdvisor: do bori per acre"
+        )
+        self.assertIsNone(memory.render(CallSession()))
+
+    def test_render_stays_within_budget(self):
+        """Test the oldest turns are left out when the history outgrows the budget"""
+        memory = self.make_memory(budget_tokens=12)
+        session = CallSession()
+        for i in range(5):
+            memory.record(session, f"sawal {i}", f"jawab {i} hai")
+
+        rendered = memory.render(session)
+
+        self.assertLessEqual(word_count(rendered), 12)
+        self.assertIn("sawal 4", rendered)
+        self.assertNotIn("sawal 0", rendered)
+        self.assertEqual(memory.stats()["truncated_prompts"], 1)
+
+    def test_compaction_due_past_ratio(self):
+        """Test compaction is due once the history passes the budget ratio, keeping recent turns"""
+        memory = self.make_memory(budget_tokens=20)
+        session = CallSession()
+
+        self.assertFalse(memory.record(session, "ek do teen", "char paanch"))
+        self.assertFalse(memory.record(session, "ek do teen", "char paanch"))
+        self.assertTrue(memory.record(session, "ek do teen", "char paanch chhe"))
+
+    def test_compact_folds_older_turns(self):
+        """Test background compaction summarizes all but the last turns and saves the session"""
+        memory = self.make_memory(budget_tokens=20)
+        store = InMemorySessionStore()
+        session = CallSession("+91")
+        for i in range(4):
+            memory.record(session, f"sawal {i}", f"lamba jawab number {i}")
+
+        async def scenario():
+            await store.save("CA1", session)
+            compacted = await memory.compact("CA1", store)
+            return compacted, await store.get("CA1")
+
+        compacted, saved = asyncio.run(scenario())
+
+        self.assertTrue(compacted)
+        self.assertEqual(saved.summary, "sawal 0 | sawal 1")
+        self.assertEqual([query for query, _ in saved.history], ["sawal 2", "sawal 3"])
+        self.assertEqual(memory.stats()["compactions"], 1)
+
+    def test_compact_discards_stale_summary(self):
+        """Test a summary is dropped if the history changed underneath it"""
+        store = InMemorySessionStore()
+        session = CallSession("+91", history=tuple((f"sawal {i}", "lamba jawab hai bhai") for i in range(4)))
+
+        def summarize_while_history_changes(summary, turns, language, max_tokens):
+            store._sessions["CA1"].history = ()
+            return "stale"
+
+        memory = ConversationMemory(summarize_while_history_changes, budget_tokens=20, count_tokens=word_count)
+
+        async def scenario():
+            await store.save("CA1", session)
+            return await memory.compact("CA1", store), await store.get("CA1")
+
+        compacted, saved = asyncio.run(scenario())
+
+        self.assertFalse(compacted)
+        self.assertEqual(saved.summary, "")
+
+    def test_remember_saves_before_compacting(self):
+        """Test the new turn is stored before the compaction it triggers reads the session"""
+        memory = self.make_memory(budget_tokens=20)
+        store = InMemorySessionStore()
+        session = CallSession("+91")
+        for i in range(3):
+            memory.record(session, f"sawal {i}", f"lamba jawab number {i}")
+
+        async def scenario():
+            await store.save("CA1", session)
+            await memory.remember("CA1", store, "sawal 3", "lamba jawab number 3")
+            await asyncio.sleep(0.05)
+            return await store.get("CA1")
+
+        saved = asyncio.run(scenario())
+
+        self.assertEqual(saved.summary, "sawal 0 | sawal 1")
+        self.assertEqual([query for query, _ in saved.history], ["sawal 2", "sawal 3"])
+
+    def test_turn_during_compaction_save_is_kept(self):
+        """Test a turn recorded while compaction is saving is not overwritten"""
+        memory = self.make_memory(budget_tokens=20)
+
+        class SlowStore(InMemorySessionStore):
+            """Yields inside the compaction's save, like a round trip to Redis"""
+
+            async def save(self, call_sid, session):
+                if session.summary and not hasattr(self, "turn"):
+                    self.turn = asyncio.ensure_future(memory.remember(call_sid, self, "sawal 4", "naya jawab"))
+                    await asyncio.sleep(0.01)
+                await super().save(call_sid, session)
+
+        store = SlowStore()
+        session = CallSession("+91")
+        for i in range(4):
+            memory.record(session, f"sawal {i}", f"lamba jawab number {i}")
+
+        async def scenario():
+            await InMemorySessionStore.save(store, "CA1", session)
+            await memory.compact("CA1", store)
+            await store.turn
+            return await store.get("CA1")
+
+        saved = asyncio.run(scenario())
+
+        self.assertEqual(saved.summary, "sawal 0 | sawal 1")
+        self.assertEqual([query for query, _ in saved.history], ["sawal 2", "sawal 3", "sawal 4"])
+
+    def test_history_survives_serialization(self):
+        """Test history and summary round-trip through the stored JSON"""
+        session = CallSession("+91", history=(("kitna?", "do bori"),), summary="khad")
+
+        self.assertEqual(CallSession.from_dict(session.to_dict()).history, (("kitna?", "do bori"),))
+        self.assertEqual(CallSession.from_dict(session.to_dict()).summary, "khad")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.fuzzy_matcher import FuzzyMatcher, bounded_edit_distance, normalize
+from services.gazetteer import get_default_gazetteer
+
+class TestFuzzyMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = FuzzyMatcher()
+        self.matcher.add("gehun", [("crop", "wheat")])
+        self.matcher.add("karnal", [("location", "करनाल")])
+
+    def test_normalize_folds_romanization_variants(self):
+        """Test common spelling variants normalize to the same form"""
+        self.assertEqual(normalize("gehoon"), normalize("gehun"))
+        self.assertEqual(normalize("paani"), "pani")
+
+    def test_bounded_edit_distance(self):
+        """Test edit distance and its early cutoff"""
+        self.assertEqual(bounded_edit_distance("gahun", "gehun", 2), 1)
+        self.assertEqual(bounded_edit_distance("gehu", "gehun", 2), 1)
+        self.assertEqual(bounded_edit_distance("abcdef", "uvwxyz", 2), 3)
+
+    def test_asr_misspellings_resolve(self):
+        """Test noisy wheat spellings resolve to the canonical crop"""
+        for token in ["gehoon", "gahun"]:
+            self.assertEqual(self.matcher.lookup(token), [("crop", "wheat")], token)
+
+    def test_distant_tokens_do_not_match(self):
+        """Test unrelated and stopword tokens are rejected"""
+        self.assertIsNone(self.matcher.lookup("kheti"))
+        self.assertIsNone(self.matcher.lookup("mein"))
+        self.assertIsNone(self.matcher.lookup("garden"))
+        # Four-letter tokens get no edit allowance
+        self.assertIsNone(self.matcher.lookup("gehu"))
+
+    def test_gazetteer_uses_fuzzy_fallback(self):
+        """Test noisy utterances still fill the context slots"""
+        context = get_default_gazetteer().extract("karnaal mein gahun ki kheti, paaani ki kamee")
+
+        self.assertEqual(context['location'], 'करनाल')
+        self.assertEqual(context['crop'], 'wheat')
+        self.assertEqual(context['water_condition'], 'shortage')
+
+    def test_exact_matches_take_precedence(self):
+        """Test an exact mention later in the utterance beats an earlier fuzzy hit"""
+        context = get_default_gazetteer().extract("kya karun, gehun mein keeda")
+
+        self.assertEqual(context['crop'], 'wheat')
+
+    def test_common_words_do_not_fill_slots(self):
+        """Test everyday Hindi words near crop or soil names are not fuzzy-matched"""
+        gazetteer = get_default_gazetteer()
+        for text in ["keeda lag gaya hai", "paudhe sookh gaye", "ganga ke paas khet hai"]:
+            self.assertIsNone(gazetteer.extract(text)['crop'], text)
+        for text in ["kheti ke liye loan chahiye", "patte peele ho rahe hain"]:
+            self.assertIsNone(gazetteer.extract(text)['soil_type'], text)
+
+    def test_filler_words_stay_empty(self):
+        """Test a plain question does not invent context"""
+        context = get_default_gazetteer().extract("kaunsi dawa use karein aur kitna daalun")
+
+        self.assertEqual(set(context.values()), {None})
+
+if __name__ == '__main__':
+    unittest.main()
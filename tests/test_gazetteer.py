@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.gazetteer import Gazetteer, get_default_gazetteer, tokenize
+
+class TestGazetteer(unittest.TestCase):
+
+    def setUp(self):
+        self.gazetteer = get_default_gazetteer()
+
+    def test_romanized_context(self):
+        """Test the classic romanized Hindi utterance"""
+        context = self.gazetteer.extract("Haryana mein gehun ki kheti kar raha hun, paani ki kami hai")
+
+        self.assertEqual(context['location'], 'हरियाणा')
+        self.assertEqual(context['crop'], 'wheat')
+        self.assertEqual(context['water_condition'], 'shortage')
+
+    def test_native_script_context(self):
+        """Test Devanagari surface forms and districts"""
+        context = self.gazetteer.extract("करनाल में गेहूं की खेती, काली मिट्टी, रबी में पानी ज्यादा है")
+
+        self.assertEqual(context['location'], 'करनाल')
+        self.assertEqual(context['crop'], 'wheat')
+        self.assertEqual(context['soil_type'], 'black soil')
+        self.assertEqual(context['season'], 'rabi')
+        self.assertEqual(context['water_condition'], 'excess')
+
+    def test_longest_match_wins(self):
+        """Test multi-word phrases beat their prefixes"""
+        gazetteer = Gazetteer()
+        gazetteer.add("crop", "cotton", "cotton")
+        gazetteer.add("soil_type", "black soil", "black cotton soil")
+
+        context = gazetteer.extract("black cotton soil hai")
+
+        self.assertEqual(context['soil_type'], 'black soil')
+        self.assertIsNone(context['crop'])
+
+    def test_water_modifier_needs_mention(self):
+        """Test a shortage word alone does not set the water condition"""
+        self.assertIsNone(self.gazetteer.extract("khad ki kami hai")['water_condition'])
+        self.assertEqual(self.gazetteer.extract("paani hai")['water_condition'], 'normal')
+
+    def test_whole_token_matching(self):
+        """Test keywords are not matched inside other words"""
+        context = self.gazetteer.extract("lalit ka khet")
+
+        self.assertIsNone(context['soil_type'])
+
+    def test_farming_words_are_not_districts(self):
+        """Test common words one edit from a short district alias extract no location"""
+        for text in ["dhan ki ropai kab karein", "main sri ganga nagar se hun"]:
+            self.assertIsNone(self.gazetteer.extract(text)['location'], text)
+
+    def test_short_location_alias_matches_exactly(self):
+        """Test a short district alias still matches once normalized, but not within an edit"""
+        self.assertEqual(self.gazetteer.extract("roppar mein dhan")['location'], 'रूपनगर')
+        self.assertIsNone(self.gazetteer.extract("ropur mein dhan")['location'])
+
+    def test_reports_fuzzy_slots(self):
+        """Test slots filled only by a fuzzy match are reported, exact ones are not"""
+        context, fuzzy_slots = self.gazetteer.extract_with_fuzzy_slots("karnal mein gahun, paani ki kami")
+
+        self.assertEqual((context['location'], context['crop'], context['water_condition']), ('करनाल', 'wheat', 'shortage'))
+        self.assertEqual(fuzzy_slots, {'crop'})
+        self.assertEqual(self.gazetteer.extract_with_fuzzy_slots("karnal mein gehun")[1], set())
+
+    def test_tokenize_keeps_combining_marks(self):
+        """Test Indic vowel signs stay attached to their letters"""
+        self.assertEqual(tokenize("हरियाणा, पंजाब।"), ["हरियाणा", "पंजाब"])
+
+if __name__ == '__main__':
+    unittest.main()
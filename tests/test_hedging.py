@@ -0,0 +1,94 @@
+import unittest
+import time
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.hedging import HedgeMetrics, HedgePolicy, LatencyTracker, hedged_call
+
+class TestHedgePolicy(unittest.TestCase):
+
+    def test_initial_delay_until_enough_samples(self):
+        """Test the initial delay is used while the window is cold"""
+        policy = HedgePolicy(initial_delay=2.0, min_samples=5)
+        tracker = LatencyTracker()
+        tracker.record(0.1)
+
+        self.assertEqual(policy.hedge_delay(tracker), 2.0)
+
+    def test_delay_follows_observed_percentile(self):
+        """Test the hedge delay tracks the configured percentile"""
+        policy = HedgePolicy(percentile=0.95, min_delay=0.0, min_samples=10)
+        tracker = LatencyTracker()
+        for i in range(1, 101):
+            tracker.record(i / 100)
+
+        self.assertAlmostEqual(policy.hedge_delay(tracker), 0.95, places=2)
+
+    def test_delay_is_clamped(self):
+        """Test the hedge delay stays within min/max bounds"""
+        policy = HedgePolicy(min_delay=0.5, max_delay=1.0, min_samples=1)
+        tracker = LatencyTracker()
+        tracker.record(30.0)
+
+        self.assertEqual(policy.hedge_delay(tracker), 1.0)
+
+class TestHedgedCall(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.metrics = HedgeMetrics()
+
+    def tearDown(self):
+        self.executor.shutdown(wait=False)
+
+    def test_fast_primary_wins_without_hedge(self):
+        """Test a fast primary never fires the hedge"""
+        result = hedged_call(lambda: "primary", lambda: "fallback", 1.0, self.executor, self.metrics)
+
+        self.assertEqual(result, "primary")
+        stats = self.metrics.snapshot()
+        self.assertEqual(stats["primary_wins"], 1)
+        self.assertEqual(stats["hedges_fired"], 0)
+
+    def test_slow_primary_loses_to_hedge(self):
+        """Test the hedge answers first when the primary stalls"""
+        def slow_primary():
+            time.sleep(0.5)
+            return "primary"
+
+        started = time.monotonic()
+        result = hedged_call(slow_primary, lambda: "fallback", 0.05, self.executor, self.metrics)
+
+        self.assertEqual(result, "fallback")
+        self.assertLess(time.monotonic() - started, 0.4)
+        stats = self.metrics.snapshot()
+        self.assertEqual(stats["hedges_fired"], 1)
+        self.assertEqual(stats["hedge_wins"], 1)
+        self.assertEqual(stats["hedge_win_rate"], 1.0)
+
+    def test_failed_primary_runs_fallback_inline(self):
+        """Test a quick primary failure falls back without hedging"""
+        result = hedged_call(lambda: None, lambda: "fallback", 1.0, self.executor, self.metrics)
+
+        self.assertEqual(result, "fallback")
+        stats = self.metrics.snapshot()
+        self.assertEqual(stats["primary_failures"], 1)
+        self.assertEqual(stats["hedges_fired"], 0)
+
+    def test_both_fail(self):
+        """Test None is returned when neither engine succeeds"""
+        def slow_failure():
+            time.sleep(0.1)
+            raise RuntimeError("upstream down")
+
+        result = hedged_call(slow_failure, lambda: None, 0.01, self.executor, self.metrics)
+
+        self.assertIsNone(result)
+        self.assertEqual(self.metrics.snapshot()["both_failed"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import asyncio
+import importlib.util
+import sys
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from services.profile_store import SQLiteProfileStore
+
+TWILIO_NUMBER = "+911800000000"
+FARMER_NUMBER = "+919876543210"
+
+@unittest.skipUnless(importlib.util.find_spec("torch"), "main needs torch")
+class TestVoiceWebhook(unittest.TestCase):
+    """Test cases for the /voice webhook of the full app"""
+
+    @classmethod
+    def setUpClass(cls):
+        import main
+        cls.main = main
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_store = self.main.profile_store
+        self.main.profile_store = SQLiteProfileStore(os.path.join(self.temp_dir, "profiles.db"))
+        self.client = TestClient(self.main.app)
+
+    def tearDown(self):
+        asyncio.run(self.main.profile_store.close())
+        self.main.profile_store = self.original_store
+        shutil.rmtree(self.temp_dir)
+
+    def test_campaign_call_uses_farmer_profile(self):
+        """Test a campaign call redirected into /voice is keyed on the number we dialed"""
+        asyncio.run(self.main.profile_store.save(FARMER_NUMBER, {"crop": "wheat"}))
+        asyncio.run(self.main.profile_store.save(TWILIO_NUMBER, {"crop": "rice"}))
+
+        response = self.client.post("/voice", data={
+            "CallSid": "CA-campaign", "From": TWILIO_NUMBER, "To": FARMER_NUMBER, "Direction": "outbound-api"
+        })
+        session = asyncio.run(self.main.session_store.get("CA-campaign"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(session.from_number, FARMER_NUMBER)
+        self.assertEqual(session.context, {"crop": "wheat"})
+
+    def test_fuzzy_context_not_saved_to_profile(self):
+        """Test only exactly matched slots of the context turn are saved to the profile"""
+        main = self.main
+        asyncio.run(main.session_store.save("CA-context", main.CallSession(FARMER_NUMBER)))
+
+        response = self.client.post("/process_context", data={
+            "CallSid": "CA-context", "SpeechResult": "karnal mein gahun ki kheti"
+        })
+        session = asyncio.run(main.session_store.get("CA-context"))
+        profile = asyncio.run(main.profile_store.get(FARMER_NUMBER))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(session.context, {"location": "करनाल", "crop": "wheat"})
+        self.assertEqual(profile.context, {"location": "करनाल"})
+
+    def test_answer_starts_after_first_sentence(self):
+        """Test the first sentence is returned with a redirect and a failed sentence falls back to <Say>"""
+        main = self.main
+        conversation = main.CallSession(FARMER_NUMBER, context={"crop": "wheat"})
+        clips = {"पानी दें।": b"ID3first", "खाद डालें।": None}
+
+        async def answer():
+            partial = await main.build_answer("CA-answer", conversation, "kya karun", rest_key="CA-answer/rest")
+            status, rest = await main.answer_queue.wait("CA-answer/rest", timeout=5)
+            return partial, status, rest
+
+        async def synthesize(text, language, output_format):
+            return clips[text]
+
+        with patch.object(main.ai_model, "generate_response", return_value="पानी दें। खाद डालें।"), \
+                patch.object(main.tts_service, "text_to_speech_async", side_effect=synthesize):
+            partial, status, rest = asyncio.run(answer())
+
+        self.assertIn(b'<Redirect method="POST">/answer/CA-answer/rest</Redirect>', partial)
+        self.assertIn(b"<Play>", partial)
+        self.assertEqual(status, main.AnswerQueue.READY)
+        self.assertIn("<Say language=\"hindi\">खाद डालें।</Say>".encode("utf-8"), rest)
+        self.assertIn(b"<Gather", rest)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import io
+import random
+import wave
+import sys
+import os
+
+from fastapi.testclient import TestClient
+
+# Add parent and scripts directories to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from mock_speech_server import create_app, parse_latency
+
+class TestMockSpeechServer(unittest.TestCase):
+
+    def test_stt_shape(self):
+        """Test the STT endpoint accepts STTService's multipart request"""
+        client = TestClient(create_app())
+        files = {'audio': ('audio.wav', b"RIFF", 'audio/wav'), 'language': (None, 'hi-IN')}
+
+        response = client.post("/stt", files=files)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("text", response.json())
+
+    def test_tts_returns_wav_sized_by_text(self):
+        """Test the TTS endpoint returns longer audio for longer text"""
+        client = TestClient(create_app(tts_seconds_per_char=0.1))
+
+        short = client.post("/tts", json={"text": "namaste", "voice": "hi-IN-MadhurNeural", "language": "hindi"})
+        long = client.post("/tts", json={"text": "namaste " * 10, "voice": "hi-IN-MadhurNeural", "language": "hindi"})
+
+        self.assertEqual(short.headers["content-type"], "audio/wav")
+        with wave.open(io.BytesIO(short.content)) as wav_file:
+            self.assertEqual(wav_file.getframerate(), 8000)
+        self.assertGreater(len(long.content), len(short.content))
+
+    def test_error_injection(self):
+        """Test an error rate of 1 fails every request"""
+        client = TestClient(create_app(error_rate=1.0))
+
+        response = client.post("/tts", json={"text": "namaste"})
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(client.get("/health").json()["errors"], 1)
+
+    def test_latency_samplers_are_seeded(self):
+        """Test identical seeds give identical latency sequences"""
+        first = parse_latency("lognormal:-1.2,0.5", random.Random(7))
+        second = parse_latency("lognormal:-1.2,0.5", random.Random(7))
+
+        self.assertEqual([first() for _ in range(5)], [second() for _ in range(5)])
+        self.assertEqual(parse_latency("constant:0.25", random.Random())(), 0.25)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import asyncio
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.profile_store import SQLiteProfileStore
+
+class TestSQLiteProfileStore(unittest.TestCase):
+    """Test cases for the farmer profile store"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "profiles", "profiles.db")
+        self.store = SQLiteProfileStore(self.db_path)
+
+    def tearDown(self):
+        asyncio.run(self.store.close())
+        shutil.rmtree(self.temp_dir)
+
+    def test_save_and_load(self):
+        """Test a saved context comes back as a session for the caller"""
+        asyncio.run(self.store.save("+919876543210", {"crop": "wheat", "location": "Haryana", "season": None}))
+        profile = asyncio.run(self.store.get("+919876543210"))
+
+        self.assertEqual(profile.from_number, "+919876543210")
+        self.assertEqual(profile.context, {"crop": "wheat", "location": "Haryana"})
+        self.assertEqual(profile.language, "hindi")
+        self.assertIsNone(asyncio.run(self.store.get("+910000000000")))
+
+    def test_latest_context_wins(self):
+        """Test saving again replaces the context and counts the call"""
+        asyncio.run(self.store.save("+91", {"crop": "wheat"}))
+        asyncio.run(self.store.save("+91", {"crop": "rice"}, "punjabi"))
+        profile = asyncio.run(self.store.get("+91"))
+
+        self.assertEqual((profile.context, profile.language), ({"crop": "rice"}, "punjabi"))
+        self.assertEqual(asyncio.run(self.store.count()), 1)
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT calls FROM profiles").fetchone()[0], 2)
+
+    def test_stale_profile_ignored(self):
+        """Test profiles older than max_age are not returned"""
+        asyncio.run(self.store.save("+91", {"crop": "wheat"}))
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE profiles SET updated_at = ?", (time.time() - 3600,))
+
+        self.assertIsNone(asyncio.run(self.store.get("+91", max_age=60)))
+        self.assertIsNotNone(asyncio.run(self.store.get("+91", max_age=7200)))
+
+    def test_delete_and_wal(self):
+        """Test deleting reports existence and the database runs in WAL mode"""
+        asyncio.run(self.store.save("+91", {"crop": "wheat"}))
+
+        self.assertTrue(asyncio.run(self.store.delete("+91")))
+        self.assertFalse(asyncio.run(self.store.delete("+91")))
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork")
+    def test_forked_worker_reconnects(self):
+        """Test a forked child writes through its own connection"""
+        asyncio.run(self.store.save("+91", {"crop": "wheat"}))
+        inherited = self.store._conn
+
+        pid = os.fork()
+        if pid == 0:
+            ok = self.store._conn is not inherited
+            asyncio.run(self.store.save("+92", {"crop": "rice"}))
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+
+        self.assertEqual(os.WEXITSTATUS(status), 0)
+        self.assertEqual(asyncio.run(self.store.get("+92")).context, {"crop": "rice"})
+
+if __name__ == '__main__':
+    unittest.main()
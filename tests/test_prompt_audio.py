@@ -0,0 +1,66 @@
+import unittest
+from unittest.mock import Mock
+import tempfile
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.prompt_audio import PromptAudioCache, clip_id_for
+from services.tts_service import TTSService
+
+class TestPromptAudioCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.tts_service = TTSService()
+        self.tts_service.text_to_speech = Mock(side_effect=lambda text, language, output_format: f"ID3{language}:{text}".encode())
+
+    def test_build_renders_every_prompt(self):
+        """Test greeting and query prompts are rendered for all 12 languages"""
+        cache = PromptAudioCache(self.cache_dir, self.tts_service)
+
+        summary = cache.build()
+
+        self.assertEqual(summary["rendered"], 24)
+        clip_id = cache.clip_for("greeting", "hindi")
+        self.assertTrue(clip_id.endswith(".mp3"))
+        self.assertTrue(cache.has_clip(clip_id))
+
+    def test_rebuild_only_when_strings_change(self):
+        """Test an unchanged manifest skips synthesis on the next build"""
+        PromptAudioCache(self.cache_dir, self.tts_service).build()
+        self.tts_service.text_to_speech.reset_mock()
+
+        cache = PromptAudioCache(self.cache_dir, self.tts_service)
+        self.assertEqual(cache.build()["rendered"], 0)
+        self.tts_service.text_to_speech.assert_not_called()
+
+        self.tts_service.get_query_prompt = lambda language: "Ab sawal poochhiye"
+        self.assertEqual(cache.build()["rendered"], 12)
+
+    def test_clip_ids_are_content_addressed(self):
+        """Test identical audio gets the identical clip id"""
+        self.assertEqual(clip_id_for(b"ID3abc"), clip_id_for(b"ID3abc"))
+        self.assertTrue(clip_id_for(b"RIFF....WAVE").endswith(".wav"))
+
+    def test_only_clips_are_served(self):
+        """Test the manifest and other non-clip names in the cache directory are not clips"""
+        cache = PromptAudioCache(self.cache_dir, self.tts_service)
+        cache.build()
+
+        self.assertTrue(os.path.isfile(os.path.join(self.cache_dir, "manifest.json")))
+        for name in ["manifest.json", "../manifest.json", "", "0" * 32 + ".exe"]:
+            self.assertFalse(cache.has_clip(name), name)
+        with self.assertRaises(ValueError):
+            cache.path_for("manifest.json")
+
+    def test_missing_prompt_falls_back(self):
+        """Test lookups before a build return None"""
+        cache = PromptAudioCache(self.cache_dir, self.tts_service)
+
+        self.assertIsNone(cache.clip_for("greeting", "hindi"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+
+GB = 1024 ** 3
+
+def make_config(**overrides):
+    settings = dict(
+        DEVICE="cpu", MODEL_MEMORY_MB=0, SERVER_WORKERS=0, SERVER_WORKER_MEMORY_MB=512,
+        SERVER_MAX_REQUESTS=2000, REDIS_URL="redis://redis:6379/0", STATELESS_SESSIONS=False,
+        DEFERRED_ANSWERS=False, AUDIO_STORE_DIR="./audio_cache/clips"
+    )
+    settings.update(overrides)
+    return SimpleNamespace(**settings)
+
+class TestServerPlan(unittest.TestCase):
+    """Test cases for the production launcher's worker planning"""
+
+    def test_workers_bounded_by_cpus_and_memory(self):
+        """Test the pool is the smaller of the CPU count and what fits in memory"""
+        self.assertEqual(server.plan_workers(8, 64 * GB, 12 * GB, GB, preload=True), 8)
+        self.assertEqual(server.plan_workers(8, 16 * GB, 12 * GB, GB, preload=True), 2)
+        self.assertEqual(server.plan_workers(8, 8 * GB, 12 * GB, GB, preload=True), 1)
+
+    def test_preload_shares_the_model(self):
+        """Test without preload every worker pays for its own model copy"""
+        self.assertEqual(server.plan_workers(16, 64 * GB, 12 * GB, GB, preload=True), 16)
+        self.assertEqual(server.plan_workers(16, 64 * GB, 12 * GB, GB, preload=False), 4)
+
+    def test_model_memory(self):
+        """Test the model estimate follows the device and the Railway app has none"""
+        self.assertEqual(server.model_memory(make_config(), "main:app"), int(2.9e9 * 4))
+        self.assertEqual(server.model_memory(make_config(DEVICE="cuda"), "main:app"), int(2.9e9 * 2))
+        self.assertEqual(server.model_memory(make_config(MODEL_MEMORY_MB=100), "main:app"), 100 * 1024 * 1024)
+        self.assertEqual(server.model_memory(make_config(), "main_railway:app"), 0)
+
+    def test_process_local_state_forces_one_worker(self):
+        """Test in-memory sessions, deferred answers or audio keep a single, unrecycled worker"""
+        with patch.object(server, "cpu_count", return_value=8), patch.object(server, "memory_limit", return_value=64 * GB):
+            shared = server.server_plan(make_config(), "main:app")
+            local = server.server_plan(make_config(REDIS_URL=""), "main:app")
+            deferred = server.server_plan(make_config(DEFERRED_ANSWERS=True), "main:app")
+            audio = server.server_plan(make_config(AUDIO_STORE_DIR=""), "main:app")
+            stateless = server.server_plan(make_config(REDIS_URL="", DEFERRED_ANSWERS=True, STATELESS_SESSIONS=True),
+                                           "main:app")
+
+        self.assertEqual((shared["workers"], shared["max_requests"], shared["threads_per_worker"]), (8, 2000, 1))
+        self.assertEqual((local["workers"], local["max_requests"]), (1, 0))
+        self.assertEqual(deferred["workers"], 1)
+        self.assertEqual(audio["workers"], 1)
+        self.assertEqual(stateless["workers"], 8)
+
+    def test_cuda_disables_preload(self):
+        """Test CUDA runs one worker that loads the model after fork"""
+        with patch.object(server, "cpu_count", return_value=8), patch.object(server, "memory_limit", return_value=64 * GB):
+            plan = server.server_plan(make_config(DEVICE="cuda"), "main:app")
+
+        self.assertEqual((plan["workers"], plan["preload"]), (1, False))
+
+if __name__ == '__main__':
+    unittest.main()
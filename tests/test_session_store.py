@@ -0,0 +1,147 @@
+import unittest
+import asyncio
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.call_session import CallSession
+from services.session_store import InMemorySessionStore, RedisSessionStore, encode_session
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+SESSION = CallSession(
+    "+919876543210",
+    "hindi",
+    {"location": "हरियाणा", "crop": "wheat", "water_condition": "shortage"}
+)
+
+class SessionStoreContract:
+    """Behaviour every SessionStore implementation must share"""
+
+    def make_store(self):
+        raise NotImplementedError
+
+    def run_scenario(self, coroutine_factory):
+        async def main():
+            store = self.make_store()
+            try:
+                return await coroutine_factory(store)
+            finally:
+                await store.close()
+        return asyncio.run(main())
+
+    def test_save_get_delete(self):
+        """Test a saved session round-trips and deleting it reports existence"""
+        async def scenario(store):
+            await store.save("CA1", SESSION)
+            loaded = await store.get("CA1")
+            count = await store.count()
+            deleted = await store.delete("CA1")
+            return loaded, count, deleted, await store.delete("CA1"), await store.get("CA1")
+
+        loaded, count, deleted, deleted_again, missing = self.run_scenario(scenario)
+
+        self.assertEqual(loaded, SESSION)
+        self.assertEqual(count, 1)
+        self.assertTrue(deleted)
+        self.assertFalse(deleted_again)
+        self.assertIsNone(missing)
+
+    def test_changes_require_save(self):
+        """Test mutating a loaded session does not change the stored copy"""
+        async def scenario(store):
+            await store.save("CA1", SESSION)
+            loaded = await store.get("CA1")
+            loaded.context = {**loaded.context, "crop": "rice"}
+            return await store.get("CA1")
+
+        self.assertEqual(self.run_scenario(scenario).context["crop"], "wheat")
+
+    def test_get_many(self):
+        """Test bulk reads keep order and return None for unknown calls"""
+        async def scenario(store):
+            await store.save("CA1", SESSION)
+            await store.save("CA2", CallSession("+919876543210", "english"))
+            return await store.get_many(["CA2", "CA9", "CA1"])
+
+        sessions = self.run_scenario(scenario)
+
+        self.assertEqual([s and s.language for s in sessions], ["english", None, "hindi"])
+
+    def test_lru_cap_evicts_least_recently_active(self):
+        """Test the session cap evicts the idlest session and counts it"""
+        async def scenario(store):
+            store.max_sessions = 2
+            await store.save("CA1", SESSION)
+            await store.save("CA2", SESSION)
+            await store.get("CA1")
+            await store.save("CA3", SESSION)
+            return [await store.get(sid) is not None for sid in ("CA1", "CA2", "CA3")], await store.stats()
+
+        present, stats = self.run_scenario(scenario)
+
+        self.assertEqual(present, [True, False, True])
+        self.assertEqual((stats["evicted"], stats["active"]), (1, 2))
+
+class TestInMemorySessionStore(SessionStoreContract, unittest.TestCase):
+
+    def make_store(self):
+        return InMemorySessionStore()
+
+    def test_idle_sessions_expire(self):
+        """Test the sweeper drops idle sessions and activity keeps a session alive"""
+        now = [0.0]
+        store = InMemorySessionStore(ttl=60, clock=lambda: now[0])
+
+        async def scenario():
+            await store.save("CA1", SESSION)
+            await store.save("CA2", SESSION)
+            now[0] = 50
+            await store.get("CA2")
+            now[0] = 100
+            swept = await store.sweep()
+            await store.delete("CA2")
+            return swept, await store.get("CA1"), await store.stats()
+
+        swept, expired, stats = asyncio.run(scenario())
+
+        self.assertEqual(swept, 1)
+        self.assertIsNone(expired)
+        self.assertEqual((stats["expired"], stats["completed"], stats["active"]), (1, 1, 0))
+
+@unittest.skipIf(fakeredis is None, "fakeredis not installed")
+class TestRedisSessionStore(SessionStoreContract, unittest.TestCase):
+
+    def make_store(self):
+        return RedisSessionStore(client=fakeredis.aioredis.FakeRedis())
+
+    def test_idle_sessions_expire(self):
+        """Test session keys carry a TTL and the sweeper clears stale index entries"""
+        async def scenario(store):
+            store.ttl = 0.05
+            await store.save("CA1", SESSION)
+            ttl_ms = await store.client.pttl("session:CA1")
+            await asyncio.sleep(0.1)
+            return ttl_ms, await store.sweep(), await store.get("CA1"), await store.stats()
+
+        ttl_ms, swept, session, stats = self.run_scenario(scenario)
+
+        self.assertTrue(0 < ttl_ms <= 50)
+        self.assertEqual(swept, 1)
+        self.assertIsNone(session)
+        self.assertEqual((stats["expired"], stats["active"]), (1, 0))
+
+    def test_serialization_is_compact(self):
+        """Test sessions are stored as whitespace-free UTF-8 JSON"""
+        payload = encode_session(SESSION)
+
+        self.assertNotIn(b": ", payload)
+        self.assertIn("हरियाणा".encode("utf-8"), payload)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+import time
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.call_session import CallSession
+from services.session_token import SessionSigner
+
+SESSION = CallSession(
+    "+919876543210",
+    "punjabi",
+    {"location": "Haryana", "crop": "wheat", "water_condition": "shortage", "soil_type": "reti wali"},
+    turns=2
+)
+
+class TestSessionSigner(unittest.TestCase):
+    """Test cases for signed session state in webhook URLs"""
+
+    def setUp(self):
+        self.signer = SessionSigner("test-secret", max_age=60)
+
+    def test_round_trip(self):
+        """Test a token decodes to the same session, including values outside the vocabulary"""
+        token = self.signer.encode("CA1", SESSION)
+        session = self.signer.decode("CA1", token)
+
+        self.assertEqual(session, SESSION)
+        self.assertEqual(session.turns, 2)
+
+    def test_token_is_url_safe_and_short(self):
+        """Test tokens need no URL or XML escaping and stay small"""
+        token = self.signer.encode("CA1", SESSION)
+
+        self.assertRegex(token, r"^[A-Za-z0-9_\-]+\.[A-Za-z0-9_\-]+$")
+        self.assertLess(len(token), 160)
+
+    def test_rejects_tampering_and_other_calls(self):
+        """Test changed payloads, other CallSids and other secrets are refused"""
+        token = self.signer.encode("CA1", SESSION)
+        body, mac = token.split(".")
+        tampered = body[:-2] + ("AA" if body[-2:] != "AA" else "BB") + "." + mac
+
+        self.assertIsNone(self.signer.decode("CA1", tampered))
+        self.assertIsNone(self.signer.decode("CA2", token))
+        self.assertIsNone(SessionSigner("other-secret").decode("CA1", token))
+        self.assertIsNone(self.signer.decode("CA1", None))
+        self.assertIsNone(self.signer.decode("CA1", "garbage"))
+
+    def test_expired_token(self):
+        """Test tokens older than max_age are refused"""
+        token = self.signer.encode("CA1", SESSION)
+
+        with patch("services.session_token.time.time", return_value=time.time() + 120):
+            self.assertIsNone(self.signer.decode("CA1", token))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import patch
+import tempfile
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.audio_codec import pcm16_to_wav
+from services.stt_cache import STTResultCache, audio_fingerprint
+from services.stt_service import STTService
+
+class TestSTTResultCache(unittest.TestCase):
+
+    def setUp(self):
+        samples = (np.arange(8000) % 200 * 50).astype(np.int16)
+        self.wav = pcm16_to_wav(samples, 8000)
+
+    def test_fingerprint_ignores_container_metadata(self):
+        """Test the same PCM hashes the same even with extra WAV metadata chunks"""
+        # Insert a LIST chunk between the fmt and data chunks
+        tagged = self.wav[:36] + b"LIST\x04\x00\x00\x00INFO" + self.wav[36:]
+
+        self.assertNotEqual(tagged, self.wav)
+        self.assertEqual(audio_fingerprint(tagged, "hi-IN"), audio_fingerprint(self.wav, "hi-IN"))
+        self.assertNotEqual(audio_fingerprint(self.wav, "hi-IN"), audio_fingerprint(self.wav, "en-IN"))
+
+    def test_lru_eviction_and_hit_rate(self):
+        """Test the memory tier evicts least recently used entries"""
+        cache = STTResultCache(max_entries=2)
+        cache.put("a", "one")
+        cache.put("b", "two")
+        cache.get("a")
+        cache.put("c", "three")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "one")
+        stats = cache.stats()
+        self.assertEqual(stats["memory_hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+        self.assertAlmostEqual(stats["hit_rate"], 2 / 3)
+
+    def test_disk_tier_survives_restart(self):
+        """Test entries written to disk are found by a fresh cache"""
+        with tempfile.TemporaryDirectory() as disk_dir:
+            STTResultCache(disk_dir=disk_dir).put("hi-IN-abcd", "namaste")
+            cache = STTResultCache(disk_dir=disk_dir)
+
+            self.assertEqual(cache.get("hi-IN-abcd"), "namaste")
+            self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    def test_duplicate_audio_is_recognized_once(self):
+        """Test convert_audio_to_text skips the engines on a repeat"""
+        stt_service = STTService()
+
+        with patch.object(stt_service, "_recognize", return_value="gehun") as recognize:
+            first = stt_service.convert_audio_to_text(self.wav, "hindi")
+            second = stt_service.convert_audio_to_text(self.wav, "hindi")
+
+        self.assertEqual(first, second)
+        self.assertEqual(recognize.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
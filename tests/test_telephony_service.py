@@ -0,0 +1,84 @@
+import unittest
+from types import SimpleNamespace
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.telephony_service import TelephonyService
+
+class TestCompiledTwiML(unittest.TestCase):
+
+    def setUp(self):
+        config = SimpleNamespace(TWILIO_ACCOUNT_SID=None, TWILIO_AUTH_TOKEN=None, TWILIO_PHONE_NUMBER=None)
+        self.telephony = TelephonyService(config)
+
+    def test_static_responses_are_serialized_once(self):
+        """Test compiled greeting/query bytes match the builders and are reused"""
+        greeting = self.telephony.compiled_greeting("english")
+        query = self.telephony.compiled_query("hindi", audio_url="https://ivr.example.org/audio/a.wav")
+
+        self.assertEqual(greeting, self.telephony.create_greeting_response("english").encode("utf-8"))
+        self.assertEqual(query, self.telephony.create_query_response(
+            "hindi", audio_url="https://ivr.example.org/audio/a.wav"
+        ).encode("utf-8"))
+        self.assertIs(self.telephony.compiled_greeting("english"), greeting)
+
+    def test_ai_response_template_matches_builder(self):
+        """Test the spliced answer escapes text exactly like VoiceResponse"""
+        answer = 'यूरिया <50 kg> & "DAP" डालें'
+
+        self.assertEqual(
+            self.telephony.render_ai_response(answer, "hindi"),
+            self.telephony.create_ai_response(answer, "hindi").encode("utf-8")
+        )
+
+    def test_ai_response_template_with_audio(self):
+        """Test several answer clips are spliced as consecutive <Play> verbs"""
+        urls = ["/audio/a.wav?x=1&y=2", "/audio/b.wav"]
+
+        self.assertEqual(
+            self.telephony.render_ai_response("ignored", "punjabi", audio_urls=urls),
+            self.telephony.create_ai_response("ignored", "punjabi", audio_urls=urls).encode("utf-8")
+        )
+
+    def test_failed_sentence_keeps_other_clips(self):
+        """Test a sentence without audio is spoken while the other clips still play"""
+        answer = self.telephony.render_ai_response(
+            "पानी दें। खाद डालें।", "hindi", audio_urls=["/audio/a.wav", None], sentences=["पानी दें।", "खाद डालें।"]
+        )
+        unsynthesized = self.telephony.render_ai_response("पानी दें।", "hindi", audio_urls=[None], sentences=["पानी दें।"])
+
+        self.assertIn('<Play>/audio/a.wav</Play><Say language="hindi">खाद डालें।</Say>'.encode("utf-8"), answer)
+        self.assertEqual(unsynthesized, self.telephony.render_ai_response("पानी दें।", "hindi"))
+
+    def test_partial_answer_redirects_for_the_rest(self):
+        """Test the first segment plays before redirecting to the rest of the answer"""
+        partial = self.telephony.create_partial_answer_response(["/audio/a.wav"], ["पानी दें।"], "/answer/CA123/rest")
+
+        self.assertIn('<Play>/audio/a.wav</Play><Redirect method="POST">/answer/CA123/rest</Redirect>', partial)
+        self.assertNotIn("<Gather", partial)
+
+    def test_hold_response_redirects_to_poll_endpoint(self):
+        """Test hold and poll TwiML match the builder and redirect to the answer URL"""
+        hold = self.telephony.render_hold_response("/answer/CA123", "hindi")
+        poll = self.telephony.render_hold_response("/answer/CA123", "hindi", announce=False)
+
+        self.assertEqual(hold, self.telephony.create_hold_response("/answer/CA123", "hindi").encode("utf-8"))
+        self.assertIn(b'<Redirect method="POST">/answer/CA123</Redirect>', poll)
+        self.assertNotIn(b"<Say", poll)
+
+    def test_state_is_carried_in_gather_actions(self):
+        """Test stateless responses match the builders with the state in the action URL"""
+        state = "eJyrVkrLz1eyUlAqS8w.Q6ekXdwu"
+        greeting = self.telephony.compiled_greeting("hindi", state=state)
+        answer = self.telephony.render_ai_response("पानी दें", "hindi", state=state)
+
+        self.assertEqual(greeting, self.telephony.create_greeting_response("hindi", state=state).encode("utf-8"))
+        self.assertIn(f'action="/process_context?state={state}"'.encode("utf-8"), greeting)
+        self.assertEqual(answer, self.telephony.create_ai_response("पानी दें", "hindi", state=state).encode("utf-8"))
+        self.assertEqual(self.telephony.compiled_query("hindi"), self.telephony.create_query_response("hindi").encode("utf-8"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+import unittest
+from unittest.mock import Mock, patch
+import asyncio
+import numpy as np
+import threading
+import time
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.audio_codec import pcm16_to_wav
+from services.audio_stream import WavStreamDecoder
+from services.tts_service import TTSService, split_sentences
+
+class FakeCommunicate:
+    """Stands in for edge_tts.Communicate, tracking how many streams run at once"""
+
+    active = 0
+    peak = 0
+
+    def __init__(self, text, voice):
+        self.text = text
+
+    async def stream(self):
+        FakeCommunicate.active += 1
+        FakeCommunicate.peak = max(FakeCommunicate.peak, FakeCommunicate.active)
+        try:
+            await asyncio.sleep(0.01)
+            yield {"type": "WordBoundary", "offset": 0}
+            yield {"type": "audio", "data": b"ID3"}
+            yield {"type": "audio", "data": self.text.encode()}
+        finally:
+            FakeCommunicate.active -= 1
+
+class TestAsyncTTS(unittest.TestCase):
+
+    def setUp(self):
+        FakeCommunicate.active = FakeCommunicate.peak = 0
+        self.tts_service = TTSService(max_concurrent_syntheses=2)
+        self.tts_service._vakyansh_tts = Mock(return_value=None)
+        self.tts_service._gtts_fallback = Mock(return_value=None)
+
+    @patch("services.tts_service.edge_tts.Communicate", FakeCommunicate)
+    def test_edge_audio_is_streamed_into_memory(self):
+        """Test Edge audio chunks are collected on the running loop"""
+        audio = asyncio.run(self.tts_service.text_to_speech_async("namaste", "hindi"))
+
+        self.assertEqual(audio, b"ID3namaste")
+        self.tts_service._gtts_fallback.assert_not_called()
+
+    @patch("services.tts_service.edge_tts.Communicate", FakeCommunicate)
+    def test_concurrency_is_bounded_by_semaphore(self):
+        """Test concurrent syntheses never exceed max_concurrent_syntheses"""
+        async def run():
+            return await asyncio.gather(*[
+                self.tts_service.text_to_speech_async(f"answer {i}") for i in range(6)
+            ])
+
+        results = asyncio.run(run())
+
+        self.assertEqual(len(results), 6)
+        self.assertEqual(FakeCommunicate.peak, 2)
+
+    def test_vakyansh_result_skips_fallbacks(self):
+        """Test a Vakyansh answer is returned without touching Edge or gTTS"""
+        self.tts_service._vakyansh_tts = Mock(return_value=b"RIFFwav")
+
+        audio = asyncio.run(self.tts_service.text_to_speech_async("namaste"))
+
+        self.assertEqual(audio, b"RIFFwav")
+        self.tts_service._gtts_fallback.assert_not_called()
+
+class TestCoalescing(unittest.TestCase):
+
+    def setUp(self):
+        self.tts_service = TTSService()
+        self.calls = 0
+
+        def slow_vakyansh(text, language):
+            self.calls += 1
+            time.sleep(0.05)
+            return b"RIFF" + text.encode()
+
+        self.tts_service._vakyansh_tts = slow_vakyansh
+
+    def test_concurrent_async_requests_share_one_synthesis(self):
+        """Test identical concurrent requests make one upstream call"""
+        async def run():
+            return await asyncio.gather(*[self.tts_service.text_to_speech_async("namaste") for _ in range(20)])
+
+        results = asyncio.run(run())
+
+        self.assertEqual(set(results), {b"RIFFnamaste"})
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.tts_service.get_synthesis_stats()["coalesced"], 19)
+
+    def test_concurrent_sync_requests_share_one_synthesis(self):
+        """Test identical requests from worker threads make one upstream call"""
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.tts_service.text_to_speech("namaste")))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [b"RIFFnamaste"] * 8)
+        self.assertEqual(self.calls, 1)
+
+    def test_result_feeds_audio_cache(self):
+        """Test a finished synthesis is served from the audio store next time"""
+        self.tts_service.text_to_speech("namaste", "hindi")
+        self.tts_service.text_to_speech("namaste", "hindi")
+        asyncio.run(self.tts_service.text_to_speech_async("namaste", "hindi"))
+        self.tts_service.text_to_speech("namaste", "english")
+
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(self.tts_service.get_synthesis_stats()["cache_hits"], 2)
+
+class TestOutputFormat(unittest.TestCase):
+
+    def setUp(self):
+        self.tts_service = TTSService()
+        self.tts_service._vakyansh_tts = Mock(return_value=pcm16_to_wav(np.zeros(16000, dtype=np.int16), 16000))
+
+    def test_mulaw_output_is_cached_per_format(self):
+        """Test telephony audio is converted once and native audio is synthesized once"""
+        mulaw = self.tts_service.text_to_speech("namaste", output_format="mulaw")
+        again = asyncio.run(self.tts_service.text_to_speech_async("namaste", output_format="mulaw"))
+        native = self.tts_service.text_to_speech("namaste")
+
+        decoder = WavStreamDecoder()
+        decoder.feed(mulaw)
+        self.assertEqual(decoder.sample_rate, 8000)
+        self.assertEqual(again, mulaw)
+        self.assertTrue(native.startswith(b"RIFF"))
+        self.assertNotEqual(native, mulaw)
+        self.tts_service._vakyansh_tts.assert_called_once()
+
+    def test_unknown_format_is_rejected(self):
+        """Test an unsupported output format raises"""
+        with self.assertRaises(ValueError):
+            self.tts_service.text_to_speech("namaste", output_format="ogg")
+
+class TestPipelinedTTS(unittest.TestCase):
+
+    def setUp(self):
+        self.tts_service = TTSService()
+        self.started = []
+        self.active = 0
+        self.peak = 0
+
+        async def fake_tts(text, language="hindi", output_format="native"):
+            self.started.append(text)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            # Later sentences finish first, so ordering has to be enforced
+            await asyncio.sleep(0.05 / len(self.started))
+            self.active -= 1
+            return None if text == "FAIL." else text.encode()
+
+        self.tts_service.text_to_speech_async = fake_tts
+
+    def collect(self, text, **kwargs):
+        async def run():
+            return [audio async for audio in self.tts_service.synthesize_pipelined(text, **kwargs)]
+        return asyncio.run(run())
+
+    def test_split_sentences(self):
+        """Test danda, question mark and full stop boundaries, keeping decimals"""
+        self.assertEqual(
+            split_sentences("गेहूं बोइए। 2.5 किलो डालें. कब? अभी"),
+            ["गेहूं बोइए।", "2.5 किलो डालें.", "कब?", "अभी"]
+        )
+
+    def test_segments_yield_in_order_with_bounded_parallelism(self):
+        """Test segments come back in sentence order with at most max_parallel in flight"""
+        segments = self.collect("एक। दो। तीन। चार। पांच।", max_parallel=2)
+
+        self.assertEqual([s.decode() for s in segments], ["एक।", "दो।", "तीन।", "चार।", "पांच।"])
+        self.assertEqual(self.peak, 2)
+
+    def test_first_segment_callback_and_failures(self):
+        """Test the callback fires once for the first audio and failed sentences yield None"""
+        first = Mock()
+
+        segments = self.collect("FAIL. Second one. Third one.", on_first_segment=first)
+
+        self.assertEqual(segments, [None, b"Second one.", b"Third one."])
+        first.assert_called_once_with(b"Second one.")
+
+if __name__ == '__main__':
+    unittest.main()
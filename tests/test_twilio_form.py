@@ -0,0 +1,100 @@
+import unittest
+import sys
+import os
+from urllib.parse import urlencode
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from twilio.request_validator import RequestValidator
+
+from services.twilio_form import TwilioForm, parse_twilio_form, twilio_form, twilio_signature_valid
+
+PARAMS = {
+    "AccountSid": "AC123",
+    "CallSid": "CA456",
+    "From": "+919876543210",
+    "SpeechResult": "गेहूं में पीला रतुआ & 50% नुकसान",
+    "Confidence": "0.87",
+    "Language": "hi-IN",
+}
+
+class TestTwilioForm(unittest.TestCase):
+    """Test cases for the Twilio webhook form parser"""
+
+    def test_parses_needed_fields(self):
+        """Test wanted fields are decoded like urllib and the rest ignored"""
+        form = parse_twilio_form(urlencode(PARAMS).encode("ascii"))
+
+        self.assertEqual(form.call_sid, "CA456")
+        self.assertEqual(form.from_number, "+919876543210")
+        self.assertEqual(form.speech_result, PARAMS["SpeechResult"])
+        self.assertEqual(form.confidence, 0.87)
+        self.assertIsNone(form.event_type)
+        self.assertFalse(hasattr(form, "Language"))
+
+    def test_defaults_and_bad_values(self):
+        """Test missing fields get defaults and an unparsable confidence is 0"""
+        form = parse_twilio_form(b"EventType=call-completed&Confidence=abc&SpeechResult=")
+
+        self.assertEqual(form.event_type, "call-completed")
+        self.assertEqual(form.confidence, 0.0)
+        self.assertEqual(form.speech_result, "")
+        self.assertIsNone(form.call_sid)
+        self.assertEqual(parse_twilio_form(b"").call_status, "")
+
+    def test_farmer_number_on_campaign_calls(self):
+        """Test the farmer is the callee on outbound calls and the caller otherwise"""
+        inbound = parse_twilio_form(urlencode(dict(PARAMS, To="+911800000000", Direction="inbound")).encode("ascii"))
+        campaign = parse_twilio_form(urlencode(dict(
+            PARAMS, From="+911800000000", To="+919876543210", Direction="outbound-api"
+        )).encode("ascii"))
+
+        self.assertEqual(inbound.farmer_number, "+919876543210")
+        self.assertEqual(campaign.farmer_number, "+919876543210")
+        self.assertEqual(campaign.from_number, "+911800000000")
+        self.assertEqual(TwilioForm(from_number="+91").farmer_number, "+91")
+
+    def test_first_occurrence_wins(self):
+        """Test a repeated parameter keeps its first value"""
+        self.assertEqual(parse_twilio_form(b"CallSid=CA1&CallSid=CA2").call_sid, "CA1")
+
+    def test_dependency_handles_urlencoded_and_multipart(self):
+        """Test the FastAPI dependency reads both encodings"""
+        app = FastAPI()
+
+        @app.post("/hook")
+        async def hook(form: TwilioForm = Depends(twilio_form)):
+            return {"call_sid": form.call_sid, "speech": form.speech_result}
+
+        client = TestClient(app)
+        urlencoded = client.post("/hook", data=PARAMS).json()
+        multipart = client.post("/hook", files={key: (None, value) for key, value in PARAMS.items()}).json()
+
+        self.assertEqual(urlencoded, {"call_sid": "CA456", "speech": PARAMS["SpeechResult"]})
+        self.assertEqual(multipart, urlencoded)
+
+    def test_signature_validation(self):
+        """Test only callbacks signed with the auth token for the public URL are accepted"""
+        app = FastAPI()
+
+        @app.post("/campaign_status/{job_id}")
+        async def status(request: Request, form: TwilioForm = Depends(twilio_form)):
+            valid = await twilio_signature_valid(request, "token", "https://farmer.example.com")
+            return {"valid": valid, "call_status": form.call_status}
+
+        params = {"CallSid": "CA456", "CallStatus": "completed", "AccountSid": "AC123"}
+        signature = RequestValidator("token").compute_signature("https://farmer.example.com/campaign_status/7", params)
+        client = TestClient(app)
+
+        signed = client.post("/campaign_status/7", data=params, headers={"X-Twilio-Signature": signature}).json()
+        self.assertEqual(signed, {"valid": True, "call_status": "completed"})
+        forged = client.post("/campaign_status/8", data=params, headers={"X-Twilio-Signature": signature}).json()
+        self.assertFalse(forged["valid"])
+        self.assertFalse(client.post("/campaign_status/7", data=params).json()["valid"])
+
+if __name__ == '__main__':
+    unittest.main()